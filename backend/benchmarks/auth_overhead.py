@@ -0,0 +1,62 @@
+"""
+Per-request cost of authenticating a bearer token: a full signature check
+(what every protected route did before the claims cache) against a cache
+hit, for HS256, RS256 and EdDSA. Needs no database.
+
+    python -m benchmarks.auth_overhead
+"""
+import os
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from benchmarks.common import print_table
+from utils.tokens import TokenVerifier
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 20_000))
+
+
+def keypair_verifier(algorithm: str, private_key) -> TokenVerifier:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return TokenVerifier(algorithm, private_key=private_pem, public_key=public_pem)
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def main():
+    verifiers = {
+        "HS256": TokenVerifier("HS256", secret="bench-secret"),
+        "RS256": keypair_verifier("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        "EdDSA": keypair_verifier("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    }
+    claims = {"user": {"email": "bench@example.com", "role": "jobSeeker", "is_email_verified": True, "user_id": "u1"}}
+    rows = []
+    for algorithm, verifier in verifiers.items():
+        token = verifier.issue(claims, 3600)
+
+        def uncached():
+            verifier.forget(token)
+            verifier.verify(token)
+
+        rows.append({
+            "algorithm": algorithm,
+            "full_verify_us": per_call_us(uncached, ITERATIONS),
+            "cache_hit_us": per_call_us(lambda: verifier.verify(token), ITERATIONS),
+        })
+    print(f"{ITERATIONS} verifications per row")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Shared helpers for the benchmark scripts. Benchmarks run against the database
+in DATABASE_URL (migrated with `python migrate.py upgrade`) and print a small
+table; they are not part of the test suite.
+
+    python -m benchmarks.profile_loader
+"""
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import httpx
+from sqlalchemy import event
+
+
+def percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+    }
+
+
+async def timed(coro_factory, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextmanager
+def count_statements(async_engine):
+    """Counts statements sent to the database (i.e. round trips) inside the block."""
+    counter = {"statements": 0}
+
+    def on_execute(*args):
+        counter["statements"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+def print_table(rows: list[dict]):
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = [max(len(str(h)), *(len(str(row[h])) for row in rows)) for h in headers]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
+
+
+def wait_until_ready(url: str, timeout: float = 60, process: subprocess.Popen | None = None) -> float:
+    """Polls `url` until it answers 200; returns the seconds that took."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode} before answering")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer within {timeout}s")
+
+
+@contextmanager
+def serve(port: int = 8765, workers: int = 1, env: dict | None = None, command: list[str] | None = None):
+    """
+    Runs the app under uvicorn in a subprocess from the backend directory and
+    yields (process, base_url) once it is started; the caller decides how to
+    wait for it. `command` replaces the uvicorn command line.
+    """
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = command or [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                          "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=backend, env={**os.environ, **(env or {})})
+    try:
+        yield process, f"http://127.0.0.1:{port}"
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
@@ -0,0 +1,88 @@
+"""
+End-to-end throughput of the async stack: the app runs under uvicorn in a
+subprocess and BENCH_CLIENTS concurrent clients (100 by default) send
+requests over HTTP for BENCH_SECONDS. Covers a cached profile read
+(GET /profile/user/{id}) and a login (POST /auth/login, a bcrypt verify in
+the hashing pool). Login rate limits are raised for the run. Needs Redis and
+a migrated database; the seeded user is left in place.
+
+    DATABASE_URL=postgresql://... BCRYPT_ROUNDS=10 python -m benchmarks.concurrent_requests
+"""
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import insert
+
+from benchmarks.common import percentiles, print_table, serve, wait_until_ready
+from schema.schema import async_engine, users
+from services.profile_service import Profile
+from utils.hashing import hash_password
+
+CLIENTS = int(os.getenv("BENCH_CLIENTS", 100))
+SECONDS = float(os.getenv("BENCH_SECONDS", 10))
+WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+PASSWORD = "Str0ng!pass"
+
+
+async def seed() -> tuple[str, str]:
+    """A verified user with a profile; returns (user_id, email)."""
+    user_id = str(uuid4())
+    email = f"{user_id}@example.com"
+    async with async_engine.begin() as conn:
+        await conn.execute(insert(users).values(
+            id=user_id, email=email, password_hash=hash_password(PASSWORD), is_active=True, is_email_verified=True,
+        ))
+    await Profile(None, async_engine).create({"full_name": "Bench User", "skills": ["python", "fastapi"]}, user_id)
+    await async_engine.dispose()
+    return user_id, email
+
+
+async def measure(base_url: str, name: str, send) -> dict:
+    stop = time.perf_counter() + SECONDS
+    samples, errors = [], 0
+    limits = httpx.Limits(max_connections=CLIENTS, max_keepalive_connections=CLIENTS)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    response = await send(client)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                samples.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(CLIENTS)))
+    return {"endpoint": name, "clients": CLIENTS, "requests": len(samples), "errors": errors,
+            "req_per_s": round(len(samples) / SECONDS, 1), **percentiles(samples)}
+
+
+async def run(base_url: str, user_id: str, email: str) -> list[dict]:
+    scenarios = {
+        "GET /profile/user/{id}": lambda client: client.get(f"/profile/user/{user_id}"),
+        "POST /auth/login": lambda client: client.post("/auth/login", json={"email": email, "password": PASSWORD}),
+    }
+    return [await measure(base_url, name, send) for name, send in scenarios.items()]
+
+
+def main():
+    user_id, email = asyncio.run(seed())
+    # High enough that no login of the run is rate limited
+    limits = {"RATE_LIMIT_LOGIN_IP": "1000000/60", "RATE_LIMIT_LOGIN_EMAIL": "1000000/60"}
+    with serve(workers=WORKERS, env=limits) as (server, base_url):
+        wait_until_ready(base_url + "/", process=server)
+        rows = asyncio.run(run(base_url, user_id, email))
+    print(f"workers={WORKERS} seconds={SECONDS:g} bcrypt_rounds={os.getenv('BCRYPT_ROUNDS', 'default')}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Password verification throughput with concurrent logins: inline on the event
+loop (how update-password used to hash), the default threadpool (old login /
+register) and the hashing process pool. Needs no database.
+
+    BCRYPT_ROUNDS=10 python -m benchmarks.login_throughput
+"""
+import asyncio
+import os
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from benchmarks.common import print_table
+from utils.hashing import PasswordHasher, check_password, hash_password
+
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 32))
+LOGINS = int(os.getenv("BENCH_LOGINS", 64))
+
+
+async def measure(verify) -> tuple[float, float]:
+    """Returns (logins/sec, worst event-loop stall in ms) for LOGINS logins."""
+    stall = 0.0
+
+    async def heartbeat():
+        nonlocal stall
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - start - 0.005)
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def login():
+        async with semaphore:
+            await verify()
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    monitor.cancel()
+    return LOGINS / elapsed, stall * 1000
+
+
+async def main():
+    hashed = hash_password("Str0ng!pass")
+    cores = os.cpu_count() or 1
+    hasher = PasswordHasher(max_pending=LOGINS)
+    await hasher.start()
+
+    async def inline():
+        await asyncio.sleep(0)
+        check_password(hashed, "Str0ng!pass")
+
+    async def threadpool():
+        await run_in_threadpool(check_password, hashed, "Str0ng!pass")
+
+    async def process_pool():
+        await hasher.verify(hashed, "Str0ng!pass")
+
+    rows = []
+    for name, verify in (("inline", inline), ("threadpool", threadpool), ("process_pool", process_pool)):
+        rate, stall = await measure(verify)
+        rows.append({"mode": name, "logins_per_s": round(rate, 1), "per_core": round(rate / cores, 2), "max_loop_stall_ms": round(stall, 1)})
+    hasher.shutdown()
+    print(f"cores={cores} pool_workers={hasher.workers} concurrency={CONCURRENCY}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+OTP mail throughput against a local aiosmtpd server: a new SMTP connection per
+message (the old send_email) versus the pooled SMTPTransport, with
+BENCH_SENDERS messages in flight at a time. The server delays every EHLO by
+BENCH_HANDSHAKE_MS to stand in for the STARTTLS + login round trips to
+smtp.gmail.com. Needs no database; aiosmtpd is in requirements-dev.txt.
+
+    python -m benchmarks.mail_throughput
+"""
+import asyncio
+import os
+import socket
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtplib import SMTP
+
+from benchmarks.common import print_table
+from services.mail_service import SMTPTransport, build_message
+
+MESSAGES = int(os.getenv("BENCH_MESSAGES", 500))
+SENDERS = int(os.getenv("BENCH_SENDERS", 4))
+HANDSHAKE_MS = float(os.getenv("BENCH_HANDSHAKE_MS", 30))
+
+
+class SlowHandshakeSink:
+    def __init__(self):
+        self.received = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(HANDSHAKE_MS / 1000)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def throughput(send, sink: SlowHandshakeSink) -> dict:
+    sink.received = sink.sessions = 0
+    queue = asyncio.Queue()
+    for i in range(MESSAGES):
+        queue.put_nowait(build_message(f"user{i}@example.com", "Your OTP Code", f"Your OTP code is: {i:06d}",
+                                       sender="noreply@example.com"))
+
+    async def sender():
+        while not queue.empty():
+            await send(queue.get_nowait())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(SENDERS)))
+    elapsed = time.perf_counter() - start
+    return {"messages_per_s": round(sink.received / elapsed, 1), "smtp_sessions": sink.sessions}
+
+
+async def main():
+    sink = SlowHandshakeSink()
+    controller = Controller(sink, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    rows = []
+
+    async def connection_per_message(message):
+        smtp = SMTP(hostname=controller.hostname, port=controller.port, start_tls=False)
+        await smtp.connect()
+        await smtp.send_message(message)
+        await smtp.quit()
+
+    rows.append({"sender": "connection per message", **await throughput(connection_per_message, sink)})
+
+    transport = SMTPTransport(controller.hostname, controller.port, username="", pool_size=SENDERS, start_tls=False)
+    rows.append({"sender": "pooled SMTPTransport", **await throughput(transport.send, sink)})
+    await transport.aclose()
+
+    controller.stop()
+    print(f"{MESSAGES} messages, {SENDERS} in flight, {HANDSHAKE_MS:g} ms simulated handshake per session")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+OTP verify throughput against the Redis at REDIS_HOST: the old GET, compare
+and DELETE versus OtpStore.verify, one Lua call. Each verify consumes a
+freshly issued code, with BENCH_CONCURRENCY verifies in flight. Also counts
+how many of BENCH_RACE concurrent verifies of one code were accepted.
+Needs no database.
+
+    REDIS_HOST=localhost python -m benchmarks.otp_verify
+"""
+import asyncio
+import os
+import time
+
+from benchmarks.common import print_table
+from utils.cache import redis_client
+from utils.otp import VALID, VERIFY_EMAIL, otp_store
+
+VERIFIES = int(os.getenv("BENCH_VERIFIES", 20_000))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 32))
+RACE = int(os.getenv("BENCH_RACE", 50))
+
+
+async def get_compare_delete(email: str, otp: str) -> bool:
+    stored_otp = await redis_client.get(email)
+    if stored_otp is None or stored_otp != otp:
+        return False
+    await redis_client.delete(email)
+    return True
+
+
+async def ops_per_second(verify, codes: list[tuple[str, str]]) -> float:
+    pending = iter(codes)
+
+    async def verifier():
+        for email, code in pending:
+            await verify(email, code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(verifier() for _ in range(CONCURRENCY)))
+    return round(len(codes) / (time.perf_counter() - start))
+
+
+async def accepted_in_race(verify, email: str, code: str) -> int:
+    return sum(bool(ok) for ok in await asyncio.gather(*(verify(email, code) for _ in range(RACE))))
+
+
+async def main():
+    emails = [f"bench-{i}@example.com" for i in range(VERIFIES)]
+    rows = []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for email in emails:
+            pipe.set(email, "123456", ex=600)
+        await pipe.execute()
+    await redis_client.set("race@example.com", "123456", ex=600)
+    rows.append({
+        "verify": "GET + compare + DELETE",
+        "ops_per_s": await ops_per_second(get_compare_delete, [(email, "123456") for email in emails]),
+        "accepted_in_race": await accepted_in_race(get_compare_delete, "race@example.com", "123456"),
+    })
+
+    codes = [(email, await otp_store.issue(VERIFY_EMAIL, email)) for email in emails]
+    race_code = await otp_store.issue(VERIFY_EMAIL, "race@example.com")
+
+    async def lua_verify(email, code):
+        return await otp_store.verify(VERIFY_EMAIL, email, code) == VALID
+
+    rows.append({
+        "verify": "OtpStore.verify (Lua)",
+        "ops_per_s": await ops_per_second(lua_verify, codes),
+        "accepted_in_race": await accepted_in_race(lua_verify, "race@example.com", race_code),
+    })
+
+    print(f"{VERIFIES} verifies, {CONCURRENCY} in flight; {RACE} concurrent verifies of one code")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""
+Per-call latency of Paystack verify calls against a local stub: a fresh
+httpx.AsyncClient per call (the old behaviour) versus the shared pooled
+client. The stub delays each new connection by BENCH_HANDSHAKE_MS to stand
+in for the TCP + TLS handshake to api.paystack.co. Needs no database.
+
+    python -m benchmarks.paystack_client
+"""
+import asyncio
+import os
+
+import httpx
+
+from benchmarks.common import percentiles, print_table, timed
+from benchmarks.paystack_stub import StubPaystack
+from services.payment_service import Paystack
+
+CALLS = int(os.getenv("BENCH_CALLS", 200))
+HANDSHAKE_MS = float(os.getenv("BENCH_HANDSHAKE_MS", 30))
+
+
+async def main():
+    stub = StubPaystack(handshake_delay=HANDSHAKE_MS / 1000)
+    await stub.start()
+    rows = []
+
+    async def fresh_client():
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{stub.base_url}/transaction/verify/ref-1")
+            response.raise_for_status()
+
+    stub.connections = 0
+    samples = await timed(fresh_client, CALLS)
+    rows.append({"client": "new client per call", **percentiles(samples), "connections": stub.connections})
+
+    paystack = Paystack(base_url=stub.base_url)
+    await paystack.start()
+    stub.connections = 0
+    samples = await timed(lambda: paystack.verify_transaction("ref-1"), CALLS)
+    rows.append({"client": "shared pooled client", **percentiles(samples), "connections": stub.connections})
+    await paystack.aclose()
+
+    await stub.close()
+    print(f"{CALLS} verify calls, {HANDSHAKE_MS:g} ms simulated handshake per new connection")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Minimal local stand-in for api.paystack.co (plain HTTP/1.1 with keep-alive)
+used by the payment tests and the Paystack client benchmark. It counts TCP
+connections and can add a per-connection delay to model the TLS handshake a
+real Paystack connection pays.
+"""
+import asyncio
+import json
+
+
+class StubPaystack:
+    def __init__(self, handshake_delay: float = 0.0):
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.requests: list[tuple[str, str]] = []
+        # Status codes to answer with before behaving normally, e.g. [502, 503]
+        self.fail_with: list[int] = []
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, path))
+
+                status, payload = self._respond(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if self.fail_with:
+            return self.fail_with.pop(0), {"status": False, "message": "stub failure"}
+        if method == "POST" and path == "/transaction/initialize":
+            reference = f"ref-{len(self.requests)}"
+            return 200, {"status": True, "data": {
+                "authorization_url": f"https://checkout.paystack.test/{reference}",
+                "access_code": reference,
+                "reference": reference,
+            }}
+        if method == "GET" and path.startswith("/transaction/verify/"):
+            reference = path.rsplit("/", 1)[1]
+            return 200, {"status": True, "data": {"status": "success", "reference": reference}}
+        return 404, {"status": False, "message": "not found"}
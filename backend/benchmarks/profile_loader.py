@@ -0,0 +1,57 @@
+"""
+Compares the single-statement profile loader with the per-table loader at
+10/100/1000 child rows per section: round trips and p50/p99 latency.
+Seeded users and profiles are left in place, so point it at a scratch database.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.profile_loader
+"""
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import count_statements, percentiles, print_table, timed
+from schema.schema import async_engine, users
+from services.profile_service import Profile
+
+ITERATIONS = 200
+
+
+async def seed(service: Profile, children: int) -> str:
+    user_id = str(uuid4())
+    async with async_engine.begin() as conn:
+        await conn.execute(insert(users).values(id=user_id, email=f"{user_id}@bench.local", password_hash="x"))
+    await service.create({
+        "full_name": "Bench User",
+        "skills": [f"skill-{i}" for i in range(children)],
+        "experience": [{"title": f"Role {i}", "company": "Acme", "start_date": datetime(2020, 1, 1),
+                        "description": "Shipped things " * 10} for i in range(children)],
+        "education": [{"institution": f"School {i}", "start_year": 2010, "end_year": 2014} for i in range(children)],
+        "certifications": [{"title": f"Cert {i}", "issuer": "Issuer", "issue_date": datetime(2021, 1, 1)} for i in range(children)],
+        "achievements": [{"title": f"Award {i}", "description": "Won", "achieved_at": datetime(2022, 1, 1)} for i in range(children)],
+        "projects": [{"title": f"Project {i}", "description": "Built", "link": "https://example.com"} for i in range(children)],
+    }, user_id)
+    return user_id
+
+
+async def main():
+    service = Profile(None, async_engine)
+    rows = []
+    for children in (10, 100, 1000):
+        user_id = await seed(service, children)
+        for name, loader in (("single_query", service._load_aggregate), ("per_table", service._load_aggregate_per_table)):
+            async def load():
+                async with async_engine.connect() as conn:
+                    await loader(conn, user_id)
+
+            with count_statements(async_engine) as counter:
+                await load()
+            samples = await timed(load, ITERATIONS if children < 1000 else ITERATIONS // 4)
+            rows.append({"children": children, "loader": name, "round_trips": counter["statements"], **percentiles(samples)})
+    print_table(rows)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
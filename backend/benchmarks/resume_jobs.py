@@ -0,0 +1,173 @@
+"""
+API latency while resumes are being generated: generation inline in the API
+process (/resume/generate) versus queued to resume_worker.py processes
+(/resume/jobs, followed over its events stream). At each load level, that
+many clients generate back to back for BENCH_SECONDS while a probe times
+GET /profile/user/{id} on the same app. The model is a stub writing
+BENCH_LLM_DELTAS chunks over BENCH_LLM_LATENCY_MS. Needs Redis and a migrated
+database; seeded users are left in place.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.resume_jobs
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import insert
+
+from benchmarks.common import percentiles, print_table
+from schema.schema import async_engine, payments, profiles, subscriptions, users
+from services.resume_engine import resume_engine
+from utils.helper import Helper
+
+LOADS = [int(n) for n in os.getenv("BENCH_LOADS", "0,25,100,200").split(",")]
+SECONDS = float(os.getenv("BENCH_SECONDS", 5))
+LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", 2000))
+DELTAS = int(os.getenv("BENCH_LLM_DELTAS", 400))
+WORKER_PROCESSES = int(os.getenv("RESUME_WORKER_PROCESSES", 2))
+# Enough concurrent jobs per worker process that throughput is not the bottleneck being measured
+os.environ.setdefault("RESUME_WORKERS", "100")
+JOB = "Backend engineer: Python, FastAPI, Postgres. " * 20
+
+
+class StubResponses:
+    """Stands in for client.responses: streams DELTAS chunks spread over LATENCY_MS."""
+
+    async def create(self, **kwargs):
+        return self._events()
+
+    async def _events(self):
+        for i in range(DELTAS):
+            await asyncio.sleep(LATENCY_MS / 1000 / DELTAS)
+            yield SimpleNamespace(type="response.output_text.delta", delta=f"<p>line {i}</p>")
+        usage = SimpleNamespace(input_tokens=500, output_tokens=DELTAS)
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(usage=usage))
+
+
+class StubClient:
+    def __init__(self):
+        self.responses = StubResponses()
+
+    async def close(self):
+        pass
+
+
+def install_stub():
+    resume_engine._client = StubClient()
+    # Every run should reach the model; a cache hit would hide the load
+    resume_engine.cache = None
+
+
+def stub_worker():
+    import resume_worker
+
+    install_stub()
+    resume_worker.run_process()
+
+
+async def seed(count: int) -> list[tuple[str, str]]:
+    """Users with a weekly plan and a profile; returns (user_id, token) pairs."""
+    now = datetime.utcnow()
+    rows = {"users": [], "payments": [], "subs": [], "profiles": []}
+    accounts = []
+    for _ in range(count):
+        user_id, payment_id = str(uuid4()), str(uuid4())
+        email = f"{user_id}@bench.local"
+        rows["users"].append({"id": user_id, "email": email, "password_hash": "x", "is_email_verified": True})
+        rows["payments"].append({"id": payment_id, "user_id": user_id, "amount": 5, "transaction_ref": f"bench-{payment_id}", "plan": "weekly"})
+        rows["subs"].append({"id": str(uuid4()), "user_id": user_id, "payments_id": payment_id, "plan_type": "weekly",
+                             "start_date": now, "expiry_date": now + timedelta(weeks=1)})
+        rows["profiles"].append({"id": str(uuid4()), "user_id": user_id, "full_name": "Bench User", "updated_at": now})
+        token = Helper.generate_jwt_token({"email": email, "role": "jobSeeker", "is_email_verified": True, "user_id": user_id})
+        accounts.append((user_id, token))
+    async with async_engine.begin() as conn:
+        for table in (users, payments, subscriptions, profiles):
+            await conn.execute(insert(table), rows[table.name])
+    return accounts
+
+
+async def read_stream(response: httpx.Response) -> int:
+    events = 0
+    async for line in response.aiter_lines():
+        if line.startswith("event: "):
+            events += 1
+            if line in ("event: done", "event: error"):
+                break
+    return events
+
+
+async def measure(client: httpx.AsyncClient, mode: str, accounts: list[tuple[str, str]], load: int) -> dict:
+    stop = time.perf_counter() + SECONDS
+    generated = 0
+
+    async def generator(token: str):
+        nonlocal generated
+        headers = {"Authorization": f"Bearer {token}"}
+        while time.perf_counter() < stop:
+            if mode == "inline":
+                async with client.stream("POST", "/resume/generate", json={"job_description": JOB}, headers=headers) as response:
+                    await read_stream(response)
+            else:
+                job = (await client.post("/resume/jobs", json={"job_description": JOB}, headers=headers)).json()
+                async with client.stream("GET", f"/resume/jobs/{job['id']}/events", headers=headers) as response:
+                    await read_stream(response)
+            generated += 1
+
+    async def probe(user_id: str) -> list[float]:
+        samples = []
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            (await client.get(f"/profile/user/{user_id}")).raise_for_status()
+            samples.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+        return samples
+
+    tasks = [asyncio.create_task(generator(token)) for _, token in accounts[1:load + 1]]
+    samples = await probe(accounts[0][0])
+    await asyncio.gather(*tasks)
+    return {"mode": mode, "generating": load, "probe_requests": len(samples), **percentiles(samples),
+            "resumes_per_s": round(generated / SECONDS, 1)}
+
+
+async def run(mode: str, accounts: list[tuple[str, str]]) -> list[dict]:
+    import main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None, limits=limits) as client:
+        await client.get(f"/profile/user/{accounts[0][0]}")  # warm the profile cache
+        return [await measure(client, mode, accounts, load) for load in LOADS]
+
+
+async def main():
+    from services.resume_jobs import resume_job_workers
+
+    accounts = await seed(max(LOADS) + 1)
+    install_stub()
+    rows = await run("inline", accounts)
+
+    await resume_job_workers.ensure_groups()
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=stub_worker) for _ in range(WORKER_PROCESSES)]
+    for worker in workers:
+        worker.start()
+    try:
+        rows += await run("jobs", accounts)
+    finally:
+        for worker in workers:
+            os.kill(worker.pid, signal.SIGTERM)
+            worker.join()
+
+    print(f"llm_latency_ms={LATENCY_MS:g} deltas={DELTAS} seconds={SECONDS:g} "
+          f"worker_processes={WORKER_PROCESSES} jobs_per_process={os.environ['RESUME_WORKERS']}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
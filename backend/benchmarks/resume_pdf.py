@@ -0,0 +1,104 @@
+"""
+Concurrent PDF renders (services/resume_pdf.py). For each pool size and
+concurrency level, that many clients download distinct resumes back to back
+for BENCH_SECONDS ("render": every download is a cache miss), then the same
+resume over and over ("cached"). Reports downloads per second, latency, and
+the peak resident memory of the API process and of the render workers
+together, sampled every 50 ms from /proc (Linux only). Needs no database or
+Redis; the cache goes to a temporary directory.
+
+    python -m benchmarks.resume_pdf
+"""
+import asyncio
+import os
+import tempfile
+import time
+from itertools import count
+
+from benchmarks.common import percentiles, print_table
+from services.resume_pdf import PdfRenderer
+
+SECONDS = float(os.getenv("BENCH_SECONDS", 5))
+CONCURRENCY = [int(n) for n in os.getenv("BENCH_CONCURRENCY", "1,4,16").split(",")]
+POOL_SIZES = [int(n) for n in os.getenv("BENCH_POOL_SIZES", f"1,{os.cpu_count() or 1}").split(",")]
+
+SECTION = (
+    "<h2>Backend engineer, Company {i}</h2><p><em>2019 - 2023</em></p><ul>"
+    + "<li>Built and ran FastAPI services on Postgres and Redis, cutting p99 latency by 40%.</li>" * 5
+    + "</ul>"
+)
+
+
+def resume(n: int) -> str:
+    """A two-page resume of about 6 KB; `n` makes it unique."""
+    return (f"<h1>Bench User {n}</h1><p>Nairobi · bench@example.com</p><hr>"
+            + "".join(SECTION.format(i=i) for i in range(8))
+            + "<h2>Skills</h2><p>Python, FastAPI, Postgres, Redis, Docker, Kubernetes</p>")
+
+
+def rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:  # a worker recycled between listing and reading
+        pass
+    return 0
+
+
+async def sample_memory(renderer: PdfRenderer, peaks: dict):
+    while True:
+        # The pool keeps no public list of its processes
+        workers = list((renderer._executor._processes or {}).keys()) if renderer._executor else []
+        peaks["api"] = max(peaks["api"], rss_kb(os.getpid()))
+        peaks["workers"] = max(peaks["workers"], sum(rss_kb(pid) for pid in workers))
+        await asyncio.sleep(0.05)
+
+
+async def measure(renderer: PdfRenderer, mode: str, clients: int, unique) -> dict:
+    stop = time.perf_counter() + SECONDS
+    samples = []
+    sent = 0
+    peaks = {"api": 0, "workers": 0}
+
+    async def client():
+        nonlocal sent
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            pdf = await renderer.open(resume(next(unique) if mode == "render" else 0))
+            with pdf:
+                sent += len(pdf.read())
+            samples.append(time.perf_counter() - start)
+
+    sampler = asyncio.create_task(sample_memory(renderer, peaks))
+    try:
+        await asyncio.gather(*(client() for _ in range(clients)))
+    finally:
+        sampler.cancel()
+    return {"workers": renderer.workers, "mode": mode, "clients": clients, "downloads": len(samples),
+            "per_s": round(len(samples) / SECONDS, 1), **percentiles(samples),
+            "avg_pdf_kb": round(sent / len(samples) / 1024, 1),
+            "api_rss_mb": round(peaks["api"] / 1024), "workers_rss_mb": round(peaks["workers"] / 1024)}
+
+
+async def main():
+    rows = []
+    unique = count(1)
+    for workers in POOL_SIZES:
+        with tempfile.TemporaryDirectory(prefix="bench-pdf-") as cache_dir:
+            renderer = PdfRenderer(workers=workers, max_pending=max(CONCURRENCY) * 2, cache_dir=cache_dir)
+            await renderer.start()
+            try:
+                await renderer.open(resume(0))  # load the renderer in the workers
+                for clients in CONCURRENCY:
+                    rows.append(await measure(renderer, "render", clients, unique))
+                    rows.append(await measure(renderer, "cached", clients, unique))
+            finally:
+                renderer.shutdown()
+    print(f"seconds={SECONDS:g} cpus={os.cpu_count()}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
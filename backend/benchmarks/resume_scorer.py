@@ -0,0 +1,82 @@
+"""
+Local relevance scoring (services/resume_scorer.py): time to build a
+profile's index and to score a job description against it, for small,
+typical and large profiles and job descriptions. Scoring is what the UI
+waits on and should stay well under 10 ms; building runs after profile
+writes. "score_cold" includes decoding the index from its cached JSON, as a
+worker without a local copy would. Needs no database or Redis.
+
+    python -m benchmarks.resume_scorer
+"""
+import json
+import os
+import random
+import time
+
+from benchmarks.common import percentiles, print_table
+from services.resume_scorer import SKILL_VOCABULARY, build_index, score_index
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 500))
+
+WORDS = (
+    "designed built led migrated reduced improved shipped owned maintained automated services platform "
+    "customers latency costs pipeline reports dashboards billing onboarding search checkout payments "
+    "internal tools mentoring hiring reliability incidents releases quarterly roadmap stakeholders"
+).split()
+
+# (experience items, projects, skills, words per description, job description words)
+SIZES = {
+    "small": (1, 0, 5, 40, 120),
+    "typical": (4, 3, 15, 120, 400),
+    "large": (15, 10, 60, 300, 900),
+}
+
+
+def text(rng: random.Random, words: int) -> str:
+    """Filler with a skill every ten words or so."""
+    return " ".join(rng.choice(SKILL_VOCABULARY) if rng.random() < 0.1 else rng.choice(WORDS) for _ in range(words))
+
+
+def make_profile(rng: random.Random, experience: int, projects: int, skills: int, words: int) -> dict:
+    return {
+        "full_name": "Bench User",
+        "skills": [{"skill_name": name} for name in rng.sample(SKILL_VOCABULARY, skills)],
+        "experience": [{"title": "Engineer", "company": f"Company {i}", "description": text(rng, words)} for i in range(experience)],
+        "projects": [{"title": f"Project {i}", "description": text(rng, words)} for i in range(projects)],
+        "certifications": [{"title": "AWS Certified Developer", "issuer": "Amazon"}],
+        "education": [{"institution": "University of Nairobi", "certificate_level": "BSc Computer Science"}],
+    }
+
+
+def timed(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    rng = random.Random(7)
+    rows = []
+    for size, (experience, projects, skills, words, job_words) in SIZES.items():
+        profile = make_profile(rng, experience, projects, skills, words)
+        job = text(rng, job_words)
+        index = build_index(profile)
+        raw = json.dumps(index)
+        result = score_index(index, job)
+        for operation, fn in (
+            ("build", lambda: build_index(profile)),
+            ("score", lambda: score_index(index, job)),
+            ("score_cold", lambda: score_index(json.loads(raw), job)),
+        ):
+            rows.append({"size": size, "operation": operation, "terms": len(index["weights"]),
+                         "index_kb": round(len(raw) / 1024, 1), "job_words": job_words,
+                         "matched": len(result["matched_skills"]), **percentiles(timed(fn, ITERATIONS))})
+    print(f"iterations={ITERATIONS}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Cold start: time from launching the app under uvicorn to its first 200
+(GET /), BENCH_RUNS times per mode.
+
+- migrations: the app as it is, with the lifespan only checking the
+  schema version
+- create_all: the app as it was, with metadata.create_all run at import
+  before the app starts (emulated by a launcher)
+
+`migrate.py upgrade` with nothing to apply is timed separately. It is the
+per-deploy step that replaced create_all, and it does not run on every
+start. Needs Redis and a migrated database.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.startup
+"""
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import percentiles, print_table, serve, wait_until_ready
+
+RUNS = int(os.getenv("BENCH_RUNS", 10))
+PORT = 8766
+
+CREATE_ALL_LAUNCHER = (
+    "from schema.schema import engine, metadata; metadata.create_all(engine); import uvicorn; "
+    f"uvicorn.run('main:app', port={PORT}, log_level='warning')"
+)
+
+
+def cold_start(command: list[str] | None) -> float:
+    start = time.perf_counter()
+    with serve(port=PORT, command=command) as (server, base_url):
+        wait_until_ready(base_url + "/", process=server)
+        return time.perf_counter() - start
+
+
+def main():
+    modes = {"migrations": None, "create_all": [sys.executable, "-c", CREATE_ALL_LAUNCHER]}
+    rows = []
+    for mode, command in modes.items():
+        samples = [cold_start(command) for _ in range(RUNS)]
+        rows.append({"mode": mode, "runs": RUNS, **percentiles(samples)})
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "migrate.py", "upgrade"], cwd=backend, check=True, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    rows.append({"mode": "migrate.py upgrade (no-op)", "runs": RUNS, **percentiles(samples)})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Replays BENCH_EVENTS signed charge.success webhooks through the app, then
+lets the worker pool drain them. Reports the webhook ack latency and the
+drain throughput. Half the events are replays of the other half, as in a
+Paystack retry storm. Needs Redis and a migrated database; seeded users and
+payments are left in place.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.webhook_ingest
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import insert
+
+from benchmarks.common import percentiles, print_table
+from schema.schema import async_engine, payments, users
+from services import webhook_service
+from utils.cache import redis_client
+
+EVENTS = int(os.getenv("BENCH_EVENTS", 10_000))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 64))
+WORKERS = int(os.getenv("PAYSTACK_WEBHOOK_WORKERS", 4))
+SECRET = os.environ.setdefault("PAYSTACK_SECRET_KEY", "sk_bench")
+
+
+async def seed(count: int) -> list[dict]:
+    user_rows, payment_rows, events = [], [], []
+    for _ in range(count):
+        user_id, reference = str(uuid4()), f"bench-{uuid4().hex}"
+        user_rows.append({"id": user_id, "email": f"{user_id}@bench.local", "password_hash": "x"})
+        payment_rows.append({"id": str(uuid4()), "user_id": user_id, "amount": 5, "transaction_ref": reference, "plan": "daily"})
+        events.append({"event": "charge.success", "data": {
+            "id": reference, "reference": reference, "amount": 500, "customer": {"email": f"{user_id}@bench.local"},
+        }})
+    async with async_engine.begin() as conn:
+        await conn.execute(insert(users), user_rows)
+        await conn.execute(insert(payments), payment_rows)
+    return events
+
+
+async def main():
+    import main as app_module
+
+    unique = await seed(EVENTS // 2)
+    bodies = [json.dumps(event).encode() for event in unique * 2][:EVENTS]
+    signatures = [hmac.new(SECRET.encode(), body, hashlib.sha512).hexdigest() for body in bodies]
+
+    await webhook_service.webhook_workers.ensure_group()
+    transport = httpx.ASGITransport(app=app_module.app)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    samples = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def deliver(body: bytes, signature: str):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/paystack/webhook", content=body, headers={"x-paystack-signature": signature})
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(deliver(body, signature) for body, signature in zip(bodies, signatures)))
+        ingest_seconds = time.perf_counter() - start
+
+    pool = webhook_service.WebhookWorkerPool(workers=WORKERS, block_ms=100)
+    start = time.perf_counter()
+    await pool.start()
+    while pool.processed < EVENTS:
+        await asyncio.sleep(0.01)
+    drain_seconds = time.perf_counter() - start
+    await pool.stop()
+
+    print(f"{EVENTS} events ({len(unique)} unique), {CONCURRENCY} concurrent deliveries, {WORKERS} workers")
+    print_table([
+        {"phase": "webhook ack", **percentiles(samples), "events_per_s": round(EVENTS / ingest_seconds)},
+        {"phase": "worker drain", "p50_ms": "-", "p99_ms": "-", "events_per_s": round(EVENTS / drain_seconds)},
+    ])
+    await redis_client.aclose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes.v1 import auth 
 from routes.v1 import profile
 from routes.v1 import payment
+from routes.v1 import diagnostics
+from routes.v1 import resume
+from utils.hashing import password_hasher
+from schema.schema import async_engine
+from migrations import verify_schema_version
+from utils.cache import listen_for_invalidations
+from services.payment_service import paystack
+from services.webhook_service import webhook_workers
+from services.mail_service import mail_workers
+from services.resume_engine import resume_engine
+from services.resume_pdf import pdf_renderer
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await verify_schema_version(async_engine)
+    await password_hasher.start()
+    await pdf_renderer.start()
+    await paystack.start()
+    invalidation_listener = asyncio.create_task(listen_for_invalidations())
+    await webhook_workers.start()
+    await mail_workers.start()
+    yield
+    await mail_workers.stop()
+    await webhook_workers.stop()
+    invalidation_listener.cancel()
+    password_hasher.shutdown()
+    pdf_renderer.shutdown()
+    await paystack.aclose()
+    await resume_engine.aclose()
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 origins = [
@@ -28,3 +60,5 @@ def read_root():
 app.include_router(auth.router)
 app.include_router(profile.profileRouter)
 app.include_router(payment.paymentRoute)
+app.include_router(diagnostics.diagnosticsRouter)
+app.include_router(resume.resumeRouter)
@@ -0,0 +1,29 @@
+"""
+Database migration CLI, run once per deploy before starting the app.
+
+    python migrate.py upgrade   # apply pending migrations
+    python migrate.py current   # print the applied and expected versions
+"""
+import sys
+
+from schema.schema import engine
+import migrations
+
+
+def main(argv: list[str]) -> int:
+    command = argv[1] if len(argv) > 1 else "upgrade"
+
+    if command == "upgrade":
+        applied = migrations.upgrade(engine)
+        print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+    elif command == "current":
+        with engine.connect() as conn:
+            print(f"current={migrations.current_version(conn)} head={migrations.HEAD_VERSION}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
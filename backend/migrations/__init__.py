@@ -0,0 +1,77 @@
+"""
+Small built-in migration runner. Each migration is a module in this package
+exposing VERSION, NAME and upgrade(conn), plus TRANSACTIONAL = False for
+migrations that must run in autocommit mode; they are applied in order by
+`python migrate.py upgrade` and recorded in the schema_version table.
+
+Migrations declare their own DDL rather than importing schema/schema.py, so
+an old migration keeps doing exactly what it did when it was written.
+"""
+from sqlalchemy import func, insert, inspect, select
+
+from schema.schema import schema_version, version_metadata
+from utils.logger import logger
+from migrations import (
+    m0001_initial, m0002_lookup_indexes, m0003_unique_subscription_payment, m0004_resume_generation_runs,
+    m0005_resume_cache, m0006_resume_jobs,
+)
+
+MIGRATIONS = [
+    m0001_initial,
+    m0002_lookup_indexes,
+    m0003_unique_subscription_payment,
+    m0004_resume_generation_runs,
+    m0005_resume_cache,
+    m0006_resume_jobs,
+]
+HEAD_VERSION = MIGRATIONS[-1].VERSION
+
+
+def current_version(conn) -> int:
+    if not inspect(conn).has_table(schema_version.name, schema=schema_version.schema):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def record_version(conn, migration):
+    conn.execute(insert(schema_version).values(version=migration.VERSION, name=migration.NAME))
+
+
+def upgrade(engine) -> list[int]:
+    """Applies every pending migration, each in its own transaction unless it opts out."""
+    applied = []
+    with engine.begin() as conn:
+        version_metadata.create_all(conn, checkfirst=True)
+    for migration in MIGRATIONS:
+        with engine.connect() as conn:
+            if migration.VERSION <= current_version(conn):
+                continue
+        logger.info(f"Applying migration {migration.VERSION}: {migration.NAME}")
+        if getattr(migration, "TRANSACTIONAL", True):
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                record_version(conn, migration)
+        else:
+            # e.g. CREATE INDEX CONCURRENTLY, which Postgres refuses inside a transaction;
+            # such migrations must be safe to re-run if they fail halfway
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                migration.upgrade(conn)
+            with engine.begin() as conn:
+                record_version(conn, migration)
+        applied.append(migration.VERSION)
+    return applied
+
+
+async def verify_schema_version(async_engine):
+    """
+    Called on app startup instead of creating tables. Fails fast if the
+    database has not been migrated to the version this code expects.
+    """
+    async with async_engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    if version < HEAD_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {HEAD_VERSION}. "
+            "Run `python migrate.py upgrade` first."
+        )
+    logger.info(f"Database schema version {version}")
@@ -0,0 +1,28 @@
+"""DDL helpers shared by migrations. Keep these behaviour-stable: old migrations call them."""
+from sqlalchemy import Column, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+
+def drop_invalid_indexes(conn, schema: str, names: list[str]):
+    """
+    Postgres only. An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID
+    index behind that a checkfirst create would skip; drop it so it is rebuilt.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    invalid = conn.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE NOT i.indisvalid AND n.nspname = :schema AND c.relname = ANY(:names)"
+    ), {"schema": schema, "names": names}).scalars().all()
+    for name in invalid:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {schema}."{name}"'))
+
+
+def add_column(conn, schema: str, table: str, column: Column):
+    """ALTER TABLE ... ADD COLUMN, skipped if the column already exists."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table, schema=schema)}
+    if column.name in existing:
+        return
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f'ALTER TABLE {schema}."{table}" ADD COLUMN {ddl}'))
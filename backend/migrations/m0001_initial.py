@@ -0,0 +1,131 @@
+"""
+Baseline schema, frozen as it was when the migration runner was introduced.
+Later schema changes belong in new migrations, not here.
+"""
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text
+
+VERSION = 1
+NAME = "initial schema"
+
+SCHEMA_NAME = "public"
+metadata = MetaData(schema=SCHEMA_NAME)
+
+Table(
+    "users", metadata,
+    Column("id", String, primary_key=True),
+    Column("email", String, unique=True, nullable=False),
+    Column("password_hash", String, nullable=False),
+    Column("is_active", Boolean, default=False),
+    Column("plan", String, default="free"),
+    Column("is_email_verified", Boolean, default=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("role", String, default="jobSeeker"),
+)
+
+Table(
+    "profiles", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id")),
+    Column("full_name", String),
+    Column("linkedin", String),
+    Column("github", String),
+    Column("website", String),
+    Column("phone", String),
+    Column("country", String),
+    Column("city", String),
+    Column("updated_at", DateTime, default=datetime.utcnow),
+)
+
+Table(
+    "projects", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id", ondelete="CASCADE"), nullable=False),
+    Column("title", String, nullable=True),
+    Column("description", String, nullable=True),
+    Column("link", String, nullable=True),
+)
+
+Table(
+    "skills", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("skill_name", String, nullable=True),
+)
+
+Table(
+    "experience", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("title", String),
+    Column("position", String),
+    Column("company", String),
+    Column("start_date", DateTime),
+    Column("end_date", DateTime),
+    Column("description", Text),
+)
+
+Table(
+    "education", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("institution", String),
+    Column("certificate_level", String),
+    Column("start_year", Integer),
+    Column("end_year", Integer),
+)
+
+Table(
+    "certifications", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("title", String),
+    Column("issuer", String),
+    Column("issue_date", DateTime),
+    Column("expiration_date", DateTime),
+)
+
+Table(
+    "achievements", metadata,
+    Column("id", String, primary_key=True),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("title", String),
+    Column("description", Text),
+    Column("achieved_at", DateTime),
+)
+
+Table(
+    "payments", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id")),
+    Column("amount", Float),
+    Column("currency", String, default="Kes"),
+    Column("payment_date", DateTime, default=datetime.utcnow),
+    Column("metadata", JSON),
+    Column("method", String, nullable=True),
+    Column("transaction_ref", String, nullable=True),
+    Column("plan", String),
+)
+
+Table(
+    "subs", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id")),
+    Column("payments_id", String, ForeignKey(f"{SCHEMA_NAME}.payments.id")),
+    Column("plan_type", String, nullable=False),
+    Column("start_date", DateTime),
+    Column("expiry_date", DateTime),
+)
+
+Table(
+    "resume_generations", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False),
+    Column("generated_at", DateTime, default=datetime.utcnow),
+)
+
+
+def upgrade(conn):
+    # checkfirst so databases created by the old import-time create_all adopt this version
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,73 @@
+"""
+Indexes on the columns the services filter by. The tables are declared here
+with only the indexed column so this migration does not follow later edits
+to schema/schema.py.
+
+On Postgres the indexes are built CONCURRENTLY so writes keep flowing while
+they build, which is why this migration runs outside a transaction.
+"""
+from sqlalchemy import Column, Index, MetaData, String, Table, func, select
+
+from migrations.helpers import drop_invalid_indexes
+
+VERSION = 2
+NAME = "indexes on hot lookup columns"
+TRANSACTIONAL = False
+
+SCHEMA_NAME = "public"
+metadata = MetaData(schema=SCHEMA_NAME)
+
+profiles = Table("profiles", metadata, Column("id", String), Column("user_id", String))
+payments = Table("payments", metadata, Column("id", String), Column("transaction_ref", String))
+
+INDEXES = [
+    Index("ix_public_profiles_user_id", profiles.c.user_id, unique=True, postgresql_concurrently=True),
+    Index("ix_public_payments_transaction_ref", payments.c.transaction_ref, unique=True, postgresql_concurrently=True),
+    Index("ix_public_subs_user_id", Table("subs", metadata, Column("user_id", String)).c.user_id, postgresql_concurrently=True),
+    Index(
+        "ix_public_resume_generations_user_id",
+        Table("resume_generations", metadata, Column("user_id", String)).c.user_id,
+        postgresql_concurrently=True,
+    ),
+] + [
+    Index(
+        f"ix_public_{table}_profile_id",
+        Table(table, metadata, Column("profile_id", String)).c.profile_id,
+        postgresql_concurrently=True,
+    )
+    for table in ("projects", "skills", "experience", "education", "certifications", "achievements")
+]
+
+
+def find_duplicates(conn, column) -> dict[str, list[str]]:
+    """Maps each value that appears more than once in `column` to the ids of its rows."""
+    table = column.table
+    duplicated = (
+        select(column)
+        .where(column.isnot(None))
+        .group_by(column)
+        .having(func.count() > 1)
+    )
+    rows = conn.execute(select(column, table.c.id).where(column.in_(duplicated)).order_by(column, table.c.id))
+    duplicates: dict[str, list[str]] = {}
+    for value, row_id in rows:
+        duplicates.setdefault(value, []).append(row_id)
+    return duplicates
+
+
+def check_unique(conn):
+    problems = []
+    for column in (profiles.c.user_id, payments.c.transaction_ref):
+        for value, ids in find_duplicates(conn, column).items():
+            problems.append(f"{column.table.name}.{column.name}={value!r} on rows {', '.join(ids)}")
+    if problems:
+        raise RuntimeError(
+            "Cannot build the unique indexes, resolve these duplicates first:\n  " + "\n  ".join(problems)
+        )
+
+
+def upgrade(conn):
+    check_unique(conn)
+    drop_invalid_indexes(conn, SCHEMA_NAME, [index.name for index in INDEXES])
+    for index in INDEXES:
+        index.create(conn, checkfirst=True)
@@ -0,0 +1,39 @@
+"""
+One subscription per payment, so activation can be an ON CONFLICT upsert.
+Duplicate rows created by replayed webhooks before this change are removed
+first; they are copies of the same activation, so one per payment is kept. Built CONCURRENTLY
+on Postgres like m0002.
+"""
+from sqlalchemy import Column, Index, MetaData, String, Table, delete, select
+
+from migrations.helpers import drop_invalid_indexes
+from utils.logger import logger
+
+VERSION = 3
+NAME = "unique subscription per payment"
+TRANSACTIONAL = False
+
+SCHEMA_NAME = "public"
+metadata = MetaData(schema=SCHEMA_NAME)
+
+subs = Table(
+    "subs", metadata,
+    Column("id", String),
+    Column("payments_id", String),
+)
+
+INDEX = Index("ix_public_subs_payments_id", subs.c.payments_id, unique=True, postgresql_concurrently=True)
+
+
+def remove_duplicates(conn) -> int:
+    keep = subs.alias("keep")
+    redundant = select(keep.c.id).where(keep.c.payments_id == subs.c.payments_id, keep.c.id < subs.c.id).exists()
+    return conn.execute(delete(subs).where(subs.c.payments_id.isnot(None), redundant)).rowcount
+
+
+def upgrade(conn):
+    removed = remove_duplicates(conn)
+    if removed:
+        logger.info(f"Removed {removed} duplicate subscriptions before adding the unique index")
+    drop_invalid_indexes(conn, SCHEMA_NAME, [INDEX.name])
+    INDEX.create(conn, checkfirst=True)
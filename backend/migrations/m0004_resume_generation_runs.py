@@ -0,0 +1,29 @@
+"""
+Records each resume generation run: its status, model, input, output and
+token usage. Rows written before this migration were completed runs, so
+status is backfilled with 'completed'.
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+from migrations.helpers import add_column
+
+VERSION = 4
+NAME = "resume generation runs"
+
+SCHEMA_NAME = "public"
+
+COLUMNS = [
+    Column("status", String, nullable=False, server_default="completed"),
+    Column("model", String),
+    Column("job_description", Text),
+    Column("output", Text),
+    Column("error", Text),
+    Column("input_tokens", Integer),
+    Column("output_tokens", Integer),
+    Column("completed_at", DateTime),
+]
+
+
+def upgrade(conn):
+    for column in COLUMNS:
+        add_column(conn, SCHEMA_NAME, "resume_generations", column)
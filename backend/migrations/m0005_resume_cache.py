@@ -0,0 +1,32 @@
+"""
+Cache of generated resumes, keyed by a hash of the profile, job description,
+model and prompt version. Outputs are stored zlib-compressed; last_used_at
+orders LRU eviction.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, MetaData, String, Table
+
+VERSION = 5
+NAME = "resume cache"
+
+SCHEMA_NAME = "public"
+metadata = MetaData(schema=SCHEMA_NAME)
+
+Table("users", metadata, Column("id", String, primary_key=True))
+
+resume_cache = Table(
+    "resume_cache", metadata,
+    Column("key", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False, index=True),
+    Column("profile_updated_at", DateTime),
+    Column("model", String, nullable=False),
+    Column("output", LargeBinary, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("last_used_at", DateTime, default=datetime.utcnow, index=True),
+)
+
+
+def upgrade(conn):
+    resume_cache.create(conn, checkfirst=True)
@@ -0,0 +1,34 @@
+"""
+Queued resume generations. A job links to the resume_generations row its
+worker produced once the run starts.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, MetaData, String, Table, Text
+
+VERSION = 6
+NAME = "resume jobs"
+
+SCHEMA_NAME = "public"
+metadata = MetaData(schema=SCHEMA_NAME)
+
+Table("users", metadata, Column("id", String, primary_key=True))
+Table("resume_generations", metadata, Column("id", String, primary_key=True))
+
+resume_jobs = Table(
+    "resume_jobs", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False, index=True),
+    Column("generation_id", String, ForeignKey(f"{SCHEMA_NAME}.resume_generations.id")),
+    Column("job_description", Text, nullable=False),
+    Column("priority", String, nullable=False),
+    Column("status", String, nullable=False, default="queued"),
+    Column("error", Text),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("started_at", DateTime),
+    Column("finished_at", DateTime),
+)
+
+
+def upgrade(conn):
+    resume_jobs.create(conn, checkfirst=True)
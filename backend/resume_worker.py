@@ -0,0 +1,68 @@
+"""
+Runs the resume generation workers in their own processes, so slow model
+calls never hold an API worker. Start it alongside the API, after migrations:
+
+    python resume_worker.py      # RESUME_WORKER_PROCESSES processes
+    python resume_worker.py 4    # 4 processes
+
+Each process runs RESUME_WORKERS jobs at a time (see services/resume_jobs.py).
+SIGINT or SIGTERM stops taking new jobs; a job cut off mid-generation is
+reclaimed and rerun by another worker.
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+
+from migrations import verify_schema_version
+from schema.schema import async_engine
+from services.resume_engine import resume_engine
+from services.resume_jobs import resume_job_workers
+from utils.logger import logger
+
+RESUME_WORKER_PROCESSES = int(os.getenv("RESUME_WORKER_PROCESSES", 2))
+
+
+async def serve():
+    await verify_schema_version(async_engine)
+    await resume_job_workers.start()
+    logger.info(f"[Resume jobs] Worker process {os.getpid()} running {resume_job_workers.workers} jobs at a time")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    await resume_job_workers.stop()
+    await resume_engine.aclose()
+    await async_engine.dispose()
+
+
+def run_process():
+    asyncio.run(serve())
+
+
+def main(argv: list[str]) -> int:
+    processes = int(argv[1]) if len(argv) > 1 else RESUME_WORKER_PROCESSES
+    # spawn, not fork: every process gets its own event loop, Redis and database pools
+    context = multiprocessing.get_context("spawn")
+    children = [context.Process(target=run_process, name=f"resume-worker-{i}") for i in range(processes)]
+    for child in children:
+        child.start()
+
+    def forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for child in children:
+        child.join()
+    return max(child.exitcode or 0 for child in children)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,55 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.requests import Request 
 from fastapi.responses import JSONResponse
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED
-from utils.helper import Helper, email_verified_required
-from schema.schema import engine
+from utils.helper import helper, email_verified_required
+from schema.schema import async_engine
 from services.auth_service import AuthService
-from schema.auth import RegisterRequest, LoginRequest, SendOtpRequest, verifyEmailRequest, forgotPasswordRequest
+from schema.auth import RegisterRequest, LoginRequest, SendOtpRequest, verifyEmailRequest, forgotPasswordRequest, RefreshRequest, LogoutRequest
 from fastapi.security import OAuth2PasswordRequestForm
+from utils.rate_limit import (
+    rate_limit, login_by_ip, login_by_email, send_otp_by_ip, send_otp_by_email, update_password_by_ip,
+    update_password_by_email,
+)
 
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
-helper = Helper()
 
 def get_auth_service():
-    return AuthService(helper, engine)
+    return AuthService(helper, async_engine)
 
 @router.post("/register")
-def register_user(data: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)):
-    return auth_service.register(data.dict())
+async def register_user(data: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)):
+    return await auth_service.register(data.dict())
+
+login_limits = [Depends(rate_limit(login_by_ip)), Depends(rate_limit(login_by_email, by="email"))]
+
+@router.post("/login", dependencies=login_limits)
+async def login_user(data: LoginRequest, background_tasks: BackgroundTasks, auth_service: AuthService = Depends(get_auth_service)):
+    return await auth_service.login(data.dict(), background_tasks)
+
+@router.post("/token", dependencies=login_limits)
+async def token(background_tasks: BackgroundTasks, auth_service: AuthService = Depends(get_auth_service), form_data: OAuth2PasswordRequestForm = Depends()):
+    return await auth_service.token(form_data, background_tasks)
 
-@router.post("/login")
-def login_user(data: LoginRequest, auth_service: AuthService = Depends(get_auth_service)):
-    return auth_service.login(data.dict())
+@router.post("/refresh")
+async def refresh_token(data: RefreshRequest, auth_service: AuthService = Depends(get_auth_service)):
+    return await auth_service.refresh(data.refresh_token)
 
-@router.post("/token")
-def token(auth_service: AuthService = Depends(get_auth_service), form_data: OAuth2PasswordRequestForm = Depends()):
-    return auth_service.token(form_data)
+@router.post("/logout")
+async def logout(data: LogoutRequest, auth_service: AuthService = Depends(get_auth_service), claims: dict = Depends(helper.get_current_claims)):
+    return await auth_service.logout(claims, data.refresh_token)
 
-@router.post("/send-otp")
+@router.post("/send-otp", dependencies=[Depends(rate_limit(send_otp_by_ip)), Depends(rate_limit(send_otp_by_email, by="email"))])
 async def send_otp(data: SendOtpRequest, auth_service: AuthService = Depends(get_auth_service)):
     try:
-        otp = await auth_service.generate_and_store_otp(data.email)
-        result = await auth_service.send_email(email=data.email, otp_code=otp)
-        print("res: ", result)
-
-        if result.get("status") == "success":
-            return JSONResponse(content={"message": "OTP sent successfully"}, status_code=HTTP_200_OK)
-        else:
-            raise HTTPException(status_code=500, detail="Failed to send OTP")
+        otp = await auth_service.generate_and_store_otp(data.email, data.purpose)
+        await auth_service.send_email(email=data.email, otp_code=otp)
+        return JSONResponse(content={"message": "OTP sent successfully"}, status_code=HTTP_200_OK)
     except Exception as e:
         print("unable to send otp: ", e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.post('/verify-otp')
-async def email_verification(data: verifyEmailRequest, auth_service: AuthService = Depends(get_auth_service), user_id: str = Depends(Helper().get_current_user_id)):
+async def email_verification(data: verifyEmailRequest, auth_service: AuthService = Depends(get_auth_service), user_id: str = Depends(helper.get_current_user_id)):
     token = await auth_service.verify_email(user_id, data.otp)
     return token
 
-@router.post('/update-password')
+@router.post('/update-password', dependencies=[Depends(rate_limit(update_password_by_ip)), Depends(rate_limit(update_password_by_email, by="email"))])
 async def updatePassword(data: forgotPasswordRequest, auth_service: AuthService = Depends(get_auth_service)):
     result = await auth_service.update_password(data.email, data.otp, data.new_password)
     return result 
\ No newline at end of file
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends
+from utils.helper import helper
+from utils.hashing import password_hasher
+from utils.db_pool import pool_stats
+from schema.schema import async_engine
+from services.auth_service import AuthService
+from services.profile_service import profile_cache
+from services.entitlement_service import entitlement_cache
+from services.identity_service import identity_cache
+from services.mail_service import mail_workers
+from services.resume_engine import resume_engine
+from services.resume_jobs import resume_job_queue
+from services.resume_pdf import pdf_renderer
+from utils.tokens import token_verifier
+
+diagnosticsRouter = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"]
+)
+
+@diagnosticsRouter.get("/hashing", response_model=dict)
+async def hashing_pool_stats(admin_id: str = Depends(helper.require_admin)):
+    """Current state of the password hashing pool."""
+    return password_hasher.stats()
+
+@diagnosticsRouter.get("/password-costs", response_model=dict)
+async def password_cost_distribution(admin_id: str = Depends(helper.require_admin)):
+    """How many users are still on each bcrypt cost level."""
+    return await AuthService(helper, async_engine).password_cost_distribution()
+
+@diagnosticsRouter.get("/db-pool", response_model=dict)
+async def db_pool_stats(admin_id: str = Depends(helper.require_admin)):
+    """Connection pool usage and checkout wait times for the async engine."""
+    return pool_stats(async_engine.pool)
+
+@diagnosticsRouter.get("/profile-cache", response_model=dict)
+async def profile_cache_stats(admin_id: str = Depends(helper.require_admin)):
+    """Hit/miss counters for the assembled profile cache."""
+    return profile_cache.stats()
+
+@diagnosticsRouter.get("/entitlement-cache", response_model=dict)
+async def entitlement_cache_stats(admin_id: str = Depends(helper.require_admin)):
+    """Hit/miss counters for the active-plan cache."""
+    return entitlement_cache.stats()
+
+@diagnosticsRouter.get("/identity-cache", response_model=dict)
+async def identity_cache_stats(admin_id: str = Depends(helper.require_admin)):
+    """Hit/miss counters for the user identity cache."""
+    return identity_cache.stats()
+
+@diagnosticsRouter.get("/mail", response_model=dict)
+async def mail_stats(admin_id: str = Depends(helper.require_admin)):
+    """Transport and sent/dead-lettered counters of this worker's mailers."""
+    return mail_workers.stats()
+
+@diagnosticsRouter.get("/tokens", response_model=dict)
+async def token_verifier_stats(admin_id: str = Depends(helper.require_admin)):
+    """Algorithm and claims-cache counters of the JWT verifier in this worker."""
+    return token_verifier.stats()
+
+@diagnosticsRouter.get("/resume-cache", response_model=dict)
+async def resume_cache_stats(admin_id: str = Depends(helper.require_admin)):
+    """Hit ratio of this worker's generated-resume cache, plus its size across all workers."""
+    return await resume_engine.cache.stats()
+
+@diagnosticsRouter.get("/resume-jobs", response_model=dict)
+async def resume_job_stats(admin_id: str = Depends(helper.require_admin)):
+    """Queued and running resume jobs per priority lane."""
+    return await resume_job_queue.stats()
+
+@diagnosticsRouter.get("/pdf-renderer", response_model=dict)
+async def pdf_renderer_stats(admin_id: str = Depends(helper.require_admin)):
+    """Current state of this worker's PDF render pool and the size of the shared PDF cache."""
+    return pdf_renderer.stats()
@@ -4,10 +4,14 @@ from fastapi import (
 )
 from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
-from services.payment_service import Paystack
-from utils.helper import Helper
-from schema.schema import engine, users, payments
+from services.payment_service import paystack
+from services.webhook_service import enqueue_event
+from services.entitlement_service import get_entitlement
+from services.identity_service import get_identity
+from utils.helper import helper
+from schema.schema import async_engine, payments
 from sqlalchemy import insert
+from redis.exceptions import RedisError
 from datetime import datetime
 import os, hmac, hashlib, uuid, logging
 
@@ -15,8 +19,6 @@ CALLBACK_URL = os.getenv("PAYSTACK_CALLBACK_URL")
 SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY", "").encode()
 VALID_PLANS = {"daily", "weekly", "monthly"}  
 
-paystack = Paystack()
-helper = Helper()
 logger = logging.getLogger(__name__)
 
 class PaymentRequest(BaseModel):
@@ -40,10 +42,7 @@ async def initiate_payment(
         raise HTTPException(status_code=400, detail="Invalid data plan")
 
     try:
-        with engine.connect() as conn:
-            user = conn.execute(
-                users.select().where(users.c.id == user_id)
-            ).mappings().fetchone()
+        user = await get_identity(user_id=user_id)
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -60,8 +59,8 @@ async def initiate_payment(
         tx_data = response["data"]
         reference = tx_data["reference"]
 
-        with engine.begin() as conn:
-            conn.execute(
+        async with async_engine.begin() as conn:
+            await conn.execute(
                 insert(payments).values(
                     id=str(uuid.uuid4()),
                     user_id=user_id,
@@ -83,6 +82,13 @@ async def initiate_payment(
         logger.exception("Failed to initiate payment")
         raise HTTPException(status_code=500, detail="Payment initialization failed")
 
+@paymentRoute.get("/subscription", status_code=status.HTTP_200_OK)
+async def current_subscription(user_id: str = Depends(helper.get_current_user_id)):
+    """
+    The caller's current plan and when it expires.
+    """
+    return await get_entitlement(user_id)
+
 @paymentRoute.get("/callback")
 async def payment_callback(request: Request):
     """
@@ -103,46 +109,21 @@ async def payment_callback(request: Request):
 @paymentRoute.post("/webhook")
 async def paystack_webhook(request: Request, x_paystack_signature: str = Header(None)):
     """
-    Secure webhook to handle Paystack events server-to-server.
+    Secure webhook to handle Paystack events server-to-server. Verified events
+    are queued and applied by the webhook workers, so this returns right away.
     """
     body = await request.body()
     secret_key = os.getenv("PAYSTACK_SECRET_KEY", "").encode()
     computed_signature = hmac.new(secret_key, body, hashlib.sha512).hexdigest()
 
-    if computed_signature != x_paystack_signature:
+    if not x_paystack_signature or not hmac.compare_digest(computed_signature, x_paystack_signature):
         return JSONResponse(content={"status": "unauthorized"}, status_code=401)
 
-    payload = await request.json()
-    event = payload.get("event")
-
-    if event == "charge.success":
-        data = payload["data"]
-        email = data["customer"]["email"]
-        reference = data["reference"]
-        amount = data["amount"] / 100
-
-        with engine.connect() as conn:
-            user_result = conn.execute(users.select().where(users.c.email == email)).mappings().fetchone()
-            if not user_result:
-                print(f"User with email {email} not found.")
-                return {"status": "user not found"}
-
-            user_id = user_result["id"]
-
-            payment_result = conn.execute(payments.select().where(payments.c.transaction_ref == reference)).mappings().fetchone()
-            print(payment_result)
-            if not payment_result:
-                print(f"Payment with ref {reference} not found.")
-                return {"status": "payment not found"}
-
-            payment_id = payment_result["id"]
-            plan_type = payment_result["plan"]
-
-        try:
-            helper.activate_subscription(user_id, plan_type, payment_id)
-            print(f"[Webhook] Subscription activated for {email} - {plan_type}")
-        except Exception as e:
-            print(f"[Webhook] Activation error: {e}")
-            return {"status": "activation failed"}
+    try:
+        await enqueue_event(body)
+    except RedisError:
+        # Paystack retries non-2xx deliveries, so the event is not lost
+        logger.exception("Failed to queue Paystack webhook")
+        return JSONResponse(content={"status": "unavailable"}, status_code=503)
 
-    return {"status": "success"}
\ No newline at end of file
+    return {"status": "queued"}
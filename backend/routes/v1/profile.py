@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
 from starlette.status import HTTP_201_CREATED
-from utils.helper import Helper
-from schema.schema import engine
+from utils.helper import helper
+from schema.schema import async_engine
 from services.profile_service import Profile
-from schema.profile import ProfileCreate, ProfileUpdate, SkillCreate, SkillUpdate, EducationCreate, EducationUpdate, ExperienceCreate, ExperienceUpdate, CertificationCreate, CertificationUpdate, AchievementCreate, AchievementUpdate
+from schema.profile import ProfileCreate, ProfileBulkItem, ProfileUpdate, SkillCreate, SkillUpdate, EducationCreate, EducationUpdate, ExperienceCreate, ExperienceUpdate, CertificationCreate, CertificationUpdate, AchievementCreate, AchievementUpdate
 from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST
 
 
@@ -12,112 +13,122 @@ profileRouter = APIRouter(
     tags=["Profile"]
 )
 
-def get_helper():
-    return Helper()
+profile_service = Profile(helper, async_engine)
 
-def get_profile_service(helper: Helper = Depends(get_helper)):
-    return Profile(helper, engine)
+def get_profile_service():
+    return profile_service
+
+async def owned_profile_id(profile_id: str, profile_service: Profile = Depends(get_profile_service), user_id: str = Depends(helper.get_current_user_id)) -> str:
+    """Resolves the path's profile_id, rejecting callers that do not own it."""
+    await profile_service.assert_owner(profile_id, user_id)
+    return profile_id
 
 @profileRouter.post("/", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_profile(data: ProfileCreate, profile_service: Profile = Depends(get_profile_service),user_id: str = Depends(Helper().get_current_user_id)):
+async def create_profile(data: ProfileCreate, profile_service: Profile = Depends(get_profile_service),user_id: str = Depends(helper.get_current_user_id)):
     """Create a new profile with optional related data."""
-    return profile_service.create(data.dict(), user_id)
+    return await profile_service.create(data.dict(), user_id)
+
+@profileRouter.post("/bulk", response_model=dict, status_code=HTTP_201_CREATED)
+async def bulk_create_profiles(data: List[ProfileBulkItem], profile_service: Profile = Depends(get_profile_service), admin_id: str = Depends(helper.require_admin)):
+    """Create many profiles in one request (admin only, used by migration jobs)."""
+    return await profile_service.bulk_create([item.dict() for item in data])
+
 @profileRouter.get("/{profile_id}", response_model=dict, status_code=200)
 async def get_profile(profile_id: str, profile_service: Profile = Depends(get_profile_service)):
     """Retrieve a profile by profile_id."""
-    return profile_service.read(profile_id)
+    return await profile_service.read(profile_id)
 
 @profileRouter.get("/user/{user_id}", response_model=dict, status_code=200)
 async def get_profile_by_user(user_id: str, profile_service: Profile = Depends(get_profile_service)):
     """Retrieve a profile by user_id with related data."""
-    return profile_service.get_by_user_id(user_id)
+    return await profile_service.get_by_user_id(user_id)
 
 @profileRouter.put("/{profile_id}", response_model=dict, status_code=200)
-async def update_profile(profile_id: str, data: ProfileUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_profile(profile_id: str, data: ProfileUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update an existing profile."""
-    return profile_service.update(profile_id, data.dict(exclude_unset=True))
+    return await profile_service.update("profiles", profile_id, profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.delete("/{profile_id}", response_model=dict, status_code=200)
-async def delete_profile(profile_id: str, profile_service: Profile = Depends(get_profile_service)):
+async def delete_profile(profile_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a profile and its associated data."""
-    return profile_service.delete(profile_id)
+    return await profile_service.delete("profiles", profile_id, profile_id)
 
 # Skill Endpoints
 @profileRouter.post("/{profile_id}/skills", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_skill(profile_id: str, data: SkillCreate, profile_service: Profile = Depends(get_profile_service)):
+async def create_skill(profile_id: str, data: SkillCreate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Create a new skill for a profile."""
-    return profile_service.create_skill(profile_id, data.skill_name)
+    return await profile_service.add_item("skills", profile_id, data.skill_name)
 
 @profileRouter.put("/{profile_id}/skills/{skill_id}", response_model=dict, status_code=HTTP_200_OK)
-async def update_skill(profile_id: str, skill_id: str, data: SkillUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_skill(profile_id: str, skill_id: str, data: SkillUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update a specific skill by skill_id."""
-    return profile_service.update_skill(skill_id, profile_id, data.skill_name)
+    return await profile_service.update("skills", skill_id, profile_id, data.dict())
 
 @profileRouter.delete("/{profile_id}/skills/{skill_id}", response_model=dict, status_code=HTTP_200_OK)
-async def delete_skill(profile_id: str, skill_id: int, profile_service: Profile = Depends(get_profile_service)):
+async def delete_skill(profile_id: str, skill_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a specific skill by skill_id."""
-    return profile_service.delete_skill(skill_id, profile_id)
+    return await profile_service.delete("skills", skill_id, profile_id)
 
 # Experience Endpoints
 @profileRouter.post("/{profile_id}/experience", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_experience(profile_id: str, data: ExperienceCreate, profile_service: Profile = Depends(get_profile_service)):
+async def create_experience(profile_id: str, data: ExperienceCreate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Create a new experience for a profile."""
-    return profile_service.create_experience(profile_id, data.dict(exclude_unset=True))
+    return await profile_service.add_item("experience", profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.put("/{profile_id}/experience/{experience_id}", response_model=dict, status_code=HTTP_200_OK)
-async def update_experience(profile_id: str, experience_id: int, data: ExperienceUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_experience(profile_id: str, experience_id: str, data: ExperienceUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update a specific experience by experience_id."""
-    return profile_service.update_experience(experience_id, profile_id, data.dict(exclude_unset=True))
+    return await profile_service.update("experience", experience_id, profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.delete("/{profile_id}/experience/{experience_id}", response_model=dict, status_code=HTTP_200_OK)
-async def delete_experience(profile_id: str, experience_id: int, profile_service: Profile = Depends(get_profile_service)):
+async def delete_experience(profile_id: str, experience_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a specific experience by experience_id."""
-    return profile_service.delete_experience(experience_id, profile_id)
+    return await profile_service.delete("experience", experience_id, profile_id)
 
 # Education Endpoints
 @profileRouter.post("/{profile_id}/education", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_education(profile_id: str, data: EducationCreate, profile_service: Profile = Depends(get_profile_service)):
+async def create_education(profile_id: str, data: EducationCreate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Create a new education for a profile."""
-    return profile_service.create_education(profile_id, data.dict(exclude_unset=True))
+    return await profile_service.add_item("education", profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.put("/{profile_id}/education/{education_id}", response_model=dict, status_code=HTTP_200_OK)
-async def update_education(profile_id: str, education_id: int, data: EducationUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_education(profile_id: str, education_id: str, data: EducationUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update a specific education by education_id."""
-    return profile_service.update_education(education_id, profile_id, data.dict(exclude_unset=True))
+    return await profile_service.update("education", education_id, profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.delete("/{profile_id}/education/{education_id}", response_model=dict, status_code=HTTP_200_OK)
-async def delete_education(profile_id: str, education_id: int, profile_service: Profile = Depends(get_profile_service)):
+async def delete_education(profile_id: str, education_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a specific education by education_id."""
-    return profile_service.delete_education(education_id, profile_id)
+    return await profile_service.delete("education", education_id, profile_id)
 
 # Certification Endpoints
 @profileRouter.post("/{profile_id}/certifications", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_certification(profile_id: str, data: CertificationCreate, profile_service: Profile = Depends(get_profile_service)):
+async def create_certification(profile_id: str, data: CertificationCreate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Create a new certification for a profile."""
-    return profile_service.create_certification(profile_id, data.dict(exclude_unset=True))
+    return await profile_service.add_item("certifications", profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.put("/{profile_id}/certifications/{certification_id}", response_model=dict, status_code=HTTP_200_OK)
-async def update_certification(profile_id: str, certification_id: int, data: CertificationUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_certification(profile_id: str, certification_id: str, data: CertificationUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update a specific certification by certification_id."""
-    return profile_service.update_certification(certification_id, profile_id, data.dict(exclude_unset=True))
+    return await profile_service.update("certifications", certification_id, profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.delete("/{profile_id}/certifications/{certification_id}", response_model=dict, status_code=HTTP_200_OK)
-async def delete_certification(profile_id: str, certification_id: int, profile_service: Profile = Depends(get_profile_service)):
+async def delete_certification(profile_id: str, certification_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a specific certification by certification_id."""
-    return profile_service.delete_certification(certification_id, profile_id)
+    return await profile_service.delete("certifications", certification_id, profile_id)
 
 # Achievement Endpoints
 @profileRouter.post("/{profile_id}/achievements", response_model=dict, status_code=HTTP_201_CREATED)
-async def create_achievement(profile_id: str, data: AchievementCreate, profile_service: Profile = Depends(get_profile_service)):
+async def create_achievement(profile_id: str, data: AchievementCreate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Create a new achievement for a profile."""
-    return profile_service.create_achievement(profile_id, data.dict(exclude_unset=True))
+    return await profile_service.add_item("achievements", profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.put("/{profile_id}/achievements/{achievement_id}", response_model=dict, status_code=HTTP_200_OK)
-async def update_achievement(profile_id: str, achievement_id: int, data: AchievementUpdate, profile_service: Profile = Depends(get_profile_service)):
+async def update_achievement(profile_id: str, achievement_id: str, data: AchievementUpdate, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Update a specific achievement by achievement_id."""
-    return profile_service.update_achievement(achievement_id, profile_id, data.dict(exclude_unset=True))
+    return await profile_service.update("achievements", achievement_id, profile_id, data.dict(exclude_unset=True))
 
 @profileRouter.delete("/{profile_id}/achievements/{achievement_id}", response_model=dict, status_code=HTTP_200_OK)
-async def delete_achievement(profile_id: str, achievement_id: int, profile_service: Profile = Depends(get_profile_service)):
+async def delete_achievement(profile_id: str, achievement_id: str, profile_service: Profile = Depends(get_profile_service), _owner: str = Depends(owned_profile_id)):
     """Delete a specific achievement by achievement_id."""
-    return profile_service.delete_achievement(achievement_id, profile_id)
\ No newline at end of file
+    return await profile_service.delete("achievements", achievement_id, profile_id)
\ No newline at end of file
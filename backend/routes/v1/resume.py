@@ -0,0 +1,116 @@
+import json
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_202_ACCEPTED, HTTP_304_NOT_MODIFIED
+
+from utils.helper import helper
+from schema.schema import async_engine
+from schema.resume import GenerateResumeRequest, ScoreResumeRequest
+from services.profile_service import Profile
+from services.resume_engine import resume_engine
+from services.resume_jobs import resume_job_queue
+from services.resume_pdf import content_hash, pdf_renderer, read_chunks
+from services.resume_scorer import resume_scorer
+
+resumeRouter = APIRouter(
+    prefix="/resume",
+    tags=["Resume"]
+)
+
+profile_service = Profile(helper, async_engine)
+
+
+# No caching, and no buffering in nginx, so each event reaches the browser as it is written
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse(event: dict, event_id: str | None = None) -> str:
+    data = {k: v for k, v in event.items() if k != "event"}
+    message = f"event: {event['event']}\ndata: {json.dumps(data)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id else message
+
+
+@resumeRouter.post("/score", response_model=dict)
+async def score_resume(data: ScoreResumeRequest, user_id: str = Depends(helper.get_current_user_id)):
+    """
+    How well the user's profile matches the job description, computed
+    locally: a 0-100 score and the job's skills the profile does and does
+    not list. Free, so the UI can show it before anything is generated.
+    """
+    return await resume_scorer.score(user_id, data.job_description, lambda: profile_service.get_by_user_id(user_id))
+
+
+@resumeRouter.post("/generate")
+async def generate_resume(data: GenerateResumeRequest, entitlement: dict = Depends(helper.require_active_plan)):
+    """
+    Streams a resume tailored to the job description as Server-Sent Events:
+    `start` with the generation id, `delta` events carrying HTML text as the
+    model writes it, then `done` or `error`.
+    """
+    user_id = entitlement["user_id"]
+    # Loaded before the stream starts so a missing profile is still a plain 404
+    profile = await profile_service.get_by_user_id(user_id)
+
+    async def events():
+        async for event in resume_engine.stream(user_id, profile, data.job_description):
+            yield sse(event)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@resumeRouter.post("/jobs", response_model=dict, status_code=HTTP_202_ACCEPTED)
+async def submit_resume_job(data: GenerateResumeRequest, entitlement: dict = Depends(helper.require_active_plan)):
+    """
+    Queues a resume generation for the workers started by resume_worker.py.
+    Follow it with GET /resume/jobs/{id}/events or poll GET /resume/jobs/{id}.
+    """
+    user_id = entitlement["user_id"]
+    # Checked here so a missing profile is a plain 404 rather than a failed job
+    await profile_service.get_by_user_id(user_id)
+    return await resume_job_queue.submit(user_id, entitlement["plan"], data.job_description)
+
+
+@resumeRouter.get("/jobs/{job_id}", response_model=dict)
+async def get_resume_job(job_id: str, user_id: str = Depends(helper.get_current_user_id)):
+    """The job's status, and the generated resume once it has completed."""
+    return await resume_job_queue.get(job_id, user_id)
+
+
+@resumeRouter.get("/jobs/{job_id}/events")
+async def follow_resume_job(job_id: str, request: Request, user_id: str = Depends(helper.get_current_user_id)):
+    """
+    The job's progress as Server-Sent Events: `queued`, then the same `start`,
+    `delta` and `done` or `error` events as /resume/generate. Every event
+    carries an id, so a client reconnecting with Last-Event-ID resumes after it.
+    A `restart` event means a worker died mid-run and the job is running
+    again: discard the output received so far.
+    """
+    # Checked before the stream starts so an unknown job is a plain 404
+    await resume_job_queue.get(job_id, user_id)
+    last_id = request.headers.get("Last-Event-ID", "0")
+
+    async def events():
+        async for event_id, event in resume_job_queue.follow(job_id, user_id, last_id):
+            yield sse(event, event_id) if event else ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@resumeRouter.get("/{generation_id}/pdf")
+async def resume_pdf(generation_id: str, request: Request, user_id: str = Depends(helper.get_current_user_id)):
+    """
+    A generated resume as an A4 PDF, streamed in chunks. The ETag is a hash
+    of the resume's HTML, so a download sending it back in If-None-Match gets
+    a 304 without anything being rendered or read.
+    """
+    html = await resume_engine.output(generation_id, user_id)
+    etag = f'"{content_hash(html)}"'
+    # Private: the PDF is the user's; no-cache: browsers revalidate with the ETag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    pdf = await pdf_renderer.open(html)
+    headers["Content-Disposition"] = 'attachment; filename="resume.pdf"'
+    return StreamingResponse(read_chunks(pdf), media_type="application/pdf", headers=headers)
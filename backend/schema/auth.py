@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic import BaseModel, EmailStr, Field, constr
 
 class RegisterRequest(BaseModel):
@@ -12,6 +13,7 @@ class AuthResponse(BaseModel):
     access_token: str 
 class SendOtpRequest(BaseModel):
     email: EmailStr
+    purpose: Literal["verify-email", "reset-password"] = "verify-email"
 
 class verifyEmailRequest(BaseModel):
     otp: str
@@ -19,4 +21,10 @@ class verifyEmailRequest(BaseModel):
 class forgotPasswordRequest(BaseModel):
     otp: str
     email: EmailStr
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
@@ -7,7 +7,7 @@ from uuid import UUID
 
 class ExperienceCreate(BaseModel):
     title: Optional[str] = None
-    Position: Optional[str] = None
+    position: Optional[str] = None
     company: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
@@ -49,7 +49,7 @@ class SkillUpdate(BaseModel):
 
 class ExperienceUpdate(BaseModel):
     title: Optional[str] = None
-    Position: Optional[str] = None
+    position: Optional[str] = None
     company: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
@@ -84,4 +84,7 @@ class ProfileCreate(BaseModel):
     experience: Optional[List[ExperienceCreate]] = Field(default_factory=list)
     education: Optional[List[EducationCreate]] = Field(default_factory=list)
     certifications: Optional[List[CertificationCreate]] = Field(default_factory=list)
-    achievements: Optional[List[AchievementCreate]] = Field(default_factory=list)
\ No newline at end of file
+    achievements: Optional[List[AchievementCreate]] = Field(default_factory=list)
+
+class ProfileBulkItem(ProfileCreate):
+    user_id: str
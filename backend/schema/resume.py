@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class GenerateResumeRequest(BaseModel):
+    job_description: str = Field(..., min_length=1, max_length=5000, description="The job posting to tailor the resume to")
+
+
+class ScoreResumeRequest(BaseModel):
+    job_description: str = Field(..., min_length=1, max_length=5000, description="The job posting to score the profile against")
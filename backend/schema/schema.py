@@ -1,22 +1,63 @@
 from sqlalchemy import (
     create_engine, MetaData, Table, Column,
-    Integer, String, Text, DateTime, ForeignKey, Boolean, Float,JSON
+    Integer, String, Text, DateTime, ForeignKey, Boolean, Float,JSON, LargeBinary
 )
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+from uuid import uuid4
 from utils.logger import logger
+from utils.db_pool import InstrumentedPool
 
 load_dotenv()
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 SCHEMA_NAME = 'public'
 
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def to_async_url(url: str):
+    """Swaps the sync DBAPI driver in DATABASE_URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL') or to_async_url(DATABASE_URL)
+
+# Pool sizing for the async engine; every uvicorn worker gets its own pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# PgBouncer in transaction pooling mode cannot keep prepared statements across transactions
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+def async_connect_args() -> dict:
+    if not DB_PGBOUNCER:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
 logger.debug(f"Database URL: {DATABASE_URL}")
 logger.debug(f"Using schema: {SCHEMA_NAME}")
 
 metadata = MetaData(schema=SCHEMA_NAME)
 engine = create_engine(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=async_connect_args(),
+)
 
 # Users Table
 users = Table(
@@ -36,7 +77,7 @@ profiles = Table(
     "profiles",
     metadata,
     Column("id", String, primary_key=True),
-    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id")),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), unique=True, index=True),
     Column("full_name", String),
     Column("linkedin", String),
     Column("github", String),
@@ -50,7 +91,7 @@ profiles = Table(
 projects = Table(
     "projects", metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id", ondelete="CASCADE"), nullable=False),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id", ondelete="CASCADE"), nullable=False, index=True),
     Column("title",String, nullable=True),
     Column("description", String, nullable=True),
     Column("link", String, nullable=True),
@@ -61,7 +102,7 @@ skills = Table(
     "skills",
     metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id"), index=True),
     Column("skill_name", String, nullable=True)
 )
 
@@ -69,7 +110,7 @@ experience = Table(
     "experience",
     metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id"), index=True),
     Column("title", String),
     Column("position", String),
     Column("company", String),
@@ -83,7 +124,7 @@ education = Table(
     "education",
     metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id"), index=True),
     Column("institution", String),
     Column("certificate_level", String), # certificate, diploma, degree, masters, phd
     Column("start_year", Integer),
@@ -94,7 +135,7 @@ certifications = Table(
     "certifications",
     metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id"), index=True),
     Column("title", String),
     Column("issuer", String),
     Column("issue_date", DateTime),
@@ -105,7 +146,7 @@ achievements = Table(
     "achievements",
     metadata,
     Column("id", String, primary_key=True),
-    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id")),
+    Column("profile_id", String, ForeignKey(f"{SCHEMA_NAME}.profiles.id"), index=True),
     Column("title", String),
     Column("description", Text),
     Column("achieved_at", DateTime)
@@ -121,15 +162,15 @@ payments = Table(
     Column("payment_date", DateTime, default=datetime.utcnow),
     Column("metadata", JSON),
     Column("method", String, nullable=True),
-    Column("transaction_ref", String, nullable=True),
+    Column("transaction_ref", String, nullable=True, unique=True, index=True),
     Column("plan", String)
 )
 
 subscriptions = Table(
     "subs", metadata,
     Column("id", String, primary_key=True),
-    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id")),
-    Column("payments_id", String, ForeignKey(f"{SCHEMA_NAME}.payments.id")),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), index=True),
+    Column("payments_id", String, ForeignKey(f"{SCHEMA_NAME}.payments.id"), unique=True, index=True),
     Column("plan_type", String, nullable=False),
     Column("start_date", DateTime),
     Column("expiry_date", DateTime)
@@ -138,8 +179,55 @@ subscriptions = Table(
 resume_generations = Table(
     "resume_generations", metadata,
     Column("id", String, primary_key=True),
-    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False, index=True),
     Column("generated_at", DateTime, default=datetime.utcnow),
+    # streaming -> completed | failed | cancelled; cached when served from resume_cache
+    Column("status", String, nullable=False, default="streaming"),
+    Column("model", String),
+    Column("job_description", Text),
+    Column("output", Text),
+    Column("error", Text),
+    Column("input_tokens", Integer),
+    Column("output_tokens", Integer),
+    Column("completed_at", DateTime),
+)
+
+# Generated resumes keyed by a hash of their inputs (see services/resume_cache.py)
+resume_cache = Table(
+    "resume_cache", metadata,
+    Column("key", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False, index=True),
+    Column("profile_updated_at", DateTime),
+    Column("model", String, nullable=False),
+    Column("output", LargeBinary, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("last_used_at", DateTime, default=datetime.utcnow, index=True),
 )
 
-metadata.create_all(engine)
+# Queued resume generations run by resume_worker.py (see services/resume_jobs.py)
+resume_jobs = Table(
+    "resume_jobs", metadata,
+    Column("id", String, primary_key=True),
+    Column("user_id", String, ForeignKey(f"{SCHEMA_NAME}.users.id"), nullable=False, index=True),
+    # Set once a worker starts the run; the output lives on the generation
+    Column("generation_id", String, ForeignKey(f"{SCHEMA_NAME}.resume_generations.id")),
+    Column("job_description", Text, nullable=False),
+    Column("priority", String, nullable=False),
+    # queued -> running -> completed | failed
+    Column("status", String, nullable=False, default="queued"),
+    Column("error", Text),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("started_at", DateTime),
+    Column("finished_at", DateTime),
+)
+
+# Kept out of `metadata` so migrations never create or alter it; the runner owns it
+version_metadata = MetaData(schema=SCHEMA_NAME)
+
+schema_version = Table(
+    "schema_version", version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
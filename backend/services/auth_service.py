@@ -1,32 +1,30 @@
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import insert, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.ext.asyncio import AsyncConnection
 from uuid import uuid4
 import re
-import redis.asyncio as redis
-import random
 import os
 import logging
 from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from fastapi.concurrency import run_in_threadpool
-from email.message import EmailMessage
-from aiosmtplib import SMTP
-from sqlalchemy.ext.asyncio import create_async_engine
 
 from utils.helper import Helper
+from utils.hashing import password_hasher, needs_rehash, BCRYPT_ROUNDS
 from utils.logger import logger
-from schema.schema import users, engine
-import resend
+from utils.rate_limit import otp_failures
+from utils.otp import otp_store, INVALID, LOCKED, RESET_PASSWORD, VALID, VERIFY_EMAIL
+from utils.sessions import (
+    ACCESS_TOKEN_TTL, consume_refresh_token, revoke_access_token, revoke_refresh_token, revoke_user_tokens,
+    store_refresh_token,
+)
+from schema.schema import users
+from services import mail_service
+from services.identity_service import get_identity, invalidate_identity
 
 load_dotenv()
 
-# Initialize services
-resend.api_key = os.getenv("RESEND_API_KEY")
-redis_client = redis.Redis(host="localhost", port=6379, decode_responses=True)
-
 class AuthService:
     def __init__(self, helper: Helper, engine):
         self.helper = helper
@@ -51,17 +49,17 @@ class AuthService:
             return False, "Password must contain at least one special character"
         return True, "Password is strong"
 
-    def user_exists_by_email(self, session: Session, email: str) -> dict | None:
+    async def user_exists_by_email(self, conn: AsyncConnection, email: str) -> dict | None:
+        """The user's cached identity (no password hash), or None."""
         try:
-            result = session.execute(select(users).where(users.c.email == email)).first()
-            return dict(result._mapping) if result else None
+            return await get_identity(email=email, conn=conn)
         except Exception as e:
             logger.warning(f"Unable to check if user exists: {e}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    def create_user(self, session: Session, email: str, password: str, role: str = "jobSeeker") -> str:
+    async def create_user(self, conn: AsyncConnection, email: str, password: str, role: str = "jobSeeker") -> str:
         user_id = str(uuid4())
-        session.execute(
+        await conn.execute(
             insert(users).values(
                 id=user_id,
                 email=email,
@@ -70,10 +68,10 @@ class AuthService:
                 role=role,
             )
         )
-        session.commit()
+        await invalidate_identity(user_id, email)
         return user_id
 
-    def register(self, data: dict[str, str]) -> dict[str, str]:
+    async def register(self, data: dict[str, str]) -> dict[str, str]:
         email, password = data.get("email"), data.get("password")
 
         if not email or not password:
@@ -85,28 +83,19 @@ class AuthService:
         if not is_valid:
             raise HTTPException(status_code=400, detail=message)
 
-        hashed_password = self.helper.hash_data(password)
-        with Session(self.engine) as session:
-            if self.user_exists_by_email(session, email):
+        hashed_password = await password_hasher.hash(password)
+        async with self.engine.begin() as conn:
+            if await self.user_exists_by_email(conn, email):
                 raise HTTPException(status_code=400, detail="User already exists")
-            user_id = self.create_user(session, email, hashed_password)
+            user_id = await self.create_user(conn, email, hashed_password)
 
-            user = session.execute(
+            user = (await conn.execute(
                 select(users).where(users.c.id == user_id)
-            ).mappings().fetchone()  
-
-            sanitized_user = {
-                "email": user['email'],
-                "role": user['role'],
-                "is_email_verified": user['is_email_verified'],
-                "user_id": user['id']
-            }
+            )).mappings().fetchone()  
 
-            tokens = self.helper.generate_jwt_token(sanitized_user)
-            print(tokens)
-            return {"access_token": tokens}
+        return await self.issue_tokens(user)
 
-    def login(self, data: dict[str, str]) -> dict[str, str]:
+    async def login(self, data: dict[str, str], background_tasks: BackgroundTasks | None = None) -> dict[str, str]:
         email, password = data.get('email'), data.get('password')
 
         if not email or not password:
@@ -114,51 +103,112 @@ class AuthService:
         if not self.is_valid_email(email):
             raise HTTPException(status_code=400, detail="Invalid email format")
 
-        with Session(self.engine) as session:
-
-            user = self.user_exists_by_email(session, email)
-
-            if not user or not self.helper.is_correct_password(user['password_hash'], password):
-                raise HTTPException(status_code=404, detail="Invalid Email or Password")
-
-            sanitized_user = {"email": user['email'], "role": user['role'], "is_email_verified": user['is_email_verified'], "user_id": user['id']}
-            access_token = self.helper.generate_jwt_token(sanitized_user)
-            if not access_token:
-                raise HTTPException(status_code=500, detail="Token generation failed")
-
-            return {"access_token": access_token}
-
-    def token(self, form_data: OAuth2PasswordRequestForm = Depends()) -> dict[str, str]:
-        return self.login({"email": form_data.username, "password": form_data.password}) | {"token_type": "bearer"}
-
-    async def generate_and_store_otp(self, email: str) -> dict:
-        otp = ''.join(str(random.randint(0, 9)) for _ in range(6))
+        async with self.engine.connect() as conn:
+            user = (await conn.execute(select(users).where(users.c.email == email))).mappings().fetchone()
+
+        if not user or not await password_hasher.verify(user['password_hash'], password):
+            raise HTTPException(status_code=404, detail="Invalid Email or Password")
+
+        if background_tasks is not None and needs_rehash(user['password_hash']):
+            background_tasks.add_task(self.rehash_password, user['id'], user['password_hash'], password)
+
+        return await self.issue_tokens(user)
+
+    async def token(self, form_data: OAuth2PasswordRequestForm = Depends(), background_tasks: BackgroundTasks | None = None) -> dict[str, str]:
+        return await self.login({"email": form_data.username, "password": form_data.password}, background_tasks)
+
+    async def issue_tokens(self, user) -> dict:
+        """A short-lived access token plus a single-use refresh token for `user` (a users row)."""
+        sanitized_user = {"email": user['email'], "role": user['role'], "is_email_verified": user['is_email_verified'], "user_id": user['id']}
+        return {
+            "access_token": self.helper.generate_jwt_token(sanitized_user),
+            "refresh_token": await store_refresh_token(user['id']),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_TTL,
+        }
+
+    async def refresh(self, refresh_token: str) -> dict:
+        """
+        Exchanges a refresh token for a new token pair without a password
+        check. The user row is reloaded so role and verification changes apply.
+        """
+        user_id = await consume_refresh_token(refresh_token)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+        async with self.engine.connect() as conn:
+            user = (await conn.execute(select(users).where(users.c.id == user_id))).mappings().fetchone()
+        if not user or not user['is_active']:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+        return await self.issue_tokens(user)
+
+    async def logout(self, claims: dict, refresh_token: str | None = None) -> dict:
+        await revoke_access_token(claims)
+        if refresh_token:
+            await revoke_refresh_token(refresh_token)
+        return {"message": "Logged out"}
+
+    async def rehash_password(self, user_id: str, old_hash: str, password: str):
+        """
+        Re-hashes a password at the current BCRYPT_ROUNDS after a successful
+        login. The update only applies if the stored hash is still the one we
+        verified, so a concurrent password change is never overwritten.
+        """
         try:
-            await redis_client.set(email, otp, ex=1500)
-            return otp
+            new_hash = await password_hasher.hash(password)
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(users)
+                    .where(users.c.id == user_id, users.c.password_hash == old_hash)
+                    .values(password_hash=new_hash)
+                )
+            logger.info(f"Password rehashed at cost {BCRYPT_ROUNDS} for user {user_id}")
         except Exception as e:
-            print(e)
+            logger.warning(f"Password rehash skipped for user {user_id}: {e}")
+
+    async def password_cost_distribution(self) -> dict:
+        """Number of users per bcrypt cost, to track the rehash migration."""
+        cost = func.substr(users.c.password_hash, 5, 2)
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(select(cost, func.count()).group_by(cost))).fetchall()
+        return {
+            "target_cost": BCRYPT_ROUNDS,
+            "users_by_cost": {str(row[0]): row[1] for row in rows},
+        }
+
+    async def generate_and_store_otp(self, email: str, purpose: str = VERIFY_EMAIL) -> str:
+        try:
+            return await otp_store.issue(purpose, email)
+        except Exception as e:
+            logger.error(f"Unable to store OTP: {e}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    async def is_valid_otp(self, email: str, otp: str) -> bool:
+    async def is_valid_otp(self, email: str, otp: str, purpose: str = VERIFY_EMAIL) -> bool:
+        """
+        Checks and consumes the OTP, counting failures per email. Once the
+        failure budget is spent every check is rejected with a 429 without
+        looking at the OTP.
+        """
+        await otp_failures.ensure_available(email)
         try:
-            stored_otp = await redis_client.get(email)
-
-            if stored_otp is None:
-                return False
-
-            return stored_otp == otp
+            result = await otp_store.verify(purpose, email, otp)
+            valid = result == VALID
 
         except Exception as e:
             logger.error(f"Unable to verify OTP: {e}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+        if valid:
+            await otp_failures.reset(email)
+        elif result in (INVALID, LOCKED):
+            await otp_failures.acquire(email)
+        return valid
+
 
     async def verify_email(self, user_id: str, otp: str) -> dict:
         try:
-            with engine.begin() as conn:
+            async with self.engine.begin() as conn:
                 stmt = select(users).where(users.c.id == user_id)
-                result = conn.execute(stmt)
+                result = await conn.execute(stmt)
                 user = result.mappings().fetchone()
                 
                 if not user:
@@ -170,12 +220,10 @@ class AuthService:
                     raise HTTPException(status_code=400, detail="Invalid or expired OTP")
                 
                 update_stmt = update(users).where(users.c.email == email).values(is_email_verified=True)
-                conn.execute(update_stmt)
+                await conn.execute(update_stmt)
             
-            await redis_client.delete(email)
-            sanitized_user = {"email": email, "user_id": user['id'], "role": user['role'], "is_email_verified": user['is_email_verified']}
-            tokens = self.helper.generate_jwt_token(sanitized_user)
-            return tokens
+            await invalidate_identity(user_id, email)
+            return await self.issue_tokens({**user, "is_email_verified": True})
 
         except HTTPException:
             raise
@@ -185,45 +233,33 @@ class AuthService:
 
     @staticmethod
     async def send_email(email: str, otp_code: str) -> dict:
-        message = EmailMessage()
-        message["From"] = os.getenv("SMTP_FROM_EMAIL")
-        message["To"] = email
-        message["Subject"] = "Your OTP Code"
-        message.set_content(f"Your OTP code is: {otp_code}")
-
-        try:
-            smtp = SMTP(hostname="smtp.gmail.com", port=587, start_tls=True)
-            await smtp.connect()
-            await smtp.login(os.getenv("SMTP_USERNAME"), os.getenv("SMTP_PASSWORD"))
-            await smtp.send_message(message)
-            await smtp.quit()
-            return {"status": "success", "details": "Email sent via SMTP"}
-        except Exception as e:
-            return {"status": "failed", "error": str(e)}
+        """Queues the OTP email; the mail workers deliver it."""
+        message_id = await mail_service.enqueue(email, "Your OTP Code", f"Your OTP code is: {otp_code}")
+        return {"status": "queued", "id": message_id}
 
     async def update_password(self, email: str, otp: str, new_password: str):
         is_valid, message = self.is_strong_password(new_password)
         if not is_valid:
             raise HTTPException(status_code=400, detail=message)
 
-        saved_otp = await redis_client.get(email)  
-        if saved_otp is None or saved_otp != otp:
+        if not await self.is_valid_otp(email, otp, RESET_PASSWORD):
             raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
+        hashed_password = await password_hasher.hash(new_password)
 
-        hashed_password = self.helper.hash_data(new_password)
-
-        with engine.begin() as conn: 
-            result = conn.execute(select(users).where(users.c.email == email))
+        async with self.engine.begin() as conn: 
+            result = await conn.execute(select(users).where(users.c.email == email))
             user = result.mappings().fetchone()
 
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
-            conn.execute(
+            await conn.execute(
                 update(users).where(users.c.email == email).values(password_hash=hashed_password)
             )
 
-        await redis_client.delete(email)
+        await invalidate_identity(user['id'], email)
+        # Sessions opened with the old password end here
+        await revoke_user_tokens(user['id'])
 
         return {"message": "Password updated successfully"}
\ No newline at end of file
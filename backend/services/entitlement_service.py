@@ -0,0 +1,76 @@
+"""
+Answers "does this user have an active plan right now?" from a two-tier cache
+keyed by user_id, so gating a request does not hit the subs table. Entries are
+invalidated when a subscription is activated and are never trusted past the
+plan's expiry_date.
+"""
+import math
+import os
+from datetime import datetime
+
+from sqlalchemy import select
+
+from schema.schema import async_engine, subscriptions
+from utils.cache import TwoTierCache
+
+# Bump ENTITLEMENT_CACHE_VERSION whenever the shape of a cached entitlement changes
+ENTITLEMENT_CACHE_VERSION = 1
+entitlement_cache = TwoTierCache(
+    "entitlement",
+    ENTITLEMENT_CACHE_VERSION,
+    ttl=int(os.getenv("ENTITLEMENT_CACHE_TTL", 300)),
+    local_ttl=float(os.getenv("ENTITLEMENT_CACHE_LOCAL_TTL", 5)),
+    local_maxsize=int(os.getenv("ENTITLEMENT_CACHE_LOCAL_SIZE", 4096)),
+)
+
+NO_PLAN = {"active": False, "plan": None, "expiry_date": None}
+
+
+def utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+async def get_entitlement(user_id: str) -> dict:
+    """Returns {"active", "plan", "expiry_date"} for the user's current plan."""
+    key = f"user:{user_id}"
+    cached, generation = await entitlement_cache.lookup(key)
+    if cached is not None:
+        if cached["expiry_date"]:
+            cached["expiry_date"] = datetime.fromisoformat(cached["expiry_date"])
+        return current(cached)
+
+    entitlement = await load_entitlement(user_id)
+    ttl = entitlement_cache.ttl
+    if entitlement["active"]:
+        # Expire the cache entry with the plan; `current` covers the sub-second remainder
+        ttl = max(1, min(ttl, math.ceil((entitlement["expiry_date"] - utcnow()).total_seconds())))
+    await entitlement_cache.set(key, entitlement, generation, ttl)
+    return entitlement
+
+
+def current(entitlement: dict) -> dict:
+    if entitlement["active"] and entitlement["expiry_date"] <= utcnow():
+        return dict(NO_PLAN)
+    return entitlement
+
+
+async def load_entitlement(user_id: str) -> dict:
+    now = utcnow()
+    async with async_engine.connect() as conn:
+        row = (await conn.execute(
+            select(subscriptions.c.plan_type, subscriptions.c.expiry_date)
+            .where(
+                subscriptions.c.user_id == user_id,
+                subscriptions.c.start_date <= now,
+                subscriptions.c.expiry_date > now,
+            )
+            .order_by(subscriptions.c.expiry_date.desc())
+            .limit(1)
+        )).fetchone()
+    if not row:
+        return dict(NO_PLAN)
+    return {"active": True, "plan": row.plan_type, "expiry_date": row.expiry_date}
+
+
+async def invalidate_entitlement(user_id: str):
+    await entitlement_cache.delete(f"user:{user_id}")
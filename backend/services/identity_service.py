@@ -0,0 +1,72 @@
+"""
+Who a user is (id, email, role, is_email_verified) from a two-tier cache
+keyed by both user_id and email, so auth checks, payments and webhooks don't
+reload the users row. Password hashes are never cached; login still reads
+them from the table.
+
+`plan` is not stored here: it comes from the entitlement cache, which is
+invalidated on activation and never outlives the plan's expiry. Identity
+entries are invalidated by create_user, verify_email and update_password.
+Only existing users are cached, so a miss always falls through to the table.
+"""
+import os
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from schema.schema import async_engine, users
+from services.entitlement_service import get_entitlement
+from utils.cache import TwoTierCache
+
+# Bump IDENTITY_CACHE_VERSION whenever the shape of a cached identity changes
+IDENTITY_CACHE_VERSION = 1
+identity_cache = TwoTierCache(
+    "identity",
+    IDENTITY_CACHE_VERSION,
+    ttl=int(os.getenv("IDENTITY_CACHE_TTL", 600)),
+    local_ttl=float(os.getenv("IDENTITY_CACHE_LOCAL_TTL", 5)),
+    local_maxsize=int(os.getenv("IDENTITY_CACHE_LOCAL_SIZE", 4096)),
+)
+
+IDENTITY_COLUMNS = (users.c.id, users.c.email, users.c.role, users.c.is_email_verified)
+
+
+async def get_identity(user_id: str | None = None, email: str | None = None, conn: AsyncConnection | None = None,
+                       with_plan: bool = False) -> dict | None:
+    """
+    Returns {"id", "email", "role", "is_email_verified"} for the user with
+    `user_id` or `email`, or None if there is none. A given `conn` is used
+    for the lookup on a miss, so callers inside a transaction see their own
+    writes. `with_plan` adds the current "plan" (None without an active one).
+    """
+    if (user_id is None) == (email is None):
+        raise ValueError("Pass exactly one of user_id or email")
+    key, condition = (f"id:{user_id}", users.c.id == user_id) if user_id else (f"email:{email}", users.c.email == email)
+
+    identity, generation = await identity_cache.lookup(key)
+    if identity is None:
+        identity = await load_identity(condition, conn)
+        if identity is None:
+            return None
+        await identity_cache.set(key, identity, generation)
+
+    if with_plan:
+        identity["plan"] = (await get_entitlement(identity["id"]))["plan"]
+    return identity
+
+
+async def load_identity(condition, conn: AsyncConnection | None = None) -> dict | None:
+    query = select(*IDENTITY_COLUMNS).where(condition)
+    if conn is not None:
+        row = (await conn.execute(query)).mappings().fetchone()
+    else:
+        async with async_engine.connect() as conn:
+            row = (await conn.execute(query)).mappings().fetchone()
+    return dict(row) if row else None
+
+
+async def invalidate_identity(user_id: str | None = None, email: str | None = None):
+    keys = [f"id:{user_id}"] if user_id else []
+    if email:
+        keys.append(f"email:{email}")
+    await identity_cache.delete(*keys)
@@ -0,0 +1,279 @@
+"""
+Outbound mail. Requests only append the message to a Redis stream (`enqueue`);
+workers started in the app lifespan read it through a consumer group and hand
+each message to the configured transport, retrying with jittered exponential
+backoff. Messages that still fail after MAIL_MAX_ATTEMPTS are recorded on the
+`mail:dead` list: recipient, subject and error only, since bodies carry OTPs.
+The list keeps the latest MAIL_DEAD_LETTER_MAXLEN entries and expires
+MAIL_DEAD_LETTER_TTL seconds after the last failure. A message held by a crashed worker is reclaimed by another
+once it has been idle for MAIL_CLAIM_IDLE_MS, as for Paystack webhooks.
+
+MAIL_TRANSPORT picks the transport:
+- smtp: a small pool of connected, authenticated SMTP sessions that are reused
+  across messages instead of a connect + STARTTLS + login per email
+- resend: the Resend HTTP API
+- file: writes each message as an .eml file to MAIL_FILE_DIR (local dev, tests)
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from email.message import EmailMessage
+from pathlib import Path
+from uuid import uuid4
+
+import resend
+from aiosmtplib import SMTP, SMTPException, SMTPResponseException, SMTPServerDisconnected
+from redis.exceptions import ResponseError
+
+from utils.cache import redis_client
+from utils.logger import logger
+
+STREAM = "mail:outbox"
+DEAD_LETTER_LIST = "mail:dead"
+GROUP = "mail-workers"
+
+MAIL_TRANSPORT = os.getenv("MAIL_TRANSPORT", "smtp")
+MAIL_FROM = os.getenv("SMTP_FROM_EMAIL")
+MAIL_STREAM_MAXLEN = int(os.getenv("MAIL_STREAM_MAXLEN", 100_000))
+MAIL_DEAD_LETTER_MAXLEN = int(os.getenv("MAIL_DEAD_LETTER_MAXLEN", 10_000))
+MAIL_DEAD_LETTER_TTL = int(os.getenv("MAIL_DEAD_LETTER_TTL", 7 * 24 * 3600))
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", 4))
+MAIL_BATCH = int(os.getenv("MAIL_BATCH", 16))
+MAIL_BLOCK_MS = int(os.getenv("MAIL_BLOCK_MS", 5000))
+MAIL_CLAIM_IDLE_MS = int(os.getenv("MAIL_CLAIM_IDLE_MS", 60_000))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 5))
+MAIL_RETRY_BASE_DELAY = float(os.getenv("MAIL_RETRY_BASE_DELAY", 0.5))
+MAIL_RETRY_MAX_DELAY = float(os.getenv("MAIL_RETRY_MAX_DELAY", 30))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 10))
+
+
+def build_message(to: str, subject: str, body: str, sender: str | None = None) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender or MAIL_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+class SMTPTransport:
+    """
+    Up to `pool_size` SMTP sessions, opened on first use and kept for later
+    messages. A session the server has dropped is reopened once per send.
+    """
+
+    def __init__(self, hostname: str = SMTP_HOST, port: int = SMTP_PORT, username: str | None = None,
+                 password: str | None = None, pool_size: int = SMTP_POOL_SIZE, timeout: float = SMTP_TIMEOUT,
+                 start_tls: bool | None = None):
+        self.hostname = hostname
+        self.port = port
+        self.username = username if username is not None else os.getenv("SMTP_USERNAME")
+        self.password = password if password is not None else os.getenv("SMTP_PASSWORD")
+        self.timeout = timeout
+        self.start_tls = start_tls
+        self.pool_size = pool_size
+        self.connections_opened = 0
+        self._idle: asyncio.Queue[SMTP | None] = asyncio.Queue()
+        # None is a free slot without an open session
+        for _ in range(pool_size):
+            self._idle.put_nowait(None)
+
+    async def _connect(self) -> SMTP:
+        smtp = SMTP(hostname=self.hostname, port=self.port, timeout=self.timeout, start_tls=self.start_tls)
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return smtp
+
+    async def send(self, message: EmailMessage):
+        smtp = await self._idle.get()
+        try:
+            if smtp is None or not smtp.is_connected:
+                smtp = await self._connect()
+            try:
+                await smtp.send_message(message)
+            except SMTPServerDisconnected:
+                # The server timed out an idle session
+                smtp = await self._connect()
+                await smtp.send_message(message)
+        except SMTPResponseException:
+            # The server refused this message; the session itself is still usable
+            raise
+        except BaseException:
+            if smtp is not None:
+                smtp.close()
+            smtp = None
+            raise
+        finally:
+            self._idle.put_nowait(smtp)
+
+    async def aclose(self):
+        while not self._idle.empty():
+            smtp = self._idle.get_nowait()
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except SMTPException:
+                    smtp.close()
+        # Keep the slots so the transport can be used again
+        for _ in range(self.pool_size):
+            self._idle.put_nowait(None)
+
+
+class ResendTransport:
+    def __init__(self, api_key: str | None = None):
+        resend.api_key = api_key or os.getenv("RESEND_API_KEY")
+
+    async def send(self, message: EmailMessage):
+        params = {
+            "from": message["From"],
+            "to": [message["To"]],
+            "subject": message["Subject"],
+            "text": message.get_content(),
+        }
+        # The Resend SDK is synchronous
+        await asyncio.to_thread(resend.Emails.send, params)
+
+    async def aclose(self):
+        pass
+
+
+class FileTransport:
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory or os.getenv("MAIL_FILE_DIR", "outbox"))
+
+    async def send(self, message: EmailMessage):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{time.time_ns()}-{uuid4().hex[:8]}.eml"
+        await asyncio.to_thread(path.write_bytes, message.as_bytes())
+
+    async def aclose(self):
+        pass
+
+
+TRANSPORTS = {"smtp": SMTPTransport, "resend": ResendTransport, "file": FileTransport}
+
+
+def transport_from_env():
+    if MAIL_TRANSPORT not in TRANSPORTS:
+        raise RuntimeError(f"Unknown MAIL_TRANSPORT {MAIL_TRANSPORT}, expected one of {sorted(TRANSPORTS)}")
+    return TRANSPORTS[MAIL_TRANSPORT]()
+
+
+async def enqueue(to: str, subject: str, body: str) -> str:
+    """Queues a plain-text email and returns its stream id; delivery happens in the mail workers."""
+    fields = {"to": to, "subject": subject, "body": body}
+    return await redis_client.xadd(STREAM, fields, maxlen=MAIL_STREAM_MAXLEN, approximate=True)
+
+
+def retry_delay(attempt: int, base: float = MAIL_RETRY_BASE_DELAY, cap: float = MAIL_RETRY_MAX_DELAY) -> float:
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class MailWorkerPool:
+    """Consumer-group workers delivering the outbox through one shared transport."""
+
+    def __init__(self, transport=None, workers: int = MAIL_WORKERS, batch: int = MAIL_BATCH,
+                 block_ms: int = MAIL_BLOCK_MS, claim_idle_ms: int = MAIL_CLAIM_IDLE_MS,
+                 max_attempts: int = MAIL_MAX_ATTEMPTS):
+        self._transport = transport
+        self.workers = workers
+        self.batch = batch
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_attempts = max_attempts
+        self.sent = 0
+        self.failed = 0
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = transport_from_env()
+        return self._transport
+
+    async def start(self):
+        await self.ensure_group()
+        self._tasks = [asyncio.create_task(self._run(f"mailer-{os.getpid()}-{i}")) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._transport is not None:
+            await self._transport.aclose()
+
+    async def ensure_group(self):
+        try:
+            await redis_client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run_once(self, consumer: str, block_ms: int | None = None) -> int:
+        """Delivers stale messages reclaimed from dead consumers, then one batch of new ones."""
+        _, messages, _ = await redis_client.xautoclaim(
+            STREAM, GROUP, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch
+        )
+        if not messages:
+            response = await redis_client.xreadgroup(GROUP, consumer, {STREAM: ">"}, count=self.batch, block=block_ms)
+            messages = response[0][1] if response else []
+        for message_id, fields in messages:
+            await self._deliver(message_id, fields)
+        return len(messages)
+
+    async def _run(self, consumer: str):
+        while True:
+            try:
+                if not await self.run_once(consumer, self.block_ms):
+                    await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[Mail] Worker loop failed, backing off")
+                await asyncio.sleep(1)
+
+    async def _deliver(self, message_id: str, fields: dict):
+        message = build_message(fields["to"], fields["subject"], fields["body"])
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.transport.send(message)
+                self.sent += 1
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.error(f"[Mail] {message_id} to {fields['to']} failed {attempt} times, moving to {DEAD_LETTER_LIST}: {e}")
+                    self.failed += 1
+                    await self._dead_letter(message_id, fields, e)
+                    break
+                logger.warning(f"[Mail] {message_id} failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(retry_delay(attempt))
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(STREAM, GROUP, message_id)
+            pipe.xdel(STREAM, message_id)
+            await pipe.execute()
+
+    async def _dead_letter(self, message_id: str, fields: dict, error: Exception):
+        # Never the body: it holds OTPs, and the list outlives them
+        entry = {"id": message_id, "to": fields["to"], "subject": fields["subject"], "error": str(error),
+                 "failed_at": int(time.time())}
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.lpush(DEAD_LETTER_LIST, json.dumps(entry))
+            pipe.ltrim(DEAD_LETTER_LIST, 0, MAIL_DEAD_LETTER_MAXLEN - 1)
+            pipe.expire(DEAD_LETTER_LIST, MAIL_DEAD_LETTER_TTL)
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        return {"transport": type(self._transport).__name__ if self._transport else MAIL_TRANSPORT,
+                "sent": self.sent, "failed": self.failed}
+
+
+mail_workers = MailWorkerPool()
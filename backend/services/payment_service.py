@@ -1,5 +1,10 @@
-import httpx
+import asyncio
 import os
+import random
+
+import httpx
+
+from utils.logger import logger
 
 PRICING = {
     "KES": {"daily": 100, "weekly": 500, "monthly": 1500},   
@@ -10,15 +15,67 @@ PRICING = {
 }
 CURRENCIES_NO_MULTIPLY = {"JPY", "KRW", "CLP"}
 
+PAYSTACK_BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co")
+PAYSTACK_HTTP2 = os.getenv("PAYSTACK_HTTP2", "true").lower() == "true"
+PAYSTACK_CONNECT_TIMEOUT = float(os.getenv("PAYSTACK_CONNECT_TIMEOUT", 5))
+PAYSTACK_TIMEOUT = float(os.getenv("PAYSTACK_TIMEOUT", 15))
+PAYSTACK_MAX_CONNECTIONS = int(os.getenv("PAYSTACK_MAX_CONNECTIONS", 20))
+PAYSTACK_MAX_KEEPALIVE = int(os.getenv("PAYSTACK_MAX_KEEPALIVE", 10))
+PAYSTACK_KEEPALIVE_EXPIRY = float(os.getenv("PAYSTACK_KEEPALIVE_EXPIRY", 60))
+# Only verify (a GET) is retried on errors and 5xx; initialize creates a transaction
+PAYSTACK_VERIFY_RETRIES = int(os.getenv("PAYSTACK_VERIFY_RETRIES", 3))
+PAYSTACK_RETRY_BACKOFF = float(os.getenv("PAYSTACK_RETRY_BACKOFF", 0.25))
+# Ceiling for one wait, including a Retry-After from Paystack; verify runs inside a request
+PAYSTACK_RETRY_MAX_DELAY = float(os.getenv("PAYSTACK_RETRY_MAX_DELAY", 5))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
 
 class Paystack:
-    def __init__(self):
+    """
+    Paystack API client. One instance is shared by the app so its pooled
+    httpx client keeps TCP/TLS connections to Paystack alive between calls;
+    main.py opens it on startup and closes it on shutdown.
+    """
+
+    def __init__(self, base_url: str | None = None, transport: httpx.AsyncBaseTransport | None = None):
         self.PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
         self.headers = {
             "Authorization": f"Bearer {self.PAYSTACK_SECRET_KEY}",
             "Content-Type": "application/json"
         }
-        self.base_url = "https://api.paystack.co"
+        self.base_url = base_url or PAYSTACK_BASE_URL
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = self._make_client()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Also created on first use, so scripts and tests work without the app lifespan
+        if self._client is None:
+            self._client = self._make_client()
+        return self._client
+
+    def _make_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=PAYSTACK_MAX_CONNECTIONS,
+            max_keepalive_connections=PAYSTACK_MAX_KEEPALIVE,
+            keepalive_expiry=PAYSTACK_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(PAYSTACK_TIMEOUT, connect=PAYSTACK_CONNECT_TIMEOUT),
+            # Connection failures are safe to retry for any request: nothing was sent yet
+            transport=self._transport or httpx.AsyncHTTPTransport(http2=PAYSTACK_HTTP2, limits=limits, retries=1),
+        )
 
     def get_amount(self, plan: str, currency: str) -> int:
         currency = currency.upper()
@@ -31,7 +88,6 @@ class Paystack:
         return amount if currency in CURRENCIES_NO_MULTIPLY else amount * 100
 
     async def initialize_transaction(self, email: str, plan: str, currency: str, callback_url: str):
-        url = f"{self.base_url}/transaction/initialize"
         amount = self.get_amount(plan, currency)
 
         data = {
@@ -41,18 +97,34 @@ class Paystack:
             "channels": ["card", "mobile_money"],
             "currency": currency.upper()
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=self.headers)
-            response.raise_for_status()
-            print(response.json())
-            return response.json()
+        response = await self.client.post("/transaction/initialize", json=data)
+        response.raise_for_status()
+        return response.json()
 
     async def verify_transaction(self, reference: str):
         """
-        Verify the transaction status by reference
+        Verify the transaction status by reference. Retried with exponential
+        backoff on timeouts, connection errors, 429 and 5xx.
         """
-        url = f"{self.base_url}/transaction/verify/{reference}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        for attempt in range(PAYSTACK_VERIFY_RETRIES + 1):
+            try:
+                response = await self.client.get(f"/transaction/verify/{reference}")
+                if response.status_code not in RETRYABLE_STATUS or attempt == PAYSTACK_VERIFY_RETRIES:
+                    response.raise_for_status()
+                    return response.json()
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"Paystack verify {reference} returned {response.status_code}, retrying in {delay:.2f}s")
+            except httpx.TransportError as e:
+                if attempt == PAYSTACK_VERIFY_RETRIES:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Paystack verify {reference} failed ({e!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), PAYSTACK_RETRY_MAX_DELAY)
+        return min(PAYSTACK_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random() / 2), PAYSTACK_RETRY_MAX_DELAY)
+
+
+paystack = Paystack()
@@ -1,12 +1,32 @@
 from fastapi import HTTPException
-from sqlalchemy import insert, select, update, delete
+from sqlalchemy import insert, select, update, delete, func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.types import JSON, DateTime
 from uuid import uuid4
 import re
 from datetime import datetime
+import os
 from utils.helper import Helper
 from utils.logger import logger
+from utils.cache import TwoTierCache
+from services.resume_scorer import resume_scorer
 from schema.schema import profiles, users, skills, experience, education, certifications, achievements, projects
 
+# Upper bound for one /profile/bulk request; keeps the IN lists well under the
+# driver's bind parameter limit and the transaction a reasonable size
+MAX_BULK_PROFILES = int(os.getenv("MAX_BULK_PROFILES", 1000))
+
+# Bump PROFILE_CACHE_VERSION whenever the shape of a cached profile changes
+PROFILE_CACHE_VERSION = 1
+profile_cache = TwoTierCache(
+    "profile",
+    PROFILE_CACHE_VERSION,
+    ttl=int(os.getenv("PROFILE_CACHE_TTL", 600)),
+    local_ttl=float(os.getenv("PROFILE_CACHE_LOCAL_TTL", 5)),
+    local_maxsize=int(os.getenv("PROFILE_CACHE_LOCAL_SIZE", 1024)),
+    max_bytes=int(os.getenv("PROFILE_CACHE_MAX_BYTES", 256 * 1024)),
+)
+
 class Profile:
     def __init__(self, helper: Helper, engine):
         self.helper = helper
@@ -54,15 +74,15 @@ class Profile:
             "projects": {"title", "description", "link"}
         }
 
-    def create(self, data: dict, user_id: str):
+    async def create(self, data: dict, user_id: str):
         if not user_id:
             raise HTTPException(400, "user_id is required")
 
         if not data.get("full_name"):
             raise HTTPException(400, "Full name is required")
 
-        self._validate_user(user_id)
-        self._validate_unique_profile(user_id)
+        await self._validate_user(user_id)
+        await self._validate_unique_profile(user_id)
 
         # Validate only if value is present (None-safe)
         self._validate_urls(
@@ -73,89 +93,245 @@ class Profile:
         self._validate_phone(data.get("phone") or "")
 
         profile_id = str(uuid4())
+        child_rows = self._build_child_rows(profile_id, data)
         
         try:
-            with self.engine.begin() as conn:
+            async with self.engine.begin() as conn:
                 # Safely insert profile with fallbacks for optional fields
-                conn.execute(insert(profiles).values(
-                    id=profile_id,
-                    user_id=user_id,
-                    full_name=data["full_name"],
-                    linkedin=data.get("linkedin"),
-                    github=data.get("github"),
-                    website=data.get("website"),
-                    phone=data.get("phone"),
-                    country=data.get("country"),
-                    city=data.get("city"),
-                    updated_at=datetime.utcnow()
-                ))
+                await conn.execute(insert(profiles).values(**self._build_profile_row(profile_id, user_id, data)))
 
-                # Safely insert nested data only if list is non-empty
-                for field, parser in self.insert_map.items():
-                    items = data.get(field) or []
-                    for item in items:
-                        if item:  # Skip empty dicts or nulls
-                            parsed = parser(item)
-                            conn.execute(
-                                insert(self.tables[field]).values(
-                                    id=str(uuid4()),
-                                    profile_id=profile_id,
-                                    **parsed
-                                )
-                            )
+                # One executemany per child table instead of one INSERT per item
+                for field, rows in child_rows.items():
+                    await conn.execute(insert(self.tables[field]), rows)
                 logger.info(f"Profile created: {profile_id}")
-                return {"id": profile_id, "message": "Profile created"}
+            await self._invalidate_cache(user_id, profile_id)
+            await self._refresh_index(user_id)
+            return {"id": profile_id, "message": "Profile created"}
         
+        except IntegrityError as e:
+            logger.warning(f"Profile creation conflicted: {str(e)}")
+            raise HTTPException(409, "Profile already exists")
         except Exception as e:
             logger.error(f"Profile creation failed: {str(e)}")
             raise HTTPException(500, "Failed to create profile")
 
+    async def bulk_create(self, items: list[dict]):
+        """
+        Creates many profiles in a single transaction. Each item carries its own
+        user_id; rows are grouped per table and sent as one executemany each.
+        """
+        if not items:
+            raise HTTPException(400, "No profiles provided")
+        if len(items) > MAX_BULK_PROFILES:
+            raise HTTPException(413, f"At most {MAX_BULK_PROFILES} profiles per request")
+
+        user_ids = [item.get("user_id") for item in items]
+        if not all(user_ids):
+            raise HTTPException(400, "user_id is required for every profile")
+        if len(set(user_ids)) != len(user_ids):
+            raise HTTPException(400, "Duplicate user_id in request")
+
+        for item in items:
+            if not item.get("full_name"):
+                raise HTTPException(400, f"Full name is required for user {item['user_id']}")
+            self._validate_urls(item.get("linkedin") or "", item.get("github") or "", item.get("website") or "")
+            self._validate_phone(item.get("phone") or "")
+
+        async with self.engine.connect() as conn:
+            found = set((await conn.execute(select(users.c.id).where(users.c.id.in_(user_ids)))).scalars())
+            existing = set((await conn.execute(select(profiles.c.user_id).where(profiles.c.user_id.in_(user_ids)))).scalars())
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if missing:
+            raise HTTPException(404, f"Users not found: {', '.join(missing)}")
+        if existing:
+            raise HTTPException(409, f"Profiles already exist for users: {', '.join(sorted(existing))}")
+
+        profile_rows = []
+        child_rows = {field: [] for field in self.insert_map}
+        for item in items:
+            profile_id = str(uuid4())
+            profile_rows.append(self._build_profile_row(profile_id, item["user_id"], item))
+            for field, rows in self._build_child_rows(profile_id, item).items():
+                child_rows[field].extend(rows)
 
-    def read(self, profile_id: str):
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(select(profiles).where(profiles.c.id == profile_id)).fetchone()
+            async with self.engine.begin() as conn:
+                await conn.execute(insert(profiles), profile_rows)
+                for field, rows in child_rows.items():
+                    if rows:
+                        await conn.execute(insert(self.tables[field]), rows)
+            for row in profile_rows:
+                await self._invalidate_cache(row["user_id"], row["id"])
+            logger.info(f"Bulk created {len(profile_rows)} profiles")
+            return {
+                "ids": [row["id"] for row in profile_rows],
+                "message": f"{len(profile_rows)} profiles created"
+            }
+        except IntegrityError as e:
+            # A concurrent create won the race on the unique profiles.user_id index
+            logger.warning(f"Bulk profile creation conflicted: {str(e)}")
+            raise HTTPException(409, "Profiles already exist for some users")
+        except Exception as e:
+            logger.error(f"Bulk profile creation failed: {str(e)}")
+            raise HTTPException(500, "Failed to create profiles")
+
+    def _build_profile_row(self, profile_id: str, user_id: str, data: dict) -> dict:
+        return {
+            "id": profile_id,
+            "user_id": user_id,
+            "full_name": data["full_name"],
+            "linkedin": data.get("linkedin"),
+            "github": data.get("github"),
+            "website": data.get("website"),
+            "phone": data.get("phone"),
+            "country": data.get("country"),
+            "city": data.get("city"),
+            "updated_at": datetime.utcnow()
+        }
+
+    def _build_child_rows(self, profile_id: str, data: dict) -> dict[str, list[dict]]:
+        """
+        Parses every nested section into insert-ready rows with ids generated up
+        front. Sections with no items are left out.
+        """
+        child_rows = {}
+        for field, parser in self.insert_map.items():
+            items = data.get(field) or []
+            rows = [
+                {"id": str(uuid4()), "profile_id": profile_id, **parser(item)}
+                for item in items
+                if item  # Skip empty dicts or nulls
+            ]
+            if rows:
+                child_rows[field] = rows
+        return child_rows
+
+
+    async def read(self, profile_id: str):
+        cached, generation = await profile_cache.lookup(f"id:{profile_id}")
+        if cached is not None:
+            return self._restore_types(cached)
+
+        try:
+            async with self.engine.connect() as conn:
+                result = (await conn.execute(select(profiles).where(profiles.c.id == profile_id))).fetchone()
                 if not result:
                     raise HTTPException(404, "Profile not found")
                 logger.info(f"Profile retrieved: {profile_id}")
-                return dict(result._mapping)
+            profile = dict(result._mapping)
+            await profile_cache.set(f"id:{profile_id}", profile, generation)
+            return profile
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Profile retrieval failed: {str(e)}")
             raise HTTPException(500, "Failed to retrieve profile")
 
-    def get_by_user_id(self, user_id: str):
+    async def get_by_user_id(self, user_id: str):
+        cached, generation = await profile_cache.lookup(f"user:{user_id}")
+        if cached is not None:
+            return self._restore_types(cached)
+
         try:
-            with self.engine.connect() as conn:
-                profile_result = conn.execute(select(profiles).where(profiles.c.user_id == user_id)).fetchone()
-                if not profile_result:
-                    raise HTTPException(404, "Profile not found")
-                profile = dict(profile_result._mapping)
-                profile_id = profile['id']
+            async with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    profile = await self._load_aggregate(conn, user_id)
+                else:
+                    profile = await self._load_aggregate_per_table(conn, user_id)
 
-                for field in self.insert_map:
-                    results = conn.execute(select(self.tables[field]).where(self.tables[field].c.profile_id == profile_id)).fetchall()
-                    profile[field] = [dict(row._mapping) for row in results]
+                if profile is None:
+                    raise HTTPException(404, "Profile not found")
 
                 logger.info(f"Profile retrieved for user: {user_id}")
-                return profile 
+            await profile_cache.set(f"user:{user_id}", profile, generation)
+            return profile 
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Profile retrieval failed for user {user_id}: {str(e)}")
             raise HTTPException(500, "Failed to retrieve profile")
 
+    async def _load_aggregate(self, conn, user_id: str):
+        """
+        Loads the profile row and every child section in one round trip, each
+        section aggregated into a JSON array by a correlated subquery.
+        """
+        sections = []
+        for field in self.insert_map:
+            table = self.tables[field]
+            sections.append(
+                select(func.coalesce(func.json_agg(table.table_valued()), text("'[]'::json"), type_=JSON))
+                .where(table.c.profile_id == profiles.c.id)
+                .scalar_subquery()
+                .label(field)
+            )
+
+        row = (await conn.execute(select(profiles, *sections).where(profiles.c.user_id == user_id))).fetchone()
+        return self._restore_types(dict(row._mapping)) if row else None
+
+    def _restore_types(self, profile: dict) -> dict:
+        """
+        JSON (json_agg or the cache) carries DateTime columns as ISO strings;
+        convert them back so every path returns the same types as a plain
+        SELECT would.
+        """
+        def restore(table, row):
+            for column in table.c:
+                value = row.get(column.name)
+                if isinstance(column.type, DateTime) and isinstance(value, str):
+                    row[column.name] = datetime.fromisoformat(value)
+            return row
 
-    def add_skill(self, user_id: str, data: dict) -> dict[str, str]:
-        try:                
-            with self.engine.connect() as conn:
-                conn.execute()
+        restore(profiles, profile)
+        for field in self.insert_map:
+            if field in profile:
+                profile[field] = [restore(self.tables[field], row) for row in profile[field]]
+        return profile
+
+    async def _load_aggregate_per_table(self, conn, user_id: str):
+        """
+        Portable fallback for dialects without json_agg (e.g. SQLite): one query
+        for the profile and one per child section.
+        """
+        profile_result = (await conn.execute(select(profiles).where(profiles.c.user_id == user_id))).fetchone()
+        if not profile_result:
+            return None
+        profile = dict(profile_result._mapping)
+        profile_id = profile['id']
+
+        for field in self.insert_map:
+            results = (await conn.execute(select(self.tables[field]).where(self.tables[field].c.profile_id == profile_id))).fetchall()
+            profile[field] = [dict(row._mapping) for row in results]
+        return profile
+
+    async def add_item(self, entity: str, profile_id: str, item) -> dict[str, str]:
+        """Adds one row to a child section, parsed the same way as in create."""
+        if entity not in self.insert_map:
+            raise HTTPException(400, f"Invalid entity: {entity}")
+        if not item:
+            raise HTTPException(400, "No valid fields provided")
+
+        item_id = str(uuid4())
+        try:
+            async with self.engine.begin() as conn:
+                owner_id = await self._profile_owner(conn, profile_id)
+                if owner_id is None:
+                    raise HTTPException(404, "Profile not found")
+                await conn.execute(insert(self.tables[entity]).values(
+                    id=item_id, profile_id=profile_id, **self.insert_map[entity](item)
+                ))
+                await self._touch(conn, profile_id)
+                logger.info(f"{entity.capitalize()} {item_id} added to profile {profile_id}")
+            await self._invalidate_cache(owner_id, profile_id)
+            await self._refresh_index(owner_id)
+            return {"id": item_id, "message": f"{entity.capitalize()} created"}
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error("Error in adding skill: ", e)
-            raise HTTPException()
+            logger.error(f"Failed to add {entity} to profile {profile_id}: {str(e)}")
+            raise HTTPException(500, f"Failed to add {entity}")
 
-    def update(self, entity: str, item_id: str, profile_id: str, data: dict):
+    async def update(self, entity: str, item_id: str, profile_id: str, data: dict):
         if entity not in self.tables:
             raise HTTPException(400, f"Invalid entity: {entity}")
 
@@ -175,58 +351,108 @@ class Profile:
             update_data["updated_at"] = datetime.utcnow()
 
         try:
-            with self.engine.connect() as conn:
+            async with self.engine.connect() as conn:
                 table = self.tables[entity]
-                query = select(table.c.id).where(table.c.id == item_id, table.c.profile_id == profile_id)
                 if entity == "profiles":
                     query = select(table.c.id).where(table.c.id == profile_id)
-                
-                if not conn.execute(query).fetchone():
+                else:
+                    query = select(table.c.id).where(table.c.id == item_id, table.c.profile_id == profile_id)
+
+                if not (await conn.execute(query)).fetchone():
                     raise HTTPException(404, f"{entity.capitalize()} not found")
 
-                conn.execute(update(table).where(table.c.id == item_id).values(**update_data))
-                conn.commit()
+                await conn.execute(update(table).where(table.c.id == item_id).values(**update_data))
+                if entity != "profiles":
+                    await self._touch(conn, profile_id)
+                await conn.commit()
+                owner_id = await self._profile_owner(conn, profile_id)
                 logger.info(f"{entity.capitalize()} {item_id} updated for profile {profile_id}")
-                return {"message": f"{entity.capitalize()} updated"}
+            await self._invalidate_cache(owner_id, profile_id)
+            await self._refresh_index(owner_id)
+            return {"message": f"{entity.capitalize()} updated"}
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Failed to update {entity} {item_id}: {str(e)}")
             raise HTTPException(500, f"Failed to update {entity}")
 
-    def delete(self, entity: str, item_id: str, profile_id: str):
+    async def delete(self, entity: str, item_id: str, profile_id: str):
         if entity not in self.tables:
             raise HTTPException(400, f"Invalid entity: {entity}")
 
         try:
-            with self.engine.connect() as conn:
+            async with self.engine.connect() as conn:
                 table = self.tables[entity]
-                query = delete(table).where(table.c.id == item_id, table.c.profile_id == profile_id)
+                owner_id = await self._profile_owner(conn, profile_id)
                 if entity == "profiles":
                     for field in self.insert_map:
-                        conn.execute(delete(self.tables[field]).where(self.tables[field].c.profile_id == profile_id))
+                        await conn.execute(delete(self.tables[field]).where(self.tables[field].c.profile_id == profile_id))
                     query = delete(table).where(table.c.id == profile_id)
+                else:
+                    query = delete(table).where(table.c.id == item_id, table.c.profile_id == profile_id)
                 
-                result = conn.execute(query)
-                conn.commit()
+                result = await conn.execute(query)
+                if entity != "profiles":
+                    await self._touch(conn, profile_id)
+                await conn.commit()
                 if result.rowcount == 0:
                     raise HTTPException(404, f"{entity.capitalize()} not found")
                 logger.info(f"{entity.capitalize()} {item_id} deleted for profile {profile_id}")
-                return {"message": f"{entity.capitalize()} deleted"}
+            await self._invalidate_cache(owner_id, profile_id)
+            if entity != "profiles":
+                await self._refresh_index(owner_id)
+            return {"message": f"{entity.capitalize()} deleted"}
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Failed to delete {entity} {item_id}: {str(e)}")
             raise HTTPException(500, f"Failed to delete {entity}")
 
-    def _validate_user(self, user_id):
-        with self.engine.connect() as conn:
-            if not conn.execute(select(users.c.id).where(users.c.id == user_id)).fetchone():
+    async def assert_owner(self, profile_id: str, user_id: str):
+        async with self.engine.connect() as conn:
+            owner_id = await self._profile_owner(conn, profile_id)
+        if owner_id is None:
+            raise HTTPException(404, "Profile not found")
+        if owner_id != user_id:
+            raise HTTPException(403, "Not allowed to modify this profile")
+
+    async def _touch(self, conn, profile_id: str):
+        """Bumps the profile's updated_at; it covers the child sections too."""
+        await conn.execute(update(profiles).where(profiles.c.id == profile_id).values(updated_at=datetime.utcnow()))
+
+    async def _profile_owner(self, conn, profile_id: str) -> str | None:
+        return (await conn.execute(select(profiles.c.user_id).where(profiles.c.id == profile_id))).scalar()
+
+    async def _invalidate_cache(self, user_id: str | None, profile_id: str):
+        keys = [f"id:{profile_id}"]
+        if user_id:
+            keys.append(f"user:{user_id}")
+        await profile_cache.delete(*keys)
+        if user_id:
+            await resume_scorer.invalidate(user_id)
+
+    async def _refresh_index(self, user_id: str | None):
+        """
+        Rebuilds the user's relevance index (services/resume_scorer.py) right
+        after a write, so the next score doesn't pay for it. The write has
+        already committed, so a failure here is only logged; the index is then
+        built on the next score instead.
+        """
+        if not user_id:
+            return
+        try:
+            await resume_scorer.index(user_id, lambda: self.get_by_user_id(user_id))
+        except Exception as e:
+            logger.warning(f"Relevance index refresh failed for user {user_id}: {str(e)}")
+
+    async def _validate_user(self, user_id):
+        async with self.engine.connect() as conn:
+            if not (await conn.execute(select(users.c.id).where(users.c.id == user_id))).fetchone():
                 raise HTTPException(404, f"User {user_id} not found")
 
-    def _validate_unique_profile(self, user_id):
-        with self.engine.connect() as conn:
-            if conn.execute(select(profiles.c.id).where(profiles.c.user_id == user_id)).fetchone():
+    async def _validate_unique_profile(self, user_id):
+        async with self.engine.connect() as conn:
+            if (await conn.execute(select(profiles.c.id).where(profiles.c.user_id == user_id))).fetchone():
                 raise HTTPException(409, "Profile already exists")
 
     def _validate_urls(self, *urls):
@@ -0,0 +1,176 @@
+"""
+Builds the resume prompt from a profile within a token budget, offline and
+deterministically. Profile items are ranked by TF-IDF overlap with the job
+description and the prompt lists each section most relevant first. When the
+prompt is over RESUME_PROMPT_TOKEN_BUDGET, the least relevant items are
+compacted first: their descriptions are cut to the sentences that overlap
+the job most (RESUME_PROMPT_SUMMARY_TOKENS), and if that is not enough the
+items are dropped. Skills and the profile header are always kept.
+
+Token counts come from count_tokens, a local estimate that errs high, so a
+prompt within budget here is within budget for the model.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from fastapi.encoders import jsonable_encoder
+
+RESUME_PROMPT_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", 3000))
+RESUME_PROMPT_SUMMARY_TOKENS = int(os.getenv("RESUME_PROMPT_SUMMARY_TOKENS", 60))
+
+# Keys that only matter to the database
+INTERNAL_KEYS = {"id", "user_id", "profile_id", "created_at", "updated_at"}
+
+# Sections whose items are ranked and may be compacted, with their free-text field
+RANKED_SECTIONS = {
+    "experience": "description",
+    "projects": "description",
+    "achievements": "description",
+    "certifications": None,
+    "education": None,
+}
+
+_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|\S")
+_TERMS = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+_SENTENCES = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was we were will
+with you your they them who what which when where how all any can into over per via about across within
+""".split())
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimated tokens: a word costs one token per 5 letters (rounded up), a
+    number one per 3 digits and any other character one. BPE tokenizers
+    encode common English words as a single token, so this counts high.
+    """
+    total = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isdigit():
+            total += 1
+        elif piece[0].isalpha():
+            total += math.ceil(len(piece) / 5) if piece.isascii() else len(piece)
+        else:
+            total += 1
+    return total
+
+
+def terms(text: str) -> list[str]:
+    """Lowercased words without stopwords; keeps tech tokens like c++, c# and node.js whole."""
+    return [term for term in _TERMS.findall(text.lower()) if term not in STOPWORDS]
+
+
+def profile_for_prompt(profile: dict) -> dict:
+    """The profile without ids, timestamps and empty values."""
+    def clean(value):
+        if isinstance(value, dict):
+            return {k: clean(v) for k, v in value.items() if k not in INTERNAL_KEYS and v not in (None, "", [])}
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        return value
+    return clean(jsonable_encoder(profile))
+
+
+def item_text(item) -> str:
+    if isinstance(item, dict):
+        return " ".join(str(value) for value in item.values())
+    return str(item)
+
+
+class Relevance:
+    """TF-IDF overlap with the job description, with IDF over the profile's own items."""
+
+    def __init__(self, job_description: str, documents: list[str]):
+        self.job = Counter(terms(job_description))
+        document_frequency = Counter()
+        for document in documents:
+            document_frequency.update(set(terms(document)))
+        n = max(1, len(documents))
+        self.idf = {term: math.log(1 + n / document_frequency[term]) for term in document_frequency}
+
+    def score(self, text: str) -> float:
+        found = set(terms(text))
+        if not found:
+            return 0.0
+        overlap = sum((1 + math.log(self.job[term])) * self.idf.get(term, 1.0) for term in found if term in self.job)
+        # Normalised so a long description is not relevant just for being long
+        return overlap / math.sqrt(len(found))
+
+
+def summarize(text: str, relevance: Relevance, max_tokens: int) -> str:
+    """The sentences that overlap the job most, kept in their original order, up to max_tokens."""
+    sentences = [s.strip() for s in _SENTENCES.split(text) if s.strip()]
+    ranked = sorted(range(len(sentences)), key=lambda i: (-relevance.score(sentences[i]), i))
+    kept, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(sentences[i])
+        if used + cost > max_tokens:
+            continue
+        kept.add(i)
+        used += cost
+    if not kept:
+        # Not even one whole sentence fits: cut the first one at a word boundary
+        words, cut = sentences[0].split() if sentences else [], []
+        for word in words:
+            if count_tokens(" ".join(cut + [word])) > max_tokens - 1:
+                break
+            cut.append(word)
+        return " ".join(cut) + "…" if cut else ""
+    return " ".join(sentences[i] for i in sorted(kept))
+
+
+def render(profile: dict, job_description: str) -> str:
+    return (
+        f"Candidate profile (JSON):\n{json.dumps(profile, ensure_ascii=False)}\n\n"
+        f"Job description:\n{job_description}"
+    )
+
+
+def build_prompt(profile: dict, job_description: str, budget: int = RESUME_PROMPT_TOKEN_BUDGET) -> tuple[str, dict]:
+    """
+    Returns the prompt and a report: {"tokens", "budget", "summarized",
+    "dropped"}, the last two counting compacted items.
+    """
+    job_description = job_description.strip()
+    compact = profile_for_prompt(profile)
+    items = [(section, item) for section in RANKED_SECTIONS for item in compact.get(section, [])]
+    skills = compact.get("skills", [])
+    relevance = Relevance(job_description, [item_text(item) for _, item in items] + [item_text(skill) for skill in skills])
+
+    scores = {id(item): relevance.score(item_text(item)) for _, item in items}
+    for section in RANKED_SECTIONS:
+        if section in compact:
+            compact[section] = sorted(compact[section], key=lambda item: -scores[id(item)])
+    if skills:
+        compact["skills"] = sorted(skills, key=lambda skill: -relevance.score(item_text(skill)))
+
+    report = {"tokens": 0, "budget": budget, "summarized": 0, "dropped": 0}
+    tokens = count_tokens(render(compact, job_description))
+    victims = sorted(items, key=lambda entry: scores[id(entry[1])])  # least relevant first
+
+    for section, item in victims:
+        field = RANKED_SECTIONS[section]
+        if tokens <= budget:
+            break
+        if field and field in item and count_tokens(item[field]) > RESUME_PROMPT_SUMMARY_TOKENS:
+            before = count_tokens(json.dumps(item, ensure_ascii=False))
+            item[field] = summarize(item[field], relevance, RESUME_PROMPT_SUMMARY_TOKENS)
+            tokens -= before - count_tokens(json.dumps(item, ensure_ascii=False))
+            report["summarized"] += 1
+    for section, item in victims:
+        if tokens <= budget:
+            break
+        tokens -= count_tokens(json.dumps(item, ensure_ascii=False))
+        compact[section] = [kept for kept in compact[section] if kept is not item]
+        if not compact[section]:
+            del compact[section]
+        report["dropped"] += 1
+
+    prompt = render(compact, job_description)
+    report["tokens"] = count_tokens(prompt)
+    return prompt, report
@@ -0,0 +1,135 @@
+"""
+Content-addressed cache of generated resumes, so regenerating for the same
+job with an unchanged profile costs no LLM call. The key is a SHA-256 over
+the normalized profile (including its updated_at), the normalized job
+description, the model, the prompt version and the prompt token budget; any
+change to one of them is a different key. When a user's profile changes, their entries for older
+profile versions are dropped on the next write.
+
+Outputs are stored zlib-compressed in the resume_cache table. Once the
+compressed total passes RESUME_CACHE_MAX_BYTES the least recently used
+entries are evicted.
+"""
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import zlib
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+
+from schema.schema import resume_cache
+from utils.helper import UPSERT_INSERTS
+from utils.logger import logger
+
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+RESUME_CACHE_COMPRESSION_LEVEL = int(os.getenv("RESUME_CACHE_COMPRESSION_LEVEL", 6))
+
+
+def normalize_text(text: str) -> str:
+    """NFKC with runs of whitespace collapsed, so reformatting a pasted job post keeps the key."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def canonical(value):
+    """Lists sorted by content, so the order rows come back in does not change the key."""
+    if isinstance(value, dict):
+        return {k: canonical(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return sorted((canonical(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, str):
+        return normalize_text(value)
+    return value
+
+
+def cache_key(profile: dict, profile_updated_at: datetime | None, job_description: str, model: str,
+              prompt_version: int, prompt_budget: int | None = None) -> str:
+    material = {
+        "profile": canonical(profile),
+        "profile_updated_at": profile_updated_at.isoformat() if profile_updated_at else None,
+        "job_description": normalize_text(job_description),
+        "model": model,
+        "prompt_version": prompt_version,
+        "prompt_budget": prompt_budget,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class ResumeCache:
+    def __init__(self, engine, max_bytes: int = RESUME_CACHE_MAX_BYTES,
+                 compression_level: int = RESUME_CACHE_COMPRESSION_LEVEL):
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> str | None:
+        try:
+            async with self.engine.begin() as conn:
+                output = (await conn.execute(select(resume_cache.c.output).where(resume_cache.c.key == key))).scalar()
+                if output is not None:
+                    await conn.execute(
+                        update(resume_cache).where(resume_cache.c.key == key).values(last_used_at=datetime.utcnow())
+                    )
+        except Exception as e:
+            logger.warning(f"Resume cache read failed for {key}: {e}")
+            output = None
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return zlib.decompress(output).decode()
+
+    async def put(self, key: str, user_id: str, profile_updated_at: datetime | None, model: str, output: str):
+        compressed = zlib.compress(output.encode(), self.compression_level)
+        now = datetime.utcnow()
+        try:
+            async with self.engine.begin() as conn:
+                # Entries built from an older version of this profile can never be hit again
+                await conn.execute(delete(resume_cache).where(
+                    resume_cache.c.user_id == user_id,
+                    resume_cache.c.profile_updated_at.is_distinct_from(profile_updated_at),
+                ))
+                await conn.execute(UPSERT_INSERTS[conn.dialect.name](resume_cache).values(
+                    key=key, user_id=user_id, profile_updated_at=profile_updated_at, model=model,
+                    output=compressed, size=len(compressed), created_at=now, last_used_at=now,
+                ).on_conflict_do_nothing(index_elements=[resume_cache.c.key]))
+                await self._evict(conn)
+        except Exception as e:
+            logger.warning(f"Resume cache write failed for {key}: {e}")
+
+    async def _evict(self, conn):
+        total = (await conn.execute(select(func.coalesce(func.sum(resume_cache.c.size), 0)))).scalar()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        oldest = await conn.execute(
+            select(resume_cache.c.key, resume_cache.c.size).order_by(resume_cache.c.last_used_at).limit(1000)
+        )
+        for key, size in oldest:
+            victims.append(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        await conn.execute(delete(resume_cache).where(resume_cache.c.key.in_(victims)))
+        self.evictions += len(victims)
+
+    async def stats(self) -> dict:
+        async with self.engine.connect() as conn:
+            entries, size = (await conn.execute(
+                select(func.count(), func.coalesce(func.sum(resume_cache.c.size), 0))
+            )).one()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -1,14 +1,170 @@
+"""
+Generates a resume tailored to a job description from the user's profile,
+streaming the model's text as it arrives. Every run is recorded in
+resume_generations: a row is written with status 'streaming' before the
+first token and finished as 'completed', 'failed' or 'cancelled' (the client
+went away) with the output so far and the token usage. The prompt is built
+within the engine's token budget by services/prompt_builder.py.
+
+With a ResumeCache, a run whose inputs were generated before is answered
+from the cache and recorded as 'cached'; only complete outputs are cached.
+
+The OpenAI client is created on first use, so importing this module needs no
+API key.
+"""
+import asyncio
 import os
-from openai import OpenAI
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import uuid4
+
+from fastapi import HTTPException
+from openai import AsyncOpenAI, OpenAIError
+from sqlalchemy import insert, select, update
+from starlette.status import HTTP_404_NOT_FOUND
+
+from schema.schema import async_engine, resume_generations
+from services.prompt_builder import RESUME_PROMPT_TOKEN_BUDGET, build_prompt, profile_for_prompt
+from services.resume_cache import ResumeCache, cache_key
+from utils.logger import logger
+
+RESUME_MODEL = os.getenv("RESUME_MODEL", "gpt-3.5-turbo")
+RESUME_MAX_OUTPUT_TOKENS = int(os.getenv("RESUME_MAX_OUTPUT_TOKENS", 2500))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 120))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+
+# Bump whenever INSTRUCTIONS or build_prompt change, so cached resumes from the old prompt are not served
+PROMPT_VERSION = 2
+
+INSTRUCTIONS = """You write one-page resumes tailored to a job description.
+Use only facts from the candidate's profile; never invent employers, dates,
+degrees or numbers. Order and phrase the experience, projects and skills so
+the ones most relevant to the job come first.
+Reply with the resume as an HTML fragment for a rich-text editor: headings,
+paragraphs and lists with simple inline styles, no <html>, <head> or <body>
+tags and no Markdown code fences."""
+
+
+class ResumeEngine:
+    def __init__(self, engine, client: AsyncOpenAI | None = None, model: str = RESUME_MODEL,
+                 max_output_tokens: int = RESUME_MAX_OUTPUT_TOKENS, cache: ResumeCache | None = None,
+                 prompt_budget: int = RESUME_PROMPT_TOKEN_BUDGET):
+        self.engine = engine
+        self.cache = cache
+        self._client = client
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.prompt_budget = prompt_budget
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+
+    async def stream(self, user_id: str, profile: dict, job_description: str) -> AsyncIterator[dict]:
+        """
+        Yields {"event": "start", "id"}, then {"event": "delta", "text"} per
+        chunk of output, then {"event": "done", ...} or {"event": "error", ...}.
+        """
+        generation_id = str(uuid4())
+        key = None
+        if self.cache is not None:
+            key = cache_key(profile_for_prompt(profile), profile.get("updated_at"), job_description,
+                            self.model, PROMPT_VERSION, self.prompt_budget)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                await self._record(generation_id, user_id, job_description, "cached", output=cached)
+                yield {"event": "start", "id": generation_id}
+                yield {"event": "delta", "text": cached}
+                yield {"event": "done", "id": generation_id, "cached": True}
+                return
+
+        prompt, report = build_prompt(profile, job_description, self.prompt_budget)
+        logger.info(
+            f"Resume generation {generation_id}: prompt of ~{report['tokens']} tokens (budget {report['budget']}), "
+            f"{report['summarized']} items summarized, {report['dropped']} dropped"
+        )
+        await self._record(generation_id, user_id, job_description, "streaming")
+        yield {"event": "start", "id": generation_id}
+
+        chunks, usage, complete = [], None, False
+        try:
+            response = await self.client.responses.create(
+                model=self.model,
+                instructions=INSTRUCTIONS,
+                input=prompt,
+                max_output_tokens=self.max_output_tokens,
+                stream=True,
+            )
+            async for event in response:
+                if event.type == "response.output_text.delta":
+                    chunks.append(event.delta)
+                    yield {"event": "delta", "text": event.delta}
+                elif event.type in ("response.completed", "response.incomplete"):
+                    # incomplete: cut off at max_output_tokens; keep what was written but don't cache it
+                    usage = event.response.usage
+                    complete = event.type == "response.completed"
+                elif event.type == "response.failed":
+                    error = event.response.error
+                    raise OpenAIError(error.message if error else "Generation failed")
+                elif event.type == "error":
+                    raise OpenAIError(event.message)
+        except (asyncio.CancelledError, GeneratorExit):
+            await self._finish(generation_id, "cancelled", chunks, usage)
+            raise
+        except Exception as e:
+            logger.error(f"Resume generation {generation_id} failed for user {user_id}: {e}")
+            await self._finish(generation_id, "failed", chunks, usage, error=str(e))
+            yield {"event": "error", "id": generation_id, "detail": "Resume generation failed"}
+            return
+
+        await self._finish(generation_id, "completed", chunks, usage)
+        if key is not None and complete:
+            await self.cache.put(key, user_id, profile.get("updated_at"), self.model, "".join(chunks))
+        yield {"event": "done", "id": generation_id, "cached": False,
+               "input_tokens": usage.input_tokens if usage else None,
+               "output_tokens": usage.output_tokens if usage else None}
+
+    async def output(self, generation_id: str, user_id: str) -> str:
+        """The HTML of one of the user's finished generations; 404 if missing, unfinished or not theirs."""
+        async with self.engine.connect() as conn:
+            output = (await conn.execute(
+                select(resume_generations.c.output).where(
+                    resume_generations.c.id == generation_id,
+                    resume_generations.c.user_id == user_id,
+                    resume_generations.c.status.in_(("completed", "cached")),
+                )
+            )).scalar()
+        if not output:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Resume not found")
+        return output
+
+    async def _record(self, generation_id: str, user_id: str, job_description: str, status: str,
+                      output: str | None = None):
+        now = datetime.utcnow()
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(resume_generations).values(
+                id=generation_id, user_id=user_id, status=status, model=self.model, job_description=job_description,
+                output=output, generated_at=now, completed_at=now if output is not None else None,
+            ))
 
-client = OpenAI(
-    api_key=os.environ.get("OPENAI_API_KEY"),
-)
+    async def _finish(self, generation_id: str, status: str, chunks: list[str], usage, error: str | None = None):
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(resume_generations).where(resume_generations.c.id == generation_id).values(
+                        status=status, output="".join(chunks), error=error, completed_at=datetime.utcnow(),
+                        input_tokens=usage.input_tokens if usage else None,
+                        output_tokens=usage.output_tokens if usage else None,
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Could not record resume generation {generation_id} as {status}: {e}")
 
-response = client.responses.create(
-    model="gpt-3.5-turbo",
-    instructions="You are a coding assistant that talks like a pirate.",
-    input="How do I check if a Python object is an instance of a class?",
-)
 
-print(response.output_text)
+resume_engine = ResumeEngine(async_engine, cache=ResumeCache(async_engine))
@@ -0,0 +1,325 @@
+"""
+Resume generation off the request path. `submit` records a job in
+resume_jobs and appends it to a Redis stream; ResumeJobWorkerPool, run in
+separate processes by resume_worker.py, reads the streams through a consumer
+group, runs each job through ResumeEngine and publishes its events to a
+per-job stream (`resume:job:{id}:events`) that the status endpoints replay
+and follow. The resume itself is the resume_generations row the job links to.
+
+There are two lanes: jobs from users on a weekly or monthly plan go to
+`resume:jobs:high`, which workers always drain before `resume:jobs:normal`.
+A user may have at most RESUME_JOBS_PER_USER unfinished jobs. A job held by
+a crashed worker is reclaimed once it has been idle for
+RESUME_JOBS_CLAIM_IDLE_MS, which must outlast the slowest model call. Its
+events stream is then cleared and starts over with a `restart` event, so
+readers see one run and anyone already following drops the partial output.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi import HTTPException
+from redis.exceptions import ResponseError
+from sqlalchemy import insert, select, update
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_429_TOO_MANY_REQUESTS
+
+from schema.schema import async_engine, resume_generations, resume_jobs
+from services.profile_service import Profile
+from services.resume_engine import resume_engine
+from utils.cache import redis_client
+from utils.helper import helper
+from utils.logger import logger
+
+HIGH = "resume:jobs:high"
+NORMAL = "resume:jobs:normal"
+STREAMS = {"high": HIGH, "normal": NORMAL}
+GROUP = "resume-workers"
+PRIORITY_BY_PLAN = {"monthly": "high", "weekly": "high"}
+FINISHED = ("completed", "failed")
+
+RESUME_JOBS_PER_USER = int(os.getenv("RESUME_JOBS_PER_USER", 2))
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", 8))
+RESUME_JOBS_BLOCK_MS = int(os.getenv("RESUME_JOBS_BLOCK_MS", 1000))
+RESUME_JOBS_CLAIM_IDLE_MS = int(os.getenv("RESUME_JOBS_CLAIM_IDLE_MS", 600_000))
+RESUME_JOB_EVENTS_TTL = int(os.getenv("RESUME_JOB_EVENTS_TTL", 3600))
+RESUME_JOB_SLOT_TTL = int(os.getenv("RESUME_JOB_SLOT_TTL", 3600))
+RESUME_JOB_FOLLOW_BLOCK_MS = int(os.getenv("RESUME_JOB_FOLLOW_BLOCK_MS", 15_000))
+
+# Adds the job to the user's unfinished set unless it is already full.
+# KEYS[1] = set, ARGV = job id, cap, ttl (a backstop for slots a crash never released)
+RESERVE_SLOT = """
+if redis.call('SCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SADD', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def slots_key(user_id: str) -> str:
+    return f"resume:jobs:active:{user_id}"
+
+
+def events_key(job_id: str) -> str:
+    return f"resume:job:{job_id}:events"
+
+
+class ResumeJobQueue:
+    def __init__(self, engine, per_user: int = RESUME_JOBS_PER_USER):
+        self.engine = engine
+        self.per_user = per_user
+        self._reserve = redis_client.register_script(RESERVE_SLOT)
+
+    async def submit(self, user_id: str, plan: str | None, job_description: str) -> dict:
+        job_id = str(uuid4())
+        if not await self._reserve(keys=[slots_key(user_id)], args=[job_id, self.per_user, RESUME_JOB_SLOT_TTL]):
+            raise HTTPException(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"At most {self.per_user} resumes can be generating at once",
+            )
+        priority = PRIORITY_BY_PLAN.get(plan, "normal")
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(insert(resume_jobs).values(
+                    id=job_id, user_id=user_id, job_description=job_description, priority=priority,
+                    status="queued", created_at=datetime.utcnow(),
+                ))
+            await self.publish(job_id, {"event": "queued", "id": job_id})
+            await redis_client.xadd(STREAMS[priority], {"job_id": job_id})
+        except Exception:
+            await self.release(user_id, job_id)
+            raise
+        return {"id": job_id, "status": "queued", "priority": priority}
+
+    async def get(self, job_id: str, user_id: str | None = None) -> dict:
+        """The job with its resume once completed; 404 if missing or not the caller's."""
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(
+                select(resume_jobs, resume_generations.c.output)
+                .select_from(resume_jobs.outerjoin(resume_generations, resume_jobs.c.generation_id == resume_generations.c.id))
+                .where(resume_jobs.c.id == job_id)
+            )).mappings().first()
+        if row is None or (user_id is not None and row["user_id"] != user_id):
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Job not found")
+        job = dict(row)
+        if job["status"] != "completed":
+            job["output"] = None
+        return job
+
+    async def update(self, job_id: str, **values):
+        async with self.engine.begin() as conn:
+            await conn.execute(update(resume_jobs).where(resume_jobs.c.id == job_id).values(**values))
+
+    async def publish(self, job_id: str, event: dict):
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xadd(events_key(job_id), {"data": json.dumps(event)})
+            pipe.expire(events_key(job_id), RESUME_JOB_EVENTS_TTL)
+            await pipe.execute()
+
+    async def restart(self, job_id: str):
+        """Replaces the events of an interrupted run with a `restart` event before the job is rerun."""
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(events_key(job_id))
+            pipe.xadd(events_key(job_id), {"data": json.dumps({"event": "restart", "id": job_id})})
+            pipe.expire(events_key(job_id), RESUME_JOB_EVENTS_TTL)
+            await pipe.execute()
+
+    async def release(self, user_id: str, job_id: str):
+        await redis_client.srem(slots_key(user_id), job_id)
+
+    async def follow(self, job_id: str, user_id: str, last_id: str = "0", block_ms: int = RESUME_JOB_FOLLOW_BLOCK_MS):
+        """
+        Yields (event id, event) from the job's event stream after last_id until
+        it is done or failed, and (None, None) whenever block_ms passes quietly.
+        A finished job whose events have expired is replayed from the database.
+        """
+        job = await self.get(job_id, user_id)
+        key = events_key(job_id)
+        if job["status"] in FINISHED and not await redis_client.exists(key):
+            for event in replay(job):
+                yield None, event
+            return
+        while True:
+            response = await redis_client.xread({key: last_id}, block=block_ms)
+            if not response:
+                yield None, None
+                continue
+            for event_id, fields in response[0][1]:
+                last_id = event_id
+                event = json.loads(fields["data"])
+                yield event_id, event
+                if event["event"] in ("done", "error"):
+                    return
+
+    async def stats(self) -> dict:
+        lanes = {}
+        for priority, stream in STREAMS.items():
+            try:
+                running = (await redis_client.xpending(stream, GROUP))["pending"]
+            except ResponseError:
+                running = 0
+            lanes[priority] = {"queued": await redis_client.xlen(stream) - running, "running": running}
+        return lanes
+
+
+def replay(job: dict) -> list[dict]:
+    if job["status"] == "completed":
+        return [
+            {"event": "start", "id": job["generation_id"]},
+            {"event": "delta", "text": job["output"] or ""},
+            {"event": "done", "id": job["generation_id"]},
+        ]
+    return [{"event": "error", "id": job["generation_id"], "detail": job["error"] or "Resume generation failed"}]
+
+
+class ResumeJobWorkerPool:
+    """
+    One consumer per process claiming jobs, high lane first, and running up to
+    `workers` of them at a time. A single reader keeps one blocked Redis
+    connection per process however many jobs are in flight.
+    """
+
+    def __init__(self, queue: ResumeJobQueue, engine=resume_engine, profiles: Profile | None = None,
+                 workers: int = RESUME_WORKERS, block_ms: int = RESUME_JOBS_BLOCK_MS,
+                 claim_idle_ms: int = RESUME_JOBS_CLAIM_IDLE_MS):
+        self.queue = queue
+        self.engine = engine
+        self.profiles = profiles or Profile(helper, async_engine)
+        self.workers = workers
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.completed = 0
+        self.failed = 0
+        self._reader: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    async def start(self):
+        await self.ensure_groups()
+        self._reader = asyncio.create_task(self._run(f"resume-{os.getpid()}"))
+
+    async def stop(self):
+        tasks = [self._reader, *self._running] if self._reader else list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._reader = None
+
+    async def ensure_groups(self):
+        for stream in STREAMS.values():
+            try:
+                await redis_client.xgroup_create(stream, GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def claim(self, consumer: str, block_ms: int | None = None) -> tuple[str, str, dict] | None:
+        """
+        The next job as (stream, message id, fields): a stale one reclaimed from
+        a dead worker, else the next high, else the next normal.
+        """
+        for stream in (HIGH, NORMAL):
+            _, messages, _ = await redis_client.xautoclaim(
+                stream, GROUP, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=1
+            )
+            if messages:
+                return stream, *messages[0]
+        # Only the normal lane blocks, so a high job arriving meanwhile waits at most block_ms
+        for stream, block in ((HIGH, None), (NORMAL, block_ms)):
+            response = await redis_client.xreadgroup(GROUP, consumer, {stream: ">"}, count=1, block=block)
+            if response and response[0][1]:
+                return stream, *response[0][1][0]
+        return None
+
+    async def run_once(self, consumer: str, block_ms: int | None = None) -> int:
+        """Claims and runs one job inline; returns how many ran."""
+        claimed = await self.claim(consumer, block_ms)
+        if claimed is None:
+            return 0
+        await self._process(*claimed)
+        return 1
+
+    async def _run(self, consumer: str):
+        slots = asyncio.Semaphore(self.workers)
+        while True:
+            await slots.acquire()
+            try:
+                claimed = await self.claim(consumer, self.block_ms)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                slots.release()
+                logger.exception("[Resume jobs] Claiming a job failed, backing off")
+                await asyncio.sleep(1)
+                continue
+            if claimed is None:
+                slots.release()
+                await asyncio.sleep(0.05)
+                continue
+            task = asyncio.create_task(self._run_job(*claimed))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _run_job(self, stream: str, message_id: str, fields: dict):
+        try:
+            await self._process(stream, message_id, fields)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Left pending, so it is reclaimed and retried after claim_idle_ms
+            logger.exception(f"[Resume jobs] Job message {message_id} could not be processed")
+
+    async def _process(self, stream: str, message_id: str, fields: dict):
+        job_id = fields["job_id"]
+        try:
+            job = await self.queue.get(job_id)
+        except HTTPException:
+            job = None
+        if job is None or job["status"] in FINISHED:
+            await self._ack(stream, message_id)
+            return
+
+        # A cancelled run (worker shutdown) leaves the message pending to be reclaimed and rerun
+        if job["status"] == "running":
+            await self.queue.restart(job_id)
+        await self.queue.update(job_id, status="running", started_at=datetime.utcnow())
+        final = {"event": "error", "id": None, "detail": "Resume generation failed"}
+        try:
+            profile = await self.profiles.get_by_user_id(job["user_id"])
+            async for event in self.engine.stream(job["user_id"], profile, job["job_description"]):
+                if event["event"] in ("done", "error"):
+                    final = event
+                    continue
+                if event["event"] == "start":
+                    final["id"] = event["id"]
+                    await self.queue.update(job_id, generation_id=event["id"])
+                await self.queue.publish(job_id, event)
+        except HTTPException as e:
+            final["detail"] = e.detail
+        except Exception:
+            logger.exception(f"[Resume jobs] Job {job_id} failed")
+
+        status = "completed" if final["event"] == "done" else "failed"
+        # The row is finished before the final event, so a client reacting to it reads the result
+        await self.queue.update(job_id, status=status, finished_at=datetime.utcnow(),
+                                error=final.get("detail") if status == "failed" else None)
+        await self.queue.publish(job_id, final)
+        await self.queue.release(job["user_id"], job_id)
+        await self._ack(stream, message_id)
+        if status == "completed":
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def _ack(self, stream: str, message_id: str):
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(stream, GROUP, message_id)
+            pipe.xdel(stream, message_id)
+            await pipe.execute()
+
+
+resume_job_queue = ResumeJobQueue(async_engine)
+resume_job_workers = ResumeJobWorkerPool(resume_job_queue)
@@ -0,0 +1,241 @@
+"""
+Renders generated resumes to A4 PDFs on the server with xhtml2pdf, a pure
+Python renderer, so phones no longer rasterise the page with html2pdf.js.
+
+Rendering is CPU bound and runs in a bounded process pool, like password
+hashing (utils/hashing.py): once `max_pending` renders are in flight new ones
+are rejected with a 503. The pool is replaced after PDF_RENDER_MAX_TASKS
+renders per worker so the renderer's caches can't grow without bound (by hand:
+max_tasks_per_child can deadlock with queued work on Python 3.11).
+
+PDFs are cached on disk by content hash: the hash of the HTML and
+PDF_RENDER_VERSION names the file, and doubles as the ETag, so a repeat
+download is answered from the cache and a conditional one with a 304 before
+anything is read. Concurrent requests for the same PDF share one render. The
+cache is trimmed to PDF_CACHE_MAX_MB, least recently served first.
+
+The HTML comes from the model, so the renderer may not fetch anything: no
+remote URLs and no local files, and a render is cut off after
+PDF_RENDER_TIMEOUT seconds.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from utils.logger import logger
+
+# Bump whenever PAGE_CSS or the renderer settings change, so cached PDFs are rendered again
+PDF_RENDER_VERSION = 1
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rolealchemy-pdf"))
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", 256))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 30))
+PDF_RENDER_MAX_TASKS = int(os.getenv("PDF_RENDER_MAX_TASKS", 200))
+CHUNK_SIZE = 64 * 1024
+
+# The same page as frontend/src/pages/resume/print-resume.css
+PAGE_CSS = """
+@page { size: a4 portrait; margin: 15mm; }
+body { font-family: Helvetica, Arial, sans-serif; font-size: 11pt; line-height: 1.5; color: #000000; }
+h1 { font-size: 22pt; color: #1e3a8a; margin-bottom: 8mm; }
+h2 { font-size: 16pt; color: #1e40af; margin: 8mm 0 4mm 0; }
+p, li { margin-bottom: 4mm; }
+ul { margin-left: 12mm; }
+hr { border-top: 1px solid #d1d5db; margin: 8mm 0; }
+"""
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(f"{PDF_RENDER_VERSION}\0{html}".encode()).hexdigest()
+
+
+def render_pdf(html: str, path: str) -> int:
+    """
+    Renders an HTML fragment to `path` and returns the PDF's size. Runs in a
+    pool process; the file only appears once it is complete.
+    """
+    # Imported here so only the pool processes load the renderer
+    from xhtml2pdf import pisa
+    from xhtml2pdf.config.resources import ResourceAccessPolicy
+
+    policy = ResourceAccessPolicy.server(None, allow_remote=False, max_render_seconds=PDF_RENDER_TIMEOUT)
+    document = f'<html><head><meta charset="utf-8"><style>{PAGE_CSS}</style></head><body>{html}</body></html>'
+    fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            result = pisa.CreatePDF(document, dest=out, encoding="utf-8", resource_policy=policy)
+        if result.err:
+            raise RuntimeError(f"{result.err} rendering error(s)")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.unlink(partial)
+    return os.path.getsize(path)
+
+
+def _ready() -> bool:
+    return True
+
+
+class PdfRenderer:
+    """
+    Every uvicorn worker has its own pool, so by default the cores are split
+    between WEB_CONCURRENCY workers; the disk cache is shared by all of them.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None,
+                 cache_dir: str = PDF_CACHE_DIR, max_cache_bytes: int = PDF_CACHE_MAX_MB * 1024 * 1024):
+        default_workers = max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)))
+        self.workers = workers or int(os.getenv("PDF_RENDER_WORKERS", default_workers))
+        self.max_pending = max_pending or int(os.getenv("PDF_RENDER_MAX_PENDING", self.workers * 4))
+        self.cache_dir = Path(cache_dir)
+        self.max_cache_bytes = max_cache_bytes
+        self._executor = None
+        self._executor_renders = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._cache_bytes = None
+        self._pending = 0
+        self._rendered = 0
+        self._failed = 0
+        self._rejected = 0
+        self._hits = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            self._executor_renders = 0
+        return self._executor
+
+    def _recycle(self):
+        """Swaps in a fresh pool; the old one finishes what it was given, then its processes exit."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def start(self):
+        """Spawns the worker processes up front; called from the app lifespan."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ready) for _ in range(self.workers)))
+
+    async def open(self, html: str):
+        """
+        The rendered PDF of `html` as a binary file, open for reading, from the
+        cache or rendered now. The caller closes it; it stays readable even if
+        the cache is trimmed meanwhile.
+        """
+        path = self.cache_dir / f"{content_hash(html)}.pdf"
+        try:
+            pdf = open(path, "rb")
+        except FileNotFoundError:
+            await self._render(html, path)
+            pdf = open(path, "rb")
+            # Only once it is open, so trimming can't take the PDF just rendered
+            await self._trim()
+            return pdf
+        self._hits += 1
+        os.utime(path)  # trimming goes by mtime, so this marks it recently served
+        return pdf
+
+    async def _render(self, html: str, path: Path):
+        inflight = self._inflight.get(path.name)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._submit(html, path))
+            self._inflight[path.name] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(path.name, None))
+        # Shielded so one client going away doesn't cancel the render for the others
+        await asyncio.shield(inflight)
+
+    async def _submit(self, html: str, path: Path):
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            logger.warning(f"PDF render pool saturated ({self._pending} pending), rejecting request")
+            raise HTTPException(
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            rendering = loop.run_in_executor(self._get_executor(), render_pdf, html, str(path))
+            self._executor_renders += 1
+            if self._executor_renders >= PDF_RENDER_MAX_TASKS * self.workers:
+                self._recycle()
+            size = await rendering
+        except Exception as e:
+            self._failed += 1
+            logger.error(f"PDF render of {path.name} failed: {e}")
+            raise HTTPException(500, "Failed to render PDF")
+        finally:
+            self._pending -= 1
+        self._rendered += 1
+        if self._cache_bytes is not None:
+            self._cache_bytes += size
+
+    async def _trim(self):
+        if self._cache_bytes is None:
+            self._cache_bytes = await asyncio.to_thread(self._disk_usage)
+        if self._cache_bytes > self.max_cache_bytes:
+            self._cache_bytes = await asyncio.to_thread(self._evict)
+
+    def _disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in self.cache_dir.glob("*.pdf"))
+
+    def _evict(self) -> int:
+        """Deletes the least recently served PDFs down to 90% of the limit; returns what is left."""
+        entries = []
+        for entry in self.cache_dir.glob("*.pdf"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # trimmed by another worker
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_cache_bytes * 0.9:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "running": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "rendered": self._rendered,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "cache_hits": self._hits,
+            "cache_bytes": self._cache_bytes,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def read_chunks(pdf, chunk_size: int = CHUNK_SIZE):
+    """Yields an open PDF in chunks and closes it; StreamingResponse runs this in its threadpool."""
+    with pdf:
+        while chunk := pdf.read(chunk_size):
+            yield chunk
+
+
+pdf_renderer = PdfRenderer()
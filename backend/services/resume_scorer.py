@@ -0,0 +1,216 @@
+"""
+Scores how well a profile matches a job description, locally and before any
+model call, so the UI can show it as the user pastes the job.
+
+Each profile gets a precomputed term index: its experience, projects,
+achievements, certifications and education items and its skills are
+tokenized like the prompt builder does (plus ALIASES, so "PostgreSQL" and
+"postgres" are one term), and every term gets the BM25 saturation of its best
+document, capped at 1. Declared skills weigh 1. The index also lists the skills
+found in the profile: SKILL_VOCABULARY phrases (up to three words) and the
+user's own skill names. Indexes live in a TwoTierCache and are rebuilt by
+Profile whenever the profile is created or changed.
+
+Scoring a job description is then a sparse dot product between its term
+weights and the index, with skill terms boosted, so it never touches the
+database on a warm index.
+"""
+import math
+import os
+from collections import Counter
+
+from services.prompt_builder import terms
+from utils.cache import TwoTierCache
+
+# Bump PROFILE_INDEX_VERSION whenever the shape of an index or the tokenizer changes
+PROFILE_INDEX_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+# How much more a skill named in the job counts than any other word of it
+SKILL_BOOST = 3.0
+
+# Fields of each profile section that describe what the user has done
+INDEXED_FIELDS = {
+    "experience": ("title", "position", "company", "description"),
+    "projects": ("title", "description"),
+    "achievements": ("title", "description"),
+    "certifications": ("title", "issuer"),
+    "education": ("institution", "certificate_level"),
+}
+
+# Spellings folded into one term; a value with spaces becomes several terms
+ALIASES = {
+    "postgresql": "postgres", "psql": "postgres", "k8s": "kubernetes", "js": "javascript",
+    "ts": "typescript", "nodejs": "node.js", "node": "node.js", "reactjs": "react", "react.js": "react",
+    "vuejs": "vue", "vue.js": "vue", "nextjs": "next.js", "py": "python", "ml": "machine learning",
+    "ai": "artificial intelligence", "nlp": "natural language processing", "apis": "api",
+    "restful": "rest api", "microservice": "microservices", "mongo": "mongodb", "csharp": "c#",
+    "cplusplus": "c++", "gcp": "google cloud", "cicd": "ci/cd", "sklearn": "scikit-learn",
+}
+
+# Words every job posting uses; they say nothing about the fit
+JD_NOISE = frozenset("""
+experience experienced years year strong excellent good great ability able team teams work working role
+looking join company candidate candidates skills skill knowledge understanding required requirements
+preferred plus must should would responsibilities including include etc new environment opportunity
+position job us also well using use based solid proven passion passionate help minimum senior junior
+mid level least familiarity familiar hands-on hands developer engineer engineering
+""".split())
+
+SKILL_VOCABULARY = [
+    # Languages
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Ruby", "PHP", "Kotlin",
+    "Swift", "Scala", "Dart", "Elixir", "Haskell", "Perl", "Bash", "SQL", "HTML", "CSS", "Sass",
+    "Objective-C", "Lua", "MATLAB", "Solidity",
+    # Frameworks and libraries
+    "FastAPI", "Django", "Flask", "Node.js", "Express.js", "NestJS", "React", "React Native", "Next.js", "Vue",
+    "Nuxt", "Angular", "Svelte", "Redux", "jQuery", "Tailwind", "Bootstrap", "Spring Boot", "Hibernate",
+    "ASP.NET", "Rails", "Laravel", "Symfony", "Flutter", "SwiftUI", "Pandas", "NumPy", "SciPy",
+    "scikit-learn", "TensorFlow", "PyTorch", "Keras", "Spark", "Hadoop", "Airflow", "dbt", "Celery",
+    "SQLAlchemy", "Pydantic", "GraphQL", "gRPC", "Socket.IO", "Electron", "Unity", "OpenCV", "LangChain",
+    # Data stores and messaging
+    "Postgres", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "DynamoDB", "Oracle",
+    "SQL Server", "MariaDB", "Snowflake", "BigQuery", "Redshift", "Kafka", "RabbitMQ", "Firebase", "Supabase",
+    "Neo4j", "ClickHouse",
+    # Cloud and operations
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible", "Helm", "Jenkins",
+    "GitHub Actions", "GitLab", "CI/CD", "Linux", "Nginx", "Apache", "Prometheus", "Grafana", "Datadog",
+    "Serverless", "Lambda", "Heroku", "Vercel", "Cloudflare", "OpenShift", "Git", "GitHub", "Jira",
+    # Practices and fields
+    "REST API", "Microservices", "Machine learning", "Deep learning", "Artificial intelligence",
+    "Natural language processing", "Computer vision", "Data science", "Data analysis", "Data engineering",
+    "ETL", "Statistics", "Unit testing", "Test automation", "TDD", "Agile", "Scrum", "Kanban", "DevOps",
+    "SRE", "Observability", "Distributed systems", "System design", "Security", "OAuth", "Penetration testing",
+    "Cryptography", "Networking", "Blockchain", "Product management", "Project management", "UX", "UI design",
+    "Figma", "Photoshop", "Illustrator", "SEO", "Digital marketing", "Copywriting", "Salesforce", "SAP",
+    "Power BI", "Tableau", "Accounting", "Bookkeeping", "Customer service", "Sales",
+    "Technical writing", "Mobile development", "Web development", "Embedded systems", "Android", "iOS",
+    "Selenium", "Cypress", "Jest", "Pytest", "Playwright", "Webpack", "Vite",
+]
+
+
+_ALIAS_TERMS = {alias: terms(spelling) for alias, spelling in ALIASES.items()}
+
+
+def normalize(text: str) -> list[str]:
+    """prompt_builder.terms with ALIASES applied."""
+    normalized = []
+    for term in terms(text):
+        normalized.extend(_ALIAS_TERMS.get(term, (term,)))
+    return normalized
+
+
+VOCABULARY = {" ".join(normalize(name)): name for name in SKILL_VOCABULARY if normalize(name)}
+MAX_PHRASE_WORDS = 3
+
+
+def find_skills(words: list[str], known: dict[str, str]) -> list[str]:
+    """Phrases of `known` in `words`, longest match first, in order of appearance."""
+    found, i = [], 0
+    while i < len(words):
+        for n in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + n])
+            if phrase in known:
+                found.append(phrase)
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def build_index(profile: dict) -> dict:
+    """
+    {"weights": {term: weight}, "skills": {phrase: display name}} for a
+    profile aggregate as returned by Profile.get_by_user_id.
+    """
+    documents = []
+    for section, fields in INDEXED_FIELDS.items():
+        for item in profile.get(section) or []:
+            text = " ".join(str(item[field]) for field in fields if item.get(field))
+            documents.append(normalize(text))
+    declared = {}
+    for skill in profile.get("skills") or []:
+        phrase = " ".join(normalize(skill.get("skill_name") or ""))
+        if phrase:
+            declared[phrase] = skill["skill_name"]
+
+    weights = {}
+    documents = [words for words in documents if words]
+    average = sum(len(words) for words in documents) / len(documents) if documents else 0
+    for words in documents:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(words) / average)
+        for term, tf in Counter(words).items():
+            # BM25 term frequency, capped so one mention in an average-length item counts fully
+            weight = min(1.0, tf * (BM25_K1 + 1) / (tf + norm))
+            if weight > weights.get(term, 0):
+                weights[term] = round(weight, 4)
+    for phrase in declared:
+        for term in phrase.split():
+            weights[term] = 1.0
+
+    skills = {}
+    known = {**VOCABULARY, **declared}
+    for words in documents:
+        for phrase in find_skills(words, known):
+            skills.setdefault(phrase, known[phrase])
+    skills.update(declared)
+    return {"weights": weights, "skills": skills}
+
+
+def score_index(index: dict, job_description: str) -> dict:
+    """
+    {"score": 0-100, "matched_skills", "missing_skills"}: the share of the
+    job's term weight the profile covers, and the job's skills the profile
+    does and does not list.
+    """
+    words = normalize(job_description)
+    known = {**VOCABULARY, **index["skills"]}
+    wanted = list(dict.fromkeys(find_skills(words, known)))
+    skill_terms = {term for phrase in wanted for term in phrase.split()}
+
+    total = covered = 0.0
+    for term, tf in Counter(words).items():
+        if term in JD_NOISE:
+            continue
+        weight = (1 + math.log(tf)) * (SKILL_BOOST if term in skill_terms else 1.0)
+        total += weight
+        covered += weight * index["weights"].get(term, 0.0)
+
+    return {
+        "score": round(100 * covered / total) if total else 0,
+        "matched_skills": [index["skills"][phrase] for phrase in wanted if phrase in index["skills"]],
+        "missing_skills": [VOCABULARY[phrase] for phrase in wanted if phrase not in index["skills"]],
+    }
+
+
+class ResumeScorer:
+    """Per-user profile indexes in a TwoTierCache, built on a miss from a profile loader."""
+
+    def __init__(self, cache: TwoTierCache):
+        self.cache = cache
+
+    async def index(self, user_id: str, load_profile) -> dict:
+        """The user's index; `load_profile` is awaited for the profile on a miss."""
+        cached, generation = await self.cache.lookup(f"user:{user_id}")
+        if cached is not None:
+            return cached
+        index = build_index(await load_profile())
+        await self.cache.set(f"user:{user_id}", index, generation)
+        return index
+
+    async def invalidate(self, user_id: str):
+        await self.cache.delete(f"user:{user_id}")
+
+    async def score(self, user_id: str, job_description: str, load_profile) -> dict:
+        return score_index(await self.index(user_id, load_profile), job_description)
+
+
+resume_scorer = ResumeScorer(TwoTierCache(
+    "profile-index",
+    PROFILE_INDEX_VERSION,
+    ttl=int(os.getenv("PROFILE_INDEX_TTL", 86400)),
+    local_ttl=float(os.getenv("PROFILE_INDEX_LOCAL_TTL", 30)),
+    local_maxsize=int(os.getenv("PROFILE_INDEX_LOCAL_SIZE", 1024)),
+    max_bytes=int(os.getenv("PROFILE_INDEX_MAX_BYTES", 256 * 1024)),
+))
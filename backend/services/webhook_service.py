@@ -0,0 +1,167 @@
+"""
+Paystack webhook ingestion. The webhook route only verifies the signature
+and appends the raw event to a Redis stream; a pool of workers (started in
+the app lifespan) reads the stream through a consumer group and applies the
+events. Messages are acknowledged only once processed, so events from a
+crashed worker are reclaimed by another one after PAYSTACK_WEBHOOK_CLAIM_IDLE_MS.
+"""
+import asyncio
+import json
+import os
+
+from redis.exceptions import ResponseError
+from sqlalchemy import select
+
+from schema.schema import async_engine, payments
+from services.identity_service import get_identity
+from utils.cache import redis_client
+from utils.helper import helper
+from utils.logger import logger
+
+STREAM = "paystack:events"
+DEAD_LETTER_STREAM = "paystack:events:dead"
+GROUP = "paystack-workers"
+ATTEMPTS_KEY = "paystack:events:attempts"
+
+STREAM_MAXLEN = int(os.getenv("PAYSTACK_STREAM_MAXLEN", 100_000))
+WEBHOOK_WORKERS = int(os.getenv("PAYSTACK_WEBHOOK_WORKERS", 4))
+WEBHOOK_BATCH = int(os.getenv("PAYSTACK_WEBHOOK_BATCH", 32))
+WEBHOOK_BLOCK_MS = int(os.getenv("PAYSTACK_WEBHOOK_BLOCK_MS", 5000))
+WEBHOOK_CLAIM_IDLE_MS = int(os.getenv("PAYSTACK_WEBHOOK_CLAIM_IDLE_MS", 60_000))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("PAYSTACK_WEBHOOK_MAX_ATTEMPTS", 5))
+# How long an applied event is remembered for deduplication
+EVENT_DEDUPE_TTL = int(os.getenv("PAYSTACK_EVENT_DEDUPE_TTL", 7 * 24 * 3600))
+
+
+
+async def enqueue_event(body: bytes) -> str:
+    """Durably appends a verified webhook body to the stream and returns its id."""
+    return await redis_client.xadd(STREAM, {"body": body.decode()}, maxlen=STREAM_MAXLEN, approximate=True)
+
+
+def dedupe_key(payload: dict) -> str:
+    data = payload.get("data") or {}
+    return f"paystack:event:{payload.get('event')}:{data.get('id', '')}:{data.get('reference', '')}"
+
+
+async def process_event(payload: dict) -> str:
+    """
+    Applies one event and returns a short status for logging. Safe to call
+    more than once for the same event: replays of an applied event are skipped.
+
+    The dedupe key is only written once the event has been applied. A worker
+    dying in between leaves no key, so the reclaimed message is applied again;
+    activate_subscription's upsert makes that (and two workers racing on
+    replays) a no-op rather than a second subscription.
+    """
+    key = dedupe_key(payload)
+    if await redis_client.exists(key):
+        return "duplicate"
+    status = await apply_event(payload)
+    await redis_client.set(key, "1", ex=EVENT_DEDUPE_TTL)
+    return status
+
+
+async def apply_event(payload: dict) -> str:
+    if payload.get("event") != "charge.success":
+        return "ignored"
+
+    data = payload["data"]
+    email = data["customer"]["email"]
+    reference = data["reference"]
+
+    user = await get_identity(email=email)
+    if not user:
+        logger.warning(f"[Webhook] User with email {email} not found")
+        return "user not found"
+    user_id = user["id"]
+
+    async with async_engine.connect() as conn:
+        payment = (await conn.execute(
+            select(payments.c.id, payments.c.plan).where(payments.c.transaction_ref == reference)
+        )).fetchone()
+        if not payment:
+            logger.warning(f"[Webhook] Payment with ref {reference} not found")
+            return "payment not found"
+
+    if not await helper.activate_subscription(user_id, payment.plan, payment.id):
+        return "already active"
+    logger.info(f"[Webhook] Subscription activated for {email} - {payment.plan}")
+    return "activated"
+
+
+class WebhookWorkerPool:
+    """Consumer-group workers draining the webhook stream."""
+
+    def __init__(self, workers: int = WEBHOOK_WORKERS, batch: int = WEBHOOK_BATCH, block_ms: int = WEBHOOK_BLOCK_MS,
+                 claim_idle_ms: int = WEBHOOK_CLAIM_IDLE_MS, max_attempts: int = WEBHOOK_MAX_ATTEMPTS):
+        self.workers = workers
+        self.batch = batch
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_attempts = max_attempts
+        self.processed = 0
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        await self.ensure_group()
+        self._tasks = [asyncio.create_task(self._run(f"worker-{os.getpid()}-{i}")) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def ensure_group(self):
+        try:
+            await redis_client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run_once(self, consumer: str, block_ms: int | None = None) -> int:
+        """Handles stale messages reclaimed from dead consumers, then one batch of new ones."""
+        _, messages, _ = await redis_client.xautoclaim(
+            STREAM, GROUP, consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch
+        )
+        if not messages:
+            response = await redis_client.xreadgroup(GROUP, consumer, {STREAM: ">"}, count=self.batch, block=block_ms)
+            messages = response[0][1] if response else []
+        for message_id, fields in messages:
+            await self._handle(message_id, fields)
+        return len(messages)
+
+    async def _run(self, consumer: str):
+        while True:
+            try:
+                if not await self.run_once(consumer, self.block_ms):
+                    # XREADGROUP BLOCK normally did the waiting; this only stops a spin when a server returns early
+                    await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[Webhook] Worker loop failed, backing off")
+                await asyncio.sleep(1)
+
+    async def _handle(self, message_id: str, fields: dict):
+        try:
+            status = await process_event(json.loads(fields["body"]))
+            logger.debug(f"[Webhook] {message_id}: {status}")
+        except Exception:
+            attempts = await redis_client.hincrby(ATTEMPTS_KEY, message_id, 1)
+            if attempts < self.max_attempts:
+                # Left pending; reclaimed and retried once it has been idle for claim_idle_ms
+                logger.exception(f"[Webhook] {message_id} failed (attempt {attempts}), will retry")
+                return
+            logger.exception(f"[Webhook] {message_id} failed {attempts} times, moving to {DEAD_LETTER_STREAM}")
+            await redis_client.xadd(DEAD_LETTER_STREAM, fields, maxlen=STREAM_MAXLEN, approximate=True)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(STREAM, GROUP, message_id)
+            pipe.xdel(STREAM, message_id)
+            pipe.hdel(ATTEMPTS_KEY, message_id)
+            await pipe.execute()
+        self.processed += 1
+
+
+webhook_workers = WebhookWorkerPool()
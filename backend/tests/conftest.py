@@ -0,0 +1,114 @@
+"""
+Test setup. Tests run against SQLite (with a `public` schema attached) by
+default; set TEST_POSTGRES_URL to a throwaway database to also run the
+Postgres-only tests. That database's public schema is dropped and recreated.
+Redis is replaced by fakeredis.
+"""
+import asyncio
+import os
+import tempfile
+
+import fakeredis
+import pytest
+import redis.asyncio
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+_tmpdir = tempfile.mkdtemp(prefix="rolealchemy-tests-")
+
+os.environ["ENVIRONMENT"] = "development"
+os.environ["DATABASE_URL"] = POSTGRES_URL or f"sqlite:///{_tmpdir}/main.db"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+_redis_server = fakeredis.FakeServer()
+
+
+class FakeRedis(fakeredis.FakeAsyncRedis):
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("host", None)
+        kwargs.pop("port", None)
+        super().__init__(*args, server=_redis_server, **kwargs)
+
+
+redis.asyncio.Redis = FakeRedis
+
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+if not POSTGRES_URL:
+    @event.listens_for(Engine, "connect")
+    def _attach_public_schema(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{_tmpdir}/public.db' AS public")
+        cursor.close()
+
+requires_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    """Runs a coroutine on the session loop the async engine's pool is bound to."""
+    return loop.run_until_complete
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database(run):
+    from schema.schema import engine, async_engine
+    import migrations
+
+    if POSTGRES_URL:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+    migrations.upgrade(engine)
+    yield engine
+    run(async_engine.dispose())
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def flush_redis(run):
+    run(FakeRedis().flushall())
+    yield
+
+
+@pytest.fixture(scope="session")
+def client(run):
+    """httpx client bound to the app, sharing the session loop."""
+    import httpx
+    import main
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+    yield client
+    run(client.aclose())
+
+
+@pytest.fixture
+def make_user(run):
+    """Inserts a user directly and returns (user_id, email, access_token)."""
+    from uuid import uuid4
+    from sqlalchemy import insert
+    from schema.schema import async_engine, users
+    from utils.hashing import hash_password
+    from utils.helper import Helper
+
+    def make(password: str = "Str0ng!pass", role: str = "jobSeeker", verified: bool = True):
+        user_id, email = str(uuid4()), f"{uuid4().hex[:10]}@example.com"
+
+        async def insert_user():
+            async with async_engine.begin() as conn:
+                await conn.execute(insert(users).values(
+                    id=user_id, email=email, password_hash=hash_password(password, 4),
+                    is_active=True, role=role, is_email_verified=verified,
+                ))
+        run(insert_user())
+        token = Helper.generate_jwt_token({"email": email, "role": role, "is_email_verified": verified, "user_id": user_id})
+        return user_id, email, token
+
+    return make
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from schema.schema import async_engine
+from services.profile_service import Profile, profile_cache
+from utils import cache as cache_module
+from utils.cache import INVALIDATION_CHANNEL, TwoTierCache, listen_for_invalidations, redis_client
+
+
+@pytest.fixture
+def make_cache():
+    """TwoTierCaches for one test, unregistered from the invalidation listener afterwards."""
+    created = []
+
+    def make(**kwargs) -> TwoTierCache:
+        created.append(TwoTierCache("test", 1, ttl=60, **kwargs))
+        return created[-1]
+
+    yield make
+    for cache in created:
+        cache_module._caches.remove(cache)
+
+
+def test_profile_writes_invalidate_cached_profile(run, make_user):
+    user_id, _, _ = make_user()
+    service = Profile(None, async_engine)
+    profile_id = run(service.create({"full_name": "Jane Wanjiru", "skills": ["python"]}, user_id))["id"]
+    run(service.read(profile_id))
+    run(service.get_by_user_id(user_id))
+
+    run(service.add_item("skills", profile_id, "fastapi"))
+    skills = {skill["skill_name"] for skill in run(service.get_by_user_id(user_id))["skills"]}
+    assert skills == {"python", "fastapi"}
+
+    run(service.update("profiles", profile_id, profile_id, {"full_name": "Jane W."}))
+    assert run(service.read(profile_id))["full_name"] == "Jane W."
+    assert run(service.get_by_user_id(user_id))["full_name"] == "Jane W."
+    assert run(redis_client.get(f"{profile_cache.prefix}user:{user_id}")) is not None
+
+
+def test_set_is_dropped_if_key_invalidated_after_lookup(run, make_cache):
+    cache = make_cache()
+    value, generation = run(cache.lookup("k"))
+    assert value is None and generation == "0"
+
+    run(cache.delete("k"))  # a writer between the reader's load and its write back
+    run(cache.set("k", {"stale": True}, generation))
+    assert run(cache.get("k")) is None
+
+    _, generation = run(cache.lookup("k"))
+    run(cache.set("k", {"fresh": True}, generation))
+    assert run(cache.get("k")) == {"fresh": True}
+
+
+def test_set_is_skipped_if_lookup_could_not_read_generation(run, make_cache, monkeypatch):
+    cache = make_cache()
+
+    async def unavailable(*keys):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis_client, "mget", unavailable)
+    assert run(cache.lookup("k")) == (None, None)
+    monkeypatch.undo()
+
+    run(cache.set("k", {"stale": True}, None))
+    assert run(redis_client.get(cache.prefix + "k")) is None
+    assert len(cache.local) == 0
+    assert cache.stats()["errors"] == 1
+
+
+def test_values_over_max_bytes_are_not_cached(run, make_cache):
+    cache = make_cache(max_bytes=64)
+    _, generation = run(cache.lookup("big"))
+    run(cache.set("big", {"text": "x" * 100}, generation))
+    assert run(redis_client.get(cache.prefix + "big")) is None
+    assert len(cache.local) == 0
+
+    _, generation = run(cache.lookup("small"))
+    run(cache.set("small", {"text": "x"}, generation))
+    assert run(cache.get("small")) == {"text": "x"}
+
+
+def test_delete_drops_local_copies_on_other_instances(run, make_cache):
+    writer, other = make_cache(), make_cache()  # the same cache in two workers
+    _, generation = run(writer.lookup("k"))
+    run(writer.set("k", {"v": 1}, generation))
+    assert run(other.get("k")) == {"v": 1}
+    assert other.local.get(other.prefix + "k") is not None
+
+    async def delete_and_wait():
+        listener = asyncio.create_task(listen_for_invalidations())
+        try:
+            while (await redis_client.pubsub_numsub(INVALIDATION_CHANNEL))[0][1] == 0:
+                await asyncio.sleep(0.01)
+            await writer.delete("k")
+            for _ in range(100):
+                if other.local.get(other.prefix + "k") is None:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            listener.cancel()
+
+    run(delete_and_wait())
+    assert other.local.get(other.prefix + "k") is None
+    assert run(other.get("k")) is None
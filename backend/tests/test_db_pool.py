@@ -0,0 +1,100 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import schema.schema
+from conftest import POSTGRES_URL, requires_postgres
+from schema.schema import async_connect_args, to_async_url
+from utils.db_pool import Histogram, InstrumentedPool, checkout_wait, pool_stats
+
+
+def test_histogram_buckets_are_cumulative_upper_bounds():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.01": 2, "0.1": 3, "1.0": 4, "+Inf": 5}
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == 3.565
+
+
+def test_pool_records_checkout_wait_when_exhausted(run, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=5,
+    )
+    before = checkout_wait.snapshot()
+
+    async def contend():
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            stats = pool_stats(engine.pool)
+            waiter = asyncio.create_task(engine.connect().start())
+            await asyncio.sleep(0.2)
+        waiting = await waiter
+        await waiting.close()
+        return stats
+
+    try:
+        stats = run(contend())
+    finally:
+        run(engine.dispose())
+
+    assert stats["pool_size"] == 1
+    assert stats["checked_out"] == 1
+    assert stats["overflow"] == 0
+    assert stats["timeout"] == 5
+
+    after = checkout_wait.snapshot()
+    assert after["count"] - before["count"] == 2
+    # The second checkout waited for the first connection to be returned
+    waited = (after["count"] - after["buckets"]["0.1"]) - (before["count"] - before["buckets"]["0.1"])
+    assert waited == 1
+    assert after["sum"] - before["sum"] >= 0.2
+
+
+def test_db_pool_diagnostics(run, client, make_user):
+    _, _, admin_token = make_user(role="admin")
+    _, _, token = make_user()
+
+    response = run(client.get("/diagnostics/db-pool", headers={"Authorization": f"Bearer {admin_token}"}))
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["pool_size"] == schema.schema.DB_POOL_SIZE
+    assert stats["checkout_wait_seconds"]["count"] > 0
+    assert stats["checkout_wait_seconds"]["buckets"]["+Inf"] == stats["checkout_wait_seconds"]["count"]
+
+    response = run(client.get("/diagnostics/db-pool", headers={"Authorization": f"Bearer {token}"}))
+    assert response.status_code == 403
+
+
+def test_connect_args_disable_prepared_statement_caches_behind_pgbouncer(monkeypatch):
+    monkeypatch.setattr(schema.schema, "DB_PGBOUNCER", False)
+    assert async_connect_args() == {}
+
+    monkeypatch.setattr(schema.schema, "DB_PGBOUNCER", True)
+    args = async_connect_args()
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    name = args["prepared_statement_name_func"]
+    assert name() != name()
+
+
+@requires_postgres
+def test_pgbouncer_connect_args_work_with_asyncpg(run, monkeypatch):
+    monkeypatch.setattr(schema.schema, "DB_PGBOUNCER", True)
+    engine = create_async_engine(to_async_url(POSTGRES_URL), poolclass=InstrumentedPool, connect_args=async_connect_args())
+
+    async def queries():
+        results = []
+        for value in range(3):  # separate transactions, as PgBouncer may route each to another server
+            async with engine.begin() as conn:
+                results.append((await conn.execute(text("SELECT CAST(:v AS int)"), {"v": value})).scalar())
+        return results
+
+    try:
+        assert run(queries()) == [0, 1, 2]
+    finally:
+        run(engine.dispose())
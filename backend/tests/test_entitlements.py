@@ -0,0 +1,78 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert
+
+from benchmarks.common import count_statements
+from schema.schema import async_engine, payments
+from services import entitlement_service
+from services.entitlement_service import get_entitlement
+from utils.helper import Helper
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def activate(run, user_id: str, plan: str = "daily") -> str:
+    payment_id = str(uuid4())
+
+    async def go():
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(payments).values(id=payment_id, user_id=user_id, transaction_ref=f"ref-{payment_id}", plan=plan))
+        await Helper().activate_subscription(user_id, plan, payment_id)
+    run(go())
+    return payment_id
+
+
+def test_activation_invalidates_cached_entitlement(run, client, make_user):
+    user_id, _, token = make_user()
+    assert run(client.get("/paystack/subscription", headers=auth(token))).json()["active"] is False
+
+    activate(run, user_id, "weekly")
+    entitlement = run(client.get("/paystack/subscription", headers=auth(token))).json()
+    assert entitlement["active"] is True
+    assert entitlement["plan"] == "weekly"
+
+
+def test_cached_entitlement_needs_no_query(run, make_user):
+    user_id, _, _ = make_user()
+    activate(run, user_id)
+    run(get_entitlement(user_id))
+
+    with count_statements(async_engine) as counter:
+        assert run(get_entitlement(user_id))["active"] is True
+    assert counter["statements"] == 0
+
+
+def test_cached_entitlement_stops_at_expiry(run, make_user, monkeypatch):
+    user_id, _, _ = make_user()
+    activate(run, user_id)
+    expiry_date = run(get_entitlement(user_id))["expiry_date"]
+
+    monkeypatch.setattr(entitlement_service, "utcnow", lambda: expiry_date + timedelta(microseconds=1))
+    with count_statements(async_engine) as counter:
+        assert run(get_entitlement(user_id))["active"] is False
+    assert counter["statements"] == 0
+
+
+def test_require_active_plan_dependency(run, make_user):
+    app = FastAPI()
+
+    @app.get("/paid")
+    async def paid(entitlement: dict = Depends(Helper().require_active_plan)):
+        return entitlement
+
+    user_id, _, token = make_user()
+
+    async def call():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/paid", headers=auth(token))
+
+    assert run(call()).status_code == 402
+    activate(run, user_id, "monthly")
+    response = run(call())
+    assert response.status_code == 200
+    assert response.json()["plan"] == "monthly"
@@ -0,0 +1,91 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from schema.schema import async_engine, users
+from services.auth_service import AuthService
+from utils.hashing import PasswordHasher, hash_cost, hash_password, needs_rehash, BCRYPT_ROUNDS
+
+
+@pytest.fixture
+def hasher(run):
+    hasher = PasswordHasher(workers=2, max_pending=2)
+    run(hasher.start())
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify_in_pool(run, hasher):
+    hashed = run(hasher.hash("Str0ng!pass", rounds=4))
+    assert hash_cost(hashed) == 4
+    assert run(hasher.verify(hashed, "Str0ng!pass"))
+    assert not run(hasher.verify(hashed, "wrong"))
+    assert hasher.stats()["completed"] == 3
+
+
+def test_rejects_with_503_when_saturated(run, hasher):
+    async def burst():
+        return await asyncio.gather(*(hasher.hash("Str0ng!pass", rounds=8) for _ in range(4)), return_exceptions=True)
+
+    results = run(burst())
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(rejected) == 2
+    assert all(r.status_code == 503 and r.headers["Retry-After"] for r in rejected)
+    assert hasher.stats()["rejected"] == 2
+
+
+def test_needs_rehash_compares_cost():
+    assert needs_rehash(hash_password("x", 4)) == (BCRYPT_ROUNDS != 4)
+    assert hash_cost("not-a-hash") is None
+
+
+def stored_hash(run, user_id: str) -> str:
+    async def load():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(select(users.c.password_hash).where(users.c.id == user_id))).scalar()
+    return run(load())
+
+
+def test_login_rehashes_old_cost_hash(run, client, make_user):
+    user_id, email, _ = make_user()  # hashed at cost 4
+    assert BCRYPT_ROUNDS != 4
+
+    response = run(client.post("/auth/login", json={"email": email, "password": "Str0ng!pass"}))
+    assert response.status_code == 200
+    new_hash = stored_hash(run, user_id)
+    assert hash_cost(new_hash) == BCRYPT_ROUNDS
+
+    # The new hash still verifies, and a login at the target cost leaves it alone
+    assert run(client.post("/auth/login", json={"email": email, "password": "Str0ng!pass"})).status_code == 200
+    assert stored_hash(run, user_id) == new_hash
+
+
+def test_rehash_keeps_concurrently_changed_password(run, make_user):
+    user_id, _, _ = make_user()
+    old_hash = stored_hash(run, user_id)
+    changed = hash_password("N3w!password", 4)
+
+    async def change_password():
+        async with async_engine.begin() as conn:
+            await conn.execute(update(users).where(users.c.id == user_id).values(password_hash=changed))
+    run(change_password())
+
+    run(AuthService(None, async_engine).rehash_password(user_id, old_hash, "Str0ng!pass"))
+    assert stored_hash(run, user_id) == changed
+
+
+def test_password_cost_distribution(run, client, make_user):
+    _, _, token = make_user(role="admin")
+    make_user()
+
+    async def expected():
+        async with async_engine.connect() as conn:
+            hashes = (await conn.execute(select(users.c.password_hash))).scalars().all()
+        return Counter(f"{hash_cost(h):02d}" for h in hashes)
+
+    response = run(client.get("/diagnostics/password-costs", headers={"Authorization": f"Bearer {token}"}))
+    assert response.status_code == 200
+    assert response.json() == {"target_cost": BCRYPT_ROUNDS, "users_by_cost": dict(run(expected()))}
@@ -0,0 +1,61 @@
+import httpx
+from fastapi import FastAPI, Request
+
+from benchmarks.common import count_statements
+from schema.schema import async_engine
+from services.identity_service import get_identity
+from utils.otp import VERIFY_EMAIL, otp_store
+from utils.helper import Helper, email_verified_required
+
+helper = Helper()
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_identity_cached_by_id_and_email(run, make_user):
+    user_id, email, _ = make_user(role="admin")
+    run(get_identity(user_id=user_id))
+    run(get_identity(email=email, with_plan=True))
+
+    with count_statements(async_engine) as counter:
+        by_id = run(get_identity(user_id=user_id))
+        by_email = run(get_identity(email=email, with_plan=True))
+    assert counter["statements"] == 0
+    assert by_id == {"id": user_id, "email": email, "role": "admin", "is_email_verified": True}
+    assert by_email == {**by_id, "plan": None}
+    assert run(get_identity(email="nobody@example.com")) is None
+
+
+def test_verify_email_invalidates_identity(run, client, make_user):
+    user_id, email, token = make_user(verified=False)
+    assert run(get_identity(email=email))["is_email_verified"] is False
+    otp = run(otp_store.issue(VERIFY_EMAIL, email))
+
+    response = run(client.post("/auth/verify-otp", json={"otp": otp}, headers=auth(token)))
+    assert response.status_code == 200
+    assert run(get_identity(user_id=user_id))["is_email_verified"] is True
+    assert run(get_identity(email=email))["is_email_verified"] is True
+
+
+def test_email_verified_required_uses_claims(run, make_user):
+    app = FastAPI()
+
+    @app.get("/verified-only")
+    @email_verified_required(helper)
+    async def verified_only(request: Request):
+        return {"ok": True}
+
+    async def call(token):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/verified-only", headers=auth(token))
+
+    _, _, verified_token = make_user()
+    with count_statements(async_engine) as counter:
+        assert run(call(verified_token)).status_code == 200
+    assert counter["statements"] == 0
+
+    _, _, unverified_token = make_user(verified=False)
+    assert run(call(unverified_token)).status_code == 403
+    assert run(call("not-a-token")).status_code == 401
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import re
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from services import mail_service
+from services.mail_service import DEAD_LETTER_LIST, STREAM, FileTransport, MailWorkerPool, SMTPTransport, build_message
+from utils.cache import redis_client
+from utils.otp import VALID, VERIFY_EMAIL, otp_store
+
+
+class FailingTransport:
+    def __init__(self):
+        self.calls = 0
+
+    async def send(self, message):
+        self.calls += 1
+        raise ConnectionError("smtp down")
+
+    async def aclose(self):
+        pass
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode())
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = Inbox()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+def drain(run, pool: MailWorkerPool):
+    run(pool.ensure_group())
+    while run(pool.run_once("test")):
+        pass
+
+
+def test_send_otp_queues_and_worker_delivers(run, client, make_user, tmp_path):
+    _, email, _ = make_user()
+    response = run(client.post("/auth/send-otp", json={"email": email}))
+    assert response.status_code == 200
+
+    drain(run, MailWorkerPool(FileTransport(str(tmp_path)), workers=1, claim_idle_ms=0))
+
+    delivered = [path.read_text() for path in tmp_path.glob("*.eml")]
+    message = next(message for message in delivered if email in message)
+    otp = re.search(r"Your OTP code is: (\d{6})", message).group(1)
+    assert run(otp_store.verify(VERIFY_EMAIL, email, otp)) == VALID
+
+
+def test_failing_mail_is_retried_then_dead_lettered(run, monkeypatch):
+    monkeypatch.setattr(mail_service, "retry_delay", lambda attempt: 0)
+    transport = FailingTransport()
+    pool = MailWorkerPool(transport, workers=1, claim_idle_ms=0, max_attempts=3)
+
+    message_id = run(mail_service.enqueue("dead@example.com", "Your OTP Code", "Your OTP code is: 123456"))
+    drain(run, pool)
+
+    assert transport.calls == 3
+    assert run(redis_client.xrange(STREAM, message_id, message_id)) == []
+    dead = json.loads(run(redis_client.lindex(DEAD_LETTER_LIST, 0)))
+    assert (dead["id"], dead["to"], dead["subject"], dead["error"]) == (message_id, "dead@example.com", "Your OTP Code", "smtp down")
+    assert "body" not in dead and "123456" not in json.dumps(dead)
+    assert 0 < run(redis_client.ttl(DEAD_LETTER_LIST)) <= mail_service.MAIL_DEAD_LETTER_TTL
+
+
+def test_dead_letter_list_is_trimmed(run, monkeypatch):
+    monkeypatch.setattr(mail_service, "retry_delay", lambda attempt: 0)
+    monkeypatch.setattr(mail_service, "MAIL_DEAD_LETTER_MAXLEN", 2)
+    pool = MailWorkerPool(FailingTransport(), workers=1, claim_idle_ms=0, max_attempts=1)
+
+    message_ids = [run(mail_service.enqueue(f"dead{i}@example.com", "Subject", "Body")) for i in range(3)]
+    drain(run, pool)
+
+    dead = [json.loads(entry)["id"] for entry in run(redis_client.lrange(DEAD_LETTER_LIST, 0, -1))]
+    assert dead == message_ids[:0:-1]
+
+
+def test_smtp_sessions_are_reused(run, smtp_server):
+    controller, inbox = smtp_server
+    transport = SMTPTransport(controller.hostname, controller.port, username="", pool_size=2, start_tls=False)
+
+    async def send_all():
+        await asyncio.gather(*(
+            transport.send(build_message(f"user{i}@example.com", "OTP", f"code {i}", sender="noreply@example.com"))
+            for i in range(10)
+        ))
+        await transport.aclose()
+
+    run(send_all())
+    assert len(inbox.messages) == 10
+    assert transport.connections_opened == 2
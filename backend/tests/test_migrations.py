@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, insert, inspect, select
+
+import migrations
+from conftest import POSTGRES_URL
+from migrations import (
+    m0001_initial, m0002_lookup_indexes, m0003_unique_subscription_payment, m0004_resume_generation_runs,
+)
+from schema.schema import metadata
+
+
+def test_migrated_schema_matches_table_definitions(database):
+    # The migrations carry frozen DDL; this catches schema.py drifting away from them
+    inspector = inspect(database)
+    for table in metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name, schema=table.schema)}
+        assert columns == set(table.c.keys()), table.name
+        indexes = {index["name"] for index in inspector.get_indexes(table.name, schema=table.schema)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+
+def test_upgrade_is_idempotent(database):
+    assert migrations.upgrade(database) == []
+    with database.connect() as conn:
+        assert migrations.current_version(conn) == migrations.HEAD_VERSION
+
+
+@pytest.fixture
+def scratch_conn(tmp_path):
+    """A connection to an empty SQLite database at migration 0001."""
+    if POSTGRES_URL:
+        pytest.skip("uses a scratch SQLite database")
+    engine = create_engine(f"sqlite:///{tmp_path}/main.db")
+    with engine.begin() as conn:
+        # The session-wide connect hook attaches the shared test schema; swap in a scratch one
+        conn.exec_driver_sql("DETACH DATABASE public")
+        conn.exec_driver_sql(f"ATTACH DATABASE '{tmp_path}/public.db' AS public")
+        m0001_initial.upgrade(conn)
+        conn.execute(insert(m0001_initial.metadata.tables["public.users"]), [
+            {"id": "u1", "email": "a@example.com", "password_hash": "x"},
+        ])
+        yield conn
+    engine.dispose()
+
+
+def test_lookup_index_migration_reports_duplicates(scratch_conn):
+    scratch_conn.execute(insert(m0001_initial.metadata.tables["public.profiles"]), [
+        {"id": "p1", "user_id": "u1"}, {"id": "p2", "user_id": "u1"}, {"id": "p3", "user_id": None},
+    ])
+
+    with pytest.raises(RuntimeError) as error:
+        m0002_lookup_indexes.upgrade(scratch_conn)
+    assert "profiles.user_id='u1' on rows p1, p2" in str(error.value)
+
+
+def test_subscription_migration_removes_duplicates(scratch_conn):
+    subs = m0001_initial.metadata.tables["public.subs"]
+    scratch_conn.execute(insert(m0001_initial.metadata.tables["public.payments"]), [{"id": "pay1"}, {"id": "pay2"}])
+    scratch_conn.execute(insert(subs), [
+        {"id": "s1", "user_id": "u1", "payments_id": "pay1", "plan_type": "daily"},
+        {"id": "s2", "user_id": "u1", "payments_id": "pay1", "plan_type": "daily"},
+        {"id": "s3", "user_id": "u1", "payments_id": "pay2", "plan_type": "daily"},
+        {"id": "s4", "user_id": "u1", "payments_id": None, "plan_type": "daily"},
+        {"id": "s5", "user_id": "u1", "payments_id": None, "plan_type": "daily"},
+    ])
+
+    m0002_lookup_indexes.upgrade(scratch_conn)
+    m0003_unique_subscription_payment.upgrade(scratch_conn)
+    assert sorted(scratch_conn.execute(select(subs.c.id)).scalars()) == ["s1", "s3", "s4", "s5"]
+
+
+def test_resume_generation_columns_backfill_existing_runs(scratch_conn):
+    generations = m0001_initial.metadata.tables["public.resume_generations"]
+    scratch_conn.execute(insert(generations), [{"id": "g1", "user_id": "u1"}])
+
+    m0004_resume_generation_runs.upgrade(scratch_conn)
+    m0004_resume_generation_runs.upgrade(scratch_conn)
+    row = scratch_conn.exec_driver_sql("SELECT status, output FROM public.resume_generations").one()
+    assert tuple(row) == ("completed", None)
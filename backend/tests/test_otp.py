@@ -0,0 +1,37 @@
+import asyncio
+
+from utils.cache import redis_client
+from utils.otp import INVALID, LOCKED, MISSING, RESET_PASSWORD, VALID, VERIFY_EMAIL, OtpStore, otp_store
+
+
+def wrong(code: str) -> str:
+    return f"{(int(code) + 1) % 10**6:06d}"
+
+
+def test_code_is_consumed_exactly_once_under_concurrency(run):
+    code = run(otp_store.issue(VERIFY_EMAIL, "race@example.com"))
+    assert len(code) == 6 and code.isdigit()
+
+    async def verify_all():
+        return await asyncio.gather(*(otp_store.verify(VERIFY_EMAIL, "race@example.com", code) for _ in range(20)))
+
+    results = run(verify_all())
+    assert results.count(VALID) == 1
+    assert set(results) == {VALID, MISSING}
+
+
+def test_attempts_run_out(run):
+    store = OtpStore(max_attempts=3)
+    code = run(store.issue(VERIFY_EMAIL, "guess@example.com"))
+
+    results = [run(store.verify(VERIFY_EMAIL, "guess@example.com", wrong(code))) for _ in range(3)]
+    assert results == [INVALID, INVALID, LOCKED]
+    assert run(store.verify(VERIFY_EMAIL, "guess@example.com", code)) == MISSING
+
+
+def test_codes_are_scoped_by_purpose_and_namespaced(run):
+    code = run(otp_store.issue(VERIFY_EMAIL, "User@Example.com"))
+
+    assert run(redis_client.exists("User@Example.com", "user@example.com")) == 0
+    assert run(otp_store.verify(RESET_PASSWORD, "user@example.com", code)) == MISSING
+    assert run(otp_store.verify(VERIFY_EMAIL, "user@example.com", code)) == VALID
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+
+from benchmarks.paystack_stub import StubPaystack
+from services import payment_service
+from services.payment_service import Paystack
+
+
+@pytest.fixture
+def stub(run):
+    stub = StubPaystack()
+    run(stub.start())
+    yield stub
+    run(stub.close())
+
+
+@pytest.fixture
+def paystack(run, stub):
+    client = Paystack(base_url=stub.base_url)
+    run(client.start())
+    yield client
+    run(client.aclose())
+
+
+def test_calls_reuse_one_connection(run, stub, paystack):
+    async def calls():
+        for _ in range(10):
+            reference = (await paystack.initialize_transaction("a@example.com", "daily", "KES", "http://cb"))["data"]["reference"]
+            assert (await paystack.verify_transaction(reference))["data"]["status"] == "success"
+
+    run(calls())
+    assert len(stub.requests) == 20
+    assert stub.connections == 1
+
+
+def test_verify_retries_transient_failures(run, stub, paystack, monkeypatch):
+    monkeypatch.setattr(payment_service, "PAYSTACK_RETRY_BACKOFF", 0)
+    stub.fail_with = [502, 503]
+
+    result = run(paystack.verify_transaction("ref-1"))
+    assert result["data"]["status"] == "success"
+    assert len(stub.requests) == 3
+
+
+def test_verify_gives_up_after_retry_budget(run, stub, paystack, monkeypatch):
+    monkeypatch.setattr(payment_service, "PAYSTACK_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(payment_service, "PAYSTACK_VERIFY_RETRIES", 2)
+    stub.fail_with = [500] * 5
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(paystack.verify_transaction("ref-1"))
+    assert len(stub.requests) == 3
+
+
+def test_initialize_is_not_retried(run, stub, paystack):
+    stub.fail_with = [502]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(paystack.initialize_transaction("a@example.com", "daily", "KES", "http://cb"))
+    assert len(stub.requests) == 1
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(payment_service, "PAYSTACK_RETRY_MAX_DELAY", 2)
+    client = Paystack(base_url="http://paystack.invalid")
+    assert client._retry_delay(0, "1") == 1
+    assert client._retry_delay(0, "3600") == 2
+    assert client._retry_delay(20) <= 2
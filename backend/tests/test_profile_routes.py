@@ -0,0 +1,95 @@
+from services import profile_service
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_bulk_create_profiles(run, client, make_user):
+    _, _, admin_token = make_user(role="admin")
+    owners = [make_user()[0] for _ in range(3)]
+    payload = [{"user_id": user_id, "full_name": f"User {i}", "skills": ["python", "sql"]} for i, user_id in enumerate(owners)]
+
+    response = run(client.post("/profile/bulk", json=payload, headers=auth(admin_token)))
+    assert response.status_code == 201
+    assert len(response.json()["ids"]) == 3
+
+    profile = run(client.get(f"/profile/user/{owners[0]}")).json()
+    assert {skill["skill_name"] for skill in profile["skills"]} == {"python", "sql"}
+
+    again = run(client.post("/profile/bulk", json=payload[:1], headers=auth(admin_token)))
+    assert again.status_code == 409
+
+
+def test_bulk_create_requires_admin(run, client, make_user):
+    user_id, _, token = make_user()
+    response = run(client.post("/profile/bulk", json=[{"user_id": user_id, "full_name": "X"}], headers=auth(token)))
+    assert response.status_code == 403
+
+
+def test_bulk_create_rejects_oversized_batches(run, client, make_user, monkeypatch):
+    _, _, admin_token = make_user(role="admin")
+    monkeypatch.setattr(profile_service, "MAX_BULK_PROFILES", 2)
+    payload = [{"user_id": f"user-{i}", "full_name": "X"} for i in range(3)]
+
+    response = run(client.post("/profile/bulk", json=payload, headers=auth(admin_token)))
+    assert response.status_code == 413
+
+
+def create_profile(run, client, token) -> str:
+    response = run(client.post("/profile/", json={"full_name": "Jane Doe", "skills": ["python"]}, headers=auth(token)))
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_profile_update_and_delete(run, client, make_user):
+    user_id, _, token = make_user()
+    profile_id = create_profile(run, client, token)
+    assert run(client.get(f"/profile/user/{user_id}")).json()["full_name"] == "Jane Doe"
+
+    response = run(client.put(f"/profile/{profile_id}", json={"city": "Nairobi"}, headers=auth(token)))
+    assert response.status_code == 200
+    assert run(client.get(f"/profile/user/{user_id}")).json()["city"] == "Nairobi"
+
+    response = run(client.delete(f"/profile/{profile_id}", headers=auth(token)))
+    assert response.status_code == 200
+    assert run(client.get(f"/profile/{profile_id}")).status_code == 404
+
+
+def test_profile_child_crud(run, client, make_user):
+    user_id, _, token = make_user()
+    profile_id = create_profile(run, client, token)
+
+    response = run(client.post(f"/profile/{profile_id}/experience", json={"title": "Engineer", "position": "Backend", "company": "Acme"}, headers=auth(token)))
+    assert response.status_code == 201
+    experience_id = response.json()["id"]
+    skill_id = run(client.post(f"/profile/{profile_id}/skills", json={"skill_name": "sql"}, headers=auth(token))).json()["id"]
+
+    profile = run(client.get(f"/profile/user/{user_id}")).json()
+    assert profile["experience"][0]["position"] == "Backend"
+    assert {skill["skill_name"] for skill in profile["skills"]} == {"python", "sql"}
+
+    response = run(client.put(f"/profile/{profile_id}/experience/{experience_id}", json={"company": "Globex"}, headers=auth(token)))
+    assert response.status_code == 200
+    response = run(client.put(f"/profile/{profile_id}/skills/{skill_id}", json={"skill_name": "postgres"}, headers=auth(token)))
+    assert response.status_code == 200
+
+    profile = run(client.get(f"/profile/user/{user_id}")).json()
+    assert profile["experience"][0]["company"] == "Globex"
+    assert {skill["skill_name"] for skill in profile["skills"]} == {"python", "postgres"}
+
+    assert run(client.delete(f"/profile/{profile_id}/skills/{skill_id}", headers=auth(token))).status_code == 200
+    assert run(client.delete(f"/profile/{profile_id}/skills/{skill_id}", headers=auth(token))).status_code == 404
+    profile = run(client.get(f"/profile/user/{user_id}")).json()
+    assert [skill["skill_name"] for skill in profile["skills"]] == ["python"]
+
+
+def test_profile_writes_require_owner(run, client, make_user):
+    _, _, owner_token = make_user()
+    _, _, other_token = make_user()
+    profile_id = create_profile(run, client, owner_token)
+
+    assert run(client.put(f"/profile/{profile_id}", json={"city": "X"}, headers=auth(other_token))).status_code == 403
+    assert run(client.post(f"/profile/{profile_id}/skills", json={"skill_name": "x"}, headers=auth(other_token))).status_code == 403
+    assert run(client.delete(f"/profile/{profile_id}")).status_code == 401
+    assert run(client.delete("/profile/missing", headers=auth(owner_token))).status_code == 404
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from conftest import requires_postgres
+from schema.schema import async_engine
+from services.profile_service import Profile
+
+
+def profile_payload(children: int = 2) -> dict:
+    return {
+        "full_name": "Jane Wanjiru",
+        "linkedin": "https://linkedin.com/in/jane",
+        "skills": [f"skill-{i}" for i in range(children)],
+        "experience": [
+            {"title": f"Engineer {i}", "company": "Acme", "start_date": datetime(2020, 1, 1, 9, 30),
+             "end_date": datetime(2022, 6, 1), "description": "Built APIs"}
+            for i in range(children)
+        ],
+        "education": [{"institution": "UoN", "certificate_level": "degree", "start_year": 2015, "end_year": 2019}],
+        "certifications": [{"title": "AWS", "issuer": "Amazon", "issue_date": datetime(2021, 3, 4, 5, 6, 7, 123456)}],
+        "achievements": [{"title": "Hackathon", "description": "First place", "achieved_at": datetime(2019, 5, 5)}],
+        "projects": [{"title": "roleAlchemy", "description": "Resume builder", "link": "https://example.com"}],
+    }
+
+
+def sort_children(profile: dict, service: Profile) -> dict:
+    for field in service.insert_map:
+        profile[field] = sorted(profile[field], key=lambda row: row["id"])
+    return profile
+
+
+def test_get_by_user_id_returns_same_types_from_cache(run, make_user):
+    user_id, _, _ = make_user()
+    service = Profile(None, async_engine)
+    run(service.create(profile_payload(), user_id))
+
+    loaded = run(service.get_by_user_id(user_id))
+    cached = run(service.get_by_user_id(user_id))
+
+    assert isinstance(cached["updated_at"], datetime)
+    assert isinstance(cached["certifications"][0]["issue_date"], datetime)
+    assert sort_children(cached, service) == sort_children(loaded, service)
+
+
+@requires_postgres
+def test_single_query_loader_matches_per_table_loader(run, make_user):
+    user_id, _, _ = make_user()
+    service = Profile(None, async_engine)
+    run(service.create(profile_payload(children=5), user_id))
+
+    async def load_both():
+        async with async_engine.connect() as conn:
+            return (
+                await service._load_aggregate(conn, user_id),
+                await service._load_aggregate_per_table(conn, user_id),
+            )
+
+    aggregate, per_table = run(load_both())
+    assert sort_children(aggregate, service) == sort_children(per_table, service)
@@ -0,0 +1,85 @@
+import json
+
+from services.prompt_builder import Relevance, build_prompt, count_tokens, summarize, terms
+
+JOB = "Senior backend engineer. Python, FastAPI and Postgres; you will design REST APIs and tune SQL queries."
+
+FILLER = " ".join(f"Organised the team offsite number {i} and booked the venue." for i in range(40))
+
+
+def profile(**sections) -> dict:
+    return {
+        "id": "p1", "user_id": "u1", "full_name": "Jane Doe", "city": "Nairobi",
+        "skills": [{"id": "s1", "skill_name": "Photoshop"}, {"id": "s2", "skill_name": "Postgres"}],
+        **sections,
+    }
+
+
+def experience(company: str, description: str) -> dict:
+    return {"id": company, "profile_id": "p1", "company": company, "title": "Engineer", "description": description}
+
+
+def prompt_profile(prompt: str) -> dict:
+    return json.loads(prompt.split("\n", 1)[1].split("\n\nJob description:", 1)[0])
+
+
+def test_count_tokens_is_a_high_estimate():
+    assert count_tokens("") == 0
+    assert count_tokens("engineer") == 2
+    assert count_tokens("2024") == 2
+    assert count_tokens('{"a": 1}') == 7
+
+
+def test_terms_keep_tech_names_and_drop_stopwords():
+    assert terms("The C++ and C# devs use Node.js, with CI/CD.") == ["c++", "c#", "devs", "use", "node.js", "ci", "cd"]
+
+
+def test_items_and_skills_are_ordered_by_relevance():
+    prompt, report = build_prompt(profile(experience=[
+        experience("Studio", "Designed magazine layouts and posters."),
+        experience("Acme", "Built REST APIs with FastAPI and tuned Postgres SQL queries."),
+    ]), JOB)
+
+    built = prompt_profile(prompt)
+    assert [item["company"] for item in built["experience"]] == ["Acme", "Studio"]
+    assert [skill["skill_name"] for skill in built["skills"]] == ["Postgres", "Photoshop"]
+    assert "id" not in built and "user_id" not in built
+    assert (report["summarized"], report["dropped"]) == (0, 0)
+    assert report["tokens"] == count_tokens(prompt)
+
+
+def test_least_relevant_descriptions_are_summarized_first():
+    relevant = "Built REST APIs with FastAPI. Tuned Postgres SQL queries. " + FILLER
+    source = profile(experience=[experience("Events", FILLER), experience("Acme", relevant)])
+    full_tokens = build_prompt(source, JOB, budget=100_000)[1]["tokens"]
+
+    prompt, report = build_prompt(source, JOB, budget=full_tokens - 200)
+    built = {item["company"]: item["description"] for item in prompt_profile(prompt)["experience"]}
+    assert report["summarized"] == 1 and report["dropped"] == 0
+    assert built["Acme"] == relevant
+    assert count_tokens(built["Events"]) <= 60
+    assert report["tokens"] <= report["budget"]
+
+
+def test_items_are_dropped_when_summaries_are_not_enough():
+    source = profile(
+        experience=[experience("Acme", "Built REST APIs with FastAPI and Postgres.")],
+        achievements=[{"title": f"Bake-off winner {i}", "description": "Won the office bake-off."} for i in range(30)],
+    )
+    prompt, report = build_prompt(source, JOB, budget=260)
+
+    built = prompt_profile(prompt)
+    assert report["dropped"] > 0 and report["tokens"] <= 260
+    assert built["experience"][0]["company"] == "Acme"
+    assert built["full_name"] == "Jane Doe" and len(built["skills"]) == 2
+
+
+def test_build_is_deterministic():
+    source = profile(experience=[experience("Events", FILLER), experience("Acme", "FastAPI and Postgres.")])
+    assert build_prompt(source, JOB, budget=300) == build_prompt(source, JOB, budget=300)
+
+
+def test_summary_keeps_the_most_relevant_sentences_in_order():
+    text = "Planned parties. Wrote FastAPI services. Watered plants. Tuned Postgres queries."
+    relevance = Relevance(JOB, [text])
+    assert summarize(text, relevance, 12) == "Wrote FastAPI services. Tuned Postgres queries."
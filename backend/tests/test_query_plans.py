@@ -0,0 +1,86 @@
+"""
+Checks the planner uses the lookup indexes from migration 0002 for the
+queries the services actually send. Postgres only.
+"""
+import json
+from uuid import uuid4
+
+from sqlalchemy import event, insert, select, text
+
+from conftest import requires_postgres
+from schema.schema import (
+    achievements, async_engine, certifications, education, experience, payments, profiles, projects, skills, users,
+)
+from services import profile_service
+
+INDEXED_TABLES = {
+    "profiles", "payments", "subs", "resume_generations",
+    "projects", "skills", "experience", "education", "certifications", "achievements",
+}
+
+
+def seed(engine, count: int = 2000) -> tuple[str, str, str]:
+    user_rows, profile_rows, skill_rows, payment_rows = [], [], [], []
+    # One row per profile in each remaining child table; the planner rightly seq-scans empty tables
+    section_rows = {table: [] for table in (experience, education, certifications, achievements, projects)}
+    for i in range(count):
+        user_id, profile_id = str(uuid4()), str(uuid4())
+        user_rows.append({"id": user_id, "email": f"plan-{user_id}@example.com", "password_hash": "x"})
+        profile_rows.append({"id": profile_id, "user_id": user_id, "full_name": f"User {i}"})
+        skill_rows += [{"id": str(uuid4()), "profile_id": profile_id, "skill_name": f"skill {n}"} for n in range(3)]
+        for rows in section_rows.values():
+            rows.append({"id": str(uuid4()), "profile_id": profile_id})
+        payment_rows.append({"id": str(uuid4()), "user_id": user_id, "amount": 10.0, "transaction_ref": f"ref-{user_id}"})
+    with engine.begin() as conn:
+        for table, rows in ((users, user_rows), (profiles, profile_rows), (skills, skill_rows),
+                            (payments, payment_rows), *section_rows.items()):
+            conn.execute(insert(table), rows)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    return user_rows[-1]["id"], profile_rows[-1]["id"], payment_rows[-1]["transaction_ref"]
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in INDEXED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+@requires_postgres
+def test_service_queries_use_lookup_indexes(run, database):
+    user_id, profile_id, reference = seed(database)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        service = profile_service.Profile(None, async_engine)
+        run(service.get_by_user_id(user_id))
+        run(service.read(profile_id))
+
+        async def lookup_payment():
+            async with async_engine.connect() as conn:
+                await conn.execute(payments.select().where(payments.c.transaction_ref == reference))
+        run(lookup_payment())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    async def explain_all():
+        plans = []
+        async with async_engine.connect() as conn:
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar()
+                plans.append((statement, plan if isinstance(plan, list) else json.loads(plan)))
+        return plans
+
+    plans = run(explain_all())
+    assert len(plans) >= 3
+    for statement, plan in plans:
+        assert seq_scans(plan[0]["Plan"]) == [], statement
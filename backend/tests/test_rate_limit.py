@@ -0,0 +1,51 @@
+import httpx
+from redis.exceptions import ConnectionError
+
+import main
+from utils.otp import VERIFY_EMAIL, otp_store
+from utils.rate_limit import login_by_email
+
+
+def test_login_limited_per_email(run, client, make_user):
+    _, email, _ = make_user()
+    _, other_email, _ = make_user()
+
+    for _ in range(login_by_email.capacity):
+        assert run(client.post("/auth/login", json={"email": email, "password": "Wr0ng!pass"})).status_code == 404
+
+    response = run(client.post("/auth/token", data={"username": email.upper(), "password": "Str0ng!pass"}))
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+    assert run(client.post("/auth/login", json={"email": other_email, "password": "Str0ng!pass"})).status_code == 200
+
+
+def test_send_otp_limited_per_ip(run):
+    async def send_otps():
+        transport = httpx.ASGITransport(app=main.app, client=("203.0.113.7", 4000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [(await client.post("/auth/send-otp", json={"email": f"user{i}@example.com"})).status_code
+                    for i in range(11)]
+
+    assert run(send_otps()) == [200] * 10 + [429]
+
+
+def test_otp_brute_force_cut_off(run, client, make_user):
+    _, email, token = make_user(verified=False)
+    otp = run(otp_store.issue(VERIFY_EMAIL, email))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for guess in range(5):
+        response = run(client.post("/auth/verify-otp", json={"otp": f"{(int(otp) + 1 + guess) % 10**6:06d}"}, headers=headers))
+        assert response.status_code == 400
+
+    response = run(client.post("/auth/verify-otp", json={"otp": otp}, headers=headers))
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_limiter_fails_open_without_redis(run, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(login_by_email, "_bucket", unavailable)
+
+    assert run(login_by_email.acquire("someone@example.com")) == 0
@@ -0,0 +1,394 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from openai import APIConnectionError
+from sqlalchemy import delete, insert, select
+
+from services.resume_cache import ResumeCache, cache_key
+from services.resume_engine import resume_engine
+from services.resume_jobs import ResumeJobWorkerPool, events_key, resume_job_queue
+from services.resume_pdf import PdfRenderer
+from utils.cache import redis_client
+from schema.schema import async_engine, payments, resume_cache, resume_generations
+from utils.helper import helper
+
+JOB = "Backend engineer: Python, FastAPI, Postgres."
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakeResponses:
+    def __init__(self, deltas: list[str], fail: bool = False):
+        self.deltas = deltas
+        self.fail = fail
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self._events()
+
+    async def _events(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(type="response.output_text.delta", delta=delta)
+        if self.fail:
+            raise APIConnectionError(request=None)
+        usage = SimpleNamespace(input_tokens=120, output_tokens=len(self.deltas))
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(usage=usage))
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    def install(deltas: list[str], fail: bool = False) -> FakeResponses:
+        responses = FakeResponses(deltas, fail)
+        monkeypatch.setattr(resume_engine, "_client", SimpleNamespace(responses=responses))
+        return responses
+    return install
+
+
+def subscribe(run, client, make_user, plan: str = "weekly") -> tuple[str, str]:
+    """A user with a profile and an active plan; returns (user_id, token)."""
+    user_id, _, token = make_user()
+    payment_id = str(uuid4())
+
+    async def activate():
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(payments).values(id=payment_id, user_id=user_id, transaction_ref=f"ref-{payment_id}", plan=plan))
+        await helper.activate_subscription(user_id, plan, payment_id)
+    run(activate())
+
+    response = run(client.post("/profile/", json={"full_name": "Jane Doe", "skills": ["python", "fastapi"]}, headers=auth(token)))
+    assert response.status_code == 201
+    return user_id, token
+
+
+@pytest.fixture
+def subscriber(run, client, make_user):
+    return subscribe(run, client, make_user)
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def generation(run, generation_id: str):
+    async def load():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(select(resume_generations).where(resume_generations.c.id == generation_id))).mappings().one()
+    return run(load())
+
+
+def test_generate_streams_and_records_run(run, client, subscriber, fake_llm):
+    user_id, token = subscriber
+    llm = fake_llm(["<h1>Jane Doe</h1>", "<p>Python, FastAPI</p>"])
+
+    response = run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token)))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["start", "delta", "delta", "done"]
+    assert "".join(data["text"] for name, data in events if name == "delta") == "<h1>Jane Doe</h1><p>Python, FastAPI</p>"
+
+    prompt = llm.requests[0]["input"]
+    assert "Jane Doe" in prompt and JOB in prompt and user_id not in prompt
+
+    row = generation(run, events[0][1]["id"])
+    assert (row["user_id"], row["status"], row["job_description"]) == (user_id, "completed", JOB)
+    assert row["output"] == "<h1>Jane Doe</h1><p>Python, FastAPI</p>"
+    assert (row["input_tokens"], row["output_tokens"]) == (120, 2)
+
+
+def test_failed_generation_is_recorded(run, client, subscriber, fake_llm):
+    _, token = subscriber
+    fake_llm(["<h1>Jane"], fail=True)
+
+    events = parse_sse(run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token))).text)
+    assert [name for name, _ in events] == ["start", "delta", "error"]
+
+    row = generation(run, events[0][1]["id"])
+    assert (row["status"], row["output"]) == ("failed", "<h1>Jane")
+    assert row["error"]
+
+
+def test_generate_requires_plan_and_profile(run, client, make_user, fake_llm):
+    llm = fake_llm(["unused"])
+    user_id, _, token = make_user()
+    assert run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token))).status_code == 402
+
+    payment_id = str(uuid4())
+
+    async def activate():
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(payments).values(id=payment_id, user_id=user_id, transaction_ref=f"ref-{payment_id}", plan="daily"))
+        await helper.activate_subscription(user_id, "daily", payment_id)
+    run(activate())
+
+    assert run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token))).status_code == 404
+    assert llm.requests == []
+
+
+def cached_keys(run, user_id: str) -> list[str]:
+    async def load():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(select(resume_cache.c.key).where(resume_cache.c.user_id == user_id))).scalars().all()
+    return run(load())
+
+
+def test_repeat_generation_is_served_from_cache(run, client, subscriber, fake_llm):
+    user_id, token = subscriber
+    llm = fake_llm(["<h1>Jane Doe</h1>", "<p>Python</p>"])
+
+    first = parse_sse(run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token))).text)
+    assert first[-1][1]["cached"] is False
+
+    # Same job pasted with different whitespace
+    reformatted = "  Backend engineer:\n\nPython,   FastAPI, Postgres.  "
+    second = parse_sse(run(client.post("/resume/generate", json={"job_description": reformatted}, headers=auth(token))).text)
+    assert [name for name, _ in second] == ["start", "delta", "done"]
+    assert second[1][1]["text"] == "<h1>Jane Doe</h1><p>Python</p>"
+    assert second[-1][1]["cached"] is True
+    assert len(llm.requests) == 1
+
+    row = generation(run, second[0][1]["id"])
+    assert (row["status"], row["output"]) == ("cached", "<h1>Jane Doe</h1><p>Python</p>")
+    assert len(cached_keys(run, user_id)) == 1
+
+
+def test_profile_change_misses_and_drops_old_entries(run, client, subscriber, fake_llm):
+    user_id, token = subscriber
+    llm = fake_llm(["<h1>Jane Doe</h1>"])
+    run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token)))
+    old_keys = cached_keys(run, user_id)
+
+    profile_id = run(client.get(f"/profile/user/{user_id}")).json()["id"]
+    response = run(client.post(f"/profile/{profile_id}/skills", json={"skill_name": "postgres"}, headers=auth(token)))
+    assert response.status_code == 201
+
+    events = parse_sse(run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token))).text)
+    assert events[-1][1]["cached"] is False
+    assert len(llm.requests) == 2
+    new_keys = cached_keys(run, user_id)
+    assert len(new_keys) == 1 and new_keys != old_keys
+
+
+def test_cache_evicts_least_recently_used(run, make_user):
+    user_id, _, _ = make_user()
+    cache = ResumeCache(async_engine, max_bytes=250, compression_level=0)
+
+    async def scenario():
+        async with async_engine.begin() as conn:
+            await conn.execute(delete(resume_cache))  # the byte budget covers every user's entries
+        keys = [cache_key({"n": n}, None, JOB, "model", 1) for n in range(3)]
+        await cache.put(keys[0], user_id, None, "model", "a" * 100)
+        await cache.put(keys[1], user_id, None, "model", "b" * 100)
+        assert await cache.get(keys[0]) == "a" * 100  # keys[1] is now the least recently used
+        await cache.put(keys[2], user_id, None, "model", "c" * 100)
+        return keys, [await cache.get(key) for key in keys], await cache.stats()
+
+    keys, outputs, stats = run(scenario())
+    assert outputs == ["a" * 100, None, "c" * 100]
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (3, 1, 0.75)
+
+
+@pytest.fixture
+def job_workers(run):
+    pool = ResumeJobWorkerPool(resume_job_queue, workers=1)
+    run(pool.ensure_groups())
+    return pool
+
+
+def test_job_runs_on_worker_and_links_generation(run, client, subscriber, fake_llm, job_workers):
+    user_id, token = subscriber
+    fake_llm(["<h1>Jane Doe</h1>", "<p>Python</p>"])
+
+    response = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token)))
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["status"], job["priority"]) == ("queued", "high")
+    assert run(client.get(f"/resume/jobs/{job['id']}", headers=auth(token))).json()["status"] == "queued"
+
+    assert run(job_workers.run_once("test")) == 1
+
+    polled = run(client.get(f"/resume/jobs/{job['id']}", headers=auth(token))).json()
+    assert (polled["status"], polled["output"]) == ("completed", "<h1>Jane Doe</h1><p>Python</p>")
+    assert generation(run, polled["generation_id"])["user_id"] == user_id
+
+    response = run(client.get(f"/resume/jobs/{job['id']}/events", headers=auth(token)))
+    blocks = response.text.strip().split("\n\n")
+    assert all(block.startswith("id: ") for block in blocks)
+    events = parse_sse("\n\n".join(block.split("\n", 1)[1] for block in blocks))
+    assert [name for name, _ in events] == ["queued", "start", "delta", "delta", "done"]
+    assert events[1][1]["id"] == polled["generation_id"]
+
+    # Reconnecting after the start event replays only what followed it
+    start_id = blocks[1].split("\n", 1)[0][len("id: "):]
+    resumed = run(client.get(f"/resume/jobs/{job['id']}/events", headers={**auth(token), "Last-Event-ID": start_id}))
+    assert resumed.text.count("event: delta") == 2 and "event: start" not in resumed.text
+
+
+def test_finished_job_events_replay_from_database(run, client, subscriber, fake_llm, job_workers):
+    _, token = subscriber
+    fake_llm(["<h1>Jane</h1>"])
+    job_id = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token))).json()["id"]
+    run(job_workers.run_once("test"))
+    run(redis_client.delete(events_key(job_id)))
+
+    events = parse_sse(run(client.get(f"/resume/jobs/{job_id}/events", headers=auth(token))).text)
+    assert [(name, data.get("text")) for name, data in events] == [("start", None), ("delta", "<h1>Jane</h1>"), ("done", None)]
+
+
+def test_reclaimed_job_restarts_its_events(run, client, subscriber, fake_llm):
+    _, token = subscriber
+    fake_llm(["<h1>Jane</h1>"])
+    job_id = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token))).json()["id"]
+    pool = ResumeJobWorkerPool(resume_job_queue, workers=1, claim_idle_ms=0)
+    run(pool.ensure_groups())
+
+    # A worker takes the job and dies after streaming part of it
+    run(redis_client.xreadgroup("resume-workers", "crashed", {"resume:jobs:high": ">"}, count=1))
+    run(resume_job_queue.update(job_id, status="running"))
+    run(resume_job_queue.publish(job_id, {"event": "start", "id": "lost"}))
+    run(resume_job_queue.publish(job_id, {"event": "delta", "text": "<h1>Ja"}))
+
+    assert run(pool.run_once("test")) == 1
+    events = parse_sse(run(client.get(f"/resume/jobs/{job_id}/events", headers=auth(token))).text)
+    assert [name for name, _ in events] == ["restart", "start", "delta", "done"]
+    assert events[2][1]["text"] == "<h1>Jane</h1>"
+    assert run(client.get(f"/resume/jobs/{job_id}", headers=auth(token))).json()["status"] == "completed"
+
+
+def test_paid_tier_jobs_run_first(run, client, make_user, fake_llm, job_workers):
+    fake_llm(["<h1>Jane</h1>"])
+    _, daily_token = subscribe(run, client, make_user, "daily")
+    _, monthly_token = subscribe(run, client, make_user, "monthly")
+    first = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(daily_token))).json()
+    second = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(monthly_token))).json()
+    assert (first["priority"], second["priority"]) == ("normal", "high")
+
+    run(job_workers.run_once("test"))
+    assert run(client.get(f"/resume/jobs/{second['id']}", headers=auth(monthly_token))).json()["status"] == "completed"
+    assert run(client.get(f"/resume/jobs/{first['id']}", headers=auth(daily_token))).json()["status"] == "queued"
+
+
+def test_unfinished_jobs_are_capped_per_user(run, client, subscriber, fake_llm, job_workers):
+    _, token = subscriber
+    fake_llm(["<h1>Jane</h1>"])
+    submit = lambda: run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token)))
+
+    assert [submit().status_code for _ in range(resume_job_queue.per_user)] == [202] * resume_job_queue.per_user
+    assert submit().status_code == 429
+
+    run(job_workers.run_once("test"))
+    assert submit().status_code == 202
+
+
+def test_jobs_are_private(run, client, subscriber, make_user, fake_llm):
+    _, token = subscriber
+    job_id = run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token))).json()["id"]
+    _, _, other_token = make_user()
+    assert run(client.get(f"/resume/jobs/{job_id}", headers=auth(other_token))).status_code == 404
+    assert run(client.get(f"/resume/jobs/{job_id}/events", headers=auth(other_token))).status_code == 404
+
+
+def test_worker_pool_runs_jobs_concurrently(run, client, subscriber, fake_llm):
+    _, token = subscriber
+    fake_llm(["<h1>Jane</h1>"])
+    job_ids = [run(client.post("/resume/jobs", json={"job_description": JOB}, headers=auth(token))).json()["id"] for _ in range(2)]
+    pool = ResumeJobWorkerPool(resume_job_queue, workers=2, block_ms=10)
+
+    async def drain():
+        await pool.start()
+        try:
+            for _ in range(200):
+                if pool.completed == 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+    run(drain())
+
+    statuses = [run(client.get(f"/resume/jobs/{job_id}", headers=auth(token))).json()["status"] for job_id in job_ids]
+    assert statuses == ["completed", "completed"]
+
+
+@pytest.fixture
+def pdf_renderer(run, tmp_path, monkeypatch):
+    renderer = PdfRenderer(workers=1, cache_dir=str(tmp_path))
+    monkeypatch.setattr("routes.v1.resume.pdf_renderer", renderer)
+    run(renderer.start())
+    yield renderer
+    renderer.shutdown()
+
+
+def generate(run, client, token: str) -> str:
+    response = run(client.post("/resume/generate", json={"job_description": JOB}, headers=auth(token)))
+    return parse_sse(response.text)[0][1]["id"]
+
+
+def test_pdf_is_rendered_once_and_revalidated_by_etag(run, client, subscriber, fake_llm, pdf_renderer):
+    _, token = subscriber
+    fake_llm(["<h1>Jane Doe</h1>", "<ul><li>Python, FastAPI</li></ul>", '<img src="http://example.com/x.png">'])
+    generation_id = generate(run, client, token)
+
+    response = run(client.get(f"/resume/{generation_id}/pdf", headers=auth(token)))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    etag = response.headers["etag"]
+
+    again = run(client.get(f"/resume/{generation_id}/pdf", headers=auth(token)))
+    assert again.content == response.content and again.headers["etag"] == etag
+    revalidated = run(client.get(f"/resume/{generation_id}/pdf", headers={**auth(token), "If-None-Match": etag}))
+    assert revalidated.status_code == 304 and not revalidated.content
+
+    stats = pdf_renderer.stats()
+    assert (stats["rendered"], stats["cache_hits"]) == (1, 1)
+
+
+def test_pdf_is_only_for_the_owners_finished_resumes(run, client, subscriber, make_user, fake_llm, pdf_renderer):
+    _, token = subscriber
+    fake_llm(["<h1>Jane</h1>"], fail=True)
+    failed_id = generate(run, client, token)
+    assert run(client.get(f"/resume/{failed_id}/pdf", headers=auth(token))).status_code == 404
+
+    fake_llm(["<h1>Jane</h1>"])
+    generation_id = generate(run, client, token)
+    _, _, other_token = make_user()
+    assert run(client.get(f"/resume/{generation_id}/pdf", headers=auth(other_token))).status_code == 404
+    assert pdf_renderer.stats()["rendered"] == 0
+
+
+def test_concurrent_renders_of_one_resume_are_shared(run, pdf_renderer):
+    async def download():
+        pdf = await pdf_renderer.open("<h1>Jane Doe</h1>")
+        with pdf:
+            return pdf.read()
+
+    async def burst():
+        return await asyncio.gather(*(download() for _ in range(3)))
+
+    assert len(set(run(burst()))) == 1
+    assert pdf_renderer.stats()["rendered"] == 1
+
+
+def test_pdf_cache_is_trimmed_least_recently_served_first(run, tmp_path):
+    renderer = PdfRenderer(workers=1, cache_dir=str(tmp_path), max_cache_bytes=1)
+    try:
+        for name in ("Jane", "John"):
+            with run(renderer.open(f"<h1>{name}</h1>")) as pdf:
+                assert pdf.read().startswith(b"%PDF")
+    finally:
+        renderer.shutdown()
+    assert len(list(tmp_path.glob("*.pdf"))) == 0
+    assert renderer.stats()["rendered"] == 2
+
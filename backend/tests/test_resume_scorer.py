@@ -0,0 +1,74 @@
+from services.resume_scorer import build_index, normalize, resume_scorer, score_index
+
+JOB = (
+    "Senior backend engineer. Python, FastAPI and PostgreSQL; Kubernetes is a plus. "
+    "You will design RESTful APIs and tune SQL queries."
+)
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def profile(**sections) -> dict:
+    return {
+        "id": "p1", "user_id": "u1", "full_name": "Jane Doe",
+        "skills": [{"id": "s1", "skill_name": "Python"}, {"id": "s2", "skill_name": "Figma"}],
+        **sections,
+    }
+
+
+def test_aliases_fold_spellings_into_one_term():
+    assert normalize("PostgreSQL, k8s and ReactJS; CI/CD") == ["postgres", "kubernetes", "react", "ci", "cd"]
+
+
+def test_index_weights_profile_terms_and_lists_skills():
+    index = build_index(profile(experience=[
+        {"company": "Acme", "title": "Engineer", "description": "Built REST APIs with FastAPI and Postgres.", "start_date": "2020-01-01"},
+    ]))
+    assert index["weights"]["python"] == 1.0
+    assert 0 < index["weights"]["fastapi"] <= 1.0
+    assert "2020" not in " ".join(index["weights"])
+    assert index["skills"] == {"rest api": "REST API", "fastapi": "FastAPI", "postgres": "Postgres", "python": "Python", "figma": "Figma"}
+
+
+def test_score_reports_matched_and_missing_skills():
+    index = build_index(profile(experience=[{"company": "Acme", "description": "Built REST APIs with FastAPI and Postgres."}]))
+    result = score_index(index, JOB)
+    assert result["matched_skills"] == ["Python", "FastAPI", "Postgres", "REST API"]
+    assert result["missing_skills"] == ["Kubernetes", "SQL"]
+
+    unrelated = score_index(build_index(profile()), JOB)
+    assert unrelated["matched_skills"] == ["Python"]
+    assert 0 <= unrelated["score"] < result["score"] <= 100
+
+
+def test_empty_profile_and_job():
+    empty = build_index({"full_name": "Jane Doe"})
+    assert score_index(empty, JOB)["score"] == 0
+    assert score_index(empty, "")["score"] == 0
+
+
+def test_score_endpoint_uses_index_refreshed_on_profile_writes(run, client, make_user):
+    user_id, _, token = make_user()
+    assert run(client.post("/resume/score", json={"job_description": JOB}, headers=auth(token))).status_code == 404
+
+    created = run(client.post("/profile/", json={"full_name": "Jane Doe", "skills": ["Python"]}, headers=auth(token)))
+    # Creating the profile built the index
+    assert run(resume_scorer.cache.get(f"user:{user_id}"))["skills"] == {"python": "Python"}
+
+    response = run(client.post("/resume/score", json={"job_description": JOB}, headers=auth(token)))
+    assert response.status_code == 200
+    assert response.json()["matched_skills"] == ["Python"]
+    assert "Kubernetes" in response.json()["missing_skills"]
+
+    profile_id = created.json()["id"]
+    run(client.post(f"/profile/{profile_id}/skills", json={"skill_name": "k8s"}, headers=auth(token)))
+    after = run(client.post("/resume/score", json={"job_description": JOB}, headers=auth(token))).json()
+    assert after["matched_skills"] == ["Python", "k8s"]
+    assert "Kubernetes" not in after["missing_skills"]
+    assert after["score"] > response.json()["score"]
+
+
+def test_score_requires_login(run, client):
+    assert run(client.post("/resume/score", json={"job_description": JOB})).status_code == 401
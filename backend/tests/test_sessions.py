@@ -0,0 +1,65 @@
+import pytest
+
+from utils import hashing
+from utils.otp import RESET_PASSWORD, otp_store
+
+PASSWORD = "Str0ng!pass"
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def session(run, client, make_user):
+    user_id, email, _ = make_user(password=PASSWORD)
+    response = run(client.post("/auth/login", json={"email": email, "password": PASSWORD}))
+    assert response.status_code == 200
+    return email, response.json()
+
+
+def authorized(run, client, access_token: str) -> bool:
+    return run(client.get("/paystack/subscription", headers=auth(access_token))).status_code == 200
+
+
+def test_refresh_rotates_without_bcrypt(run, client, session, monkeypatch):
+    _, tokens = session
+    assert set(tokens) == {"access_token", "refresh_token", "token_type", "expires_in"}
+
+    async def no_bcrypt(*args):
+        raise AssertionError("refresh must not verify the password")
+    monkeypatch.setattr(hashing.password_hasher, "verify", no_bcrypt)
+
+    response = run(client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}))
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert authorized(run, client, rotated["access_token"])
+
+    reused = run(client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}))
+    assert reused.status_code == 401
+
+
+def test_logout_revokes_both_tokens(run, client, session):
+    _, tokens = session
+    assert authorized(run, client, tokens["access_token"])
+
+    response = run(client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=auth(tokens["access_token"])))
+    assert response.status_code == 200
+
+    assert not authorized(run, client, tokens["access_token"])
+    assert run(client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).status_code == 401
+
+
+def test_password_change_revokes_existing_sessions(run, client, session):
+    email, tokens = session
+    otp = run(otp_store.issue(RESET_PASSWORD, email))
+
+    response = run(client.post("/auth/update-password", json={"email": email, "otp": otp, "new_password": "N3w!password"}))
+    assert response.status_code == 200
+
+    assert not authorized(run, client, tokens["access_token"])
+    assert run(client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).status_code == 401
+
+    fresh = run(client.post("/auth/login", json={"email": email, "password": "N3w!password"})).json()
+    assert authorized(run, client, fresh["access_token"])
@@ -0,0 +1,26 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+
+from schema.schema import async_engine, payments, subscriptions
+from utils.helper import Helper
+
+
+def test_parallel_activations_create_one_subscription(run, make_user):
+    user_id, _, _ = make_user()
+    payment_id = str(uuid4())
+
+    async def activate_50_times():
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(payments).values(id=payment_id, user_id=user_id, transaction_ref=f"ref-{payment_id}", plan="monthly"))
+        helper = Helper()
+        return await asyncio.gather(*(helper.activate_subscription(user_id, "monthly", payment_id) for _ in range(50)))
+
+    created = run(activate_50_times())
+    assert created.count(True) == 1
+
+    async def count():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(select(func.count()).where(subscriptions.c.payments_id == payment_id))).scalar()
+    assert run(count()) == 1
@@ -0,0 +1,66 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from utils import tokens
+from utils.tokens import InvalidToken, TokenVerifier
+
+
+def pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def test_verify_caches_claims_until_exp(monkeypatch):
+    verifier = TokenVerifier(secret="s")
+    token = verifier.issue({"user": {"user_id": "u1"}}, 60)
+
+    assert verifier.verify(token)["user"]["user_id"] == "u1"
+    assert verifier.verify(token)["user"]["user_id"] == "u1"
+    assert (verifier.hits, verifier.misses) == (1, 1)
+
+    decodes = []
+    real_decode = tokens.jwt.decode
+    monkeypatch.setattr(tokens.jwt, "decode", lambda *args, **kwargs: decodes.append(1) or real_decode(*args, **kwargs))
+    # Past the cached exp: the claims must be verified again, not served from the cache
+    monkeypatch.setattr(tokens.time, "time", lambda: 10**12)
+    verifier.verify(token)
+    assert decodes == [1]
+
+
+def test_rejects_bad_tokens():
+    verifier = TokenVerifier(secret="s")
+    with pytest.raises(InvalidToken):
+        verifier.verify(verifier.issue({"user": {}}, -1))
+    with pytest.raises(InvalidToken):
+        verifier.verify(TokenVerifier(secret="other").issue({"user": {}}, 60))
+    with pytest.raises(InvalidToken):
+        verifier.verify("not-a-token")
+
+
+def test_claims_cache_is_bounded():
+    verifier = TokenVerifier(secret="s", cache_size=2)
+    for i in range(3):
+        verifier.verify(verifier.issue({"user": {"user_id": str(i)}}, 60))
+    assert verifier.stats()["cached"] == 2
+
+
+@pytest.mark.parametrize("algorithm, private_key", [
+    ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+])
+def test_asymmetric_tokens_verify_with_public_key_only(algorithm, private_key):
+    private_pem, public_pem = pem_pair(private_key)
+    token = TokenVerifier(algorithm, private_key=private_pem, public_key=public_pem).issue({"user": {"user_id": "u1"}}, 60)
+
+    other_service = TokenVerifier(algorithm, public_key=public_pem)
+    assert other_service.verify(token)["user"]["user_id"] == "u1"
+    with pytest.raises(RuntimeError):
+        other_service.issue({"user": {}}, 60)
+    with pytest.raises(InvalidToken):
+        other_service.verify(TokenVerifier(secret="s").issue({"user": {"user_id": "u1"}}, 60))
@@ -0,0 +1,123 @@
+import hashlib
+import hmac
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from schema.schema import async_engine, payments, subscriptions
+from services import webhook_service
+from services.webhook_service import DEAD_LETTER_STREAM, STREAM, WebhookWorkerPool
+from utils.cache import redis_client
+
+SECRET = "sk_test_webhook"
+
+
+@pytest.fixture(autouse=True)
+def paystack_secret(monkeypatch):
+    monkeypatch.setenv("PAYSTACK_SECRET_KEY", SECRET)
+
+
+@pytest.fixture
+def pool(run):
+    pool = WebhookWorkerPool(workers=1, claim_idle_ms=0, max_attempts=2)
+    run(pool.ensure_group())
+    return pool
+
+
+def signed(payload: dict) -> tuple[bytes, dict]:
+    body = json.dumps(payload).encode()
+    return body, {"x-paystack-signature": hmac.new(SECRET.encode(), body, hashlib.sha512).hexdigest()}
+
+
+def charge_success(run, make_user) -> tuple[str, dict]:
+    user_id, email, _ = make_user()
+    reference = f"ref-{uuid4().hex}"
+
+    async def insert_payment():
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(payments).values(
+                id=str(uuid4()), user_id=user_id, amount=100, transaction_ref=reference, plan="weekly",
+            ))
+    run(insert_payment())
+    return user_id, {"event": "charge.success", "data": {"id": 42, "reference": reference, "amount": 50000,
+                                                          "customer": {"email": email}}}
+
+
+def count_subscriptions(run, user_id: str) -> int:
+    async def count():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(select(func.count()).where(subscriptions.c.user_id == user_id))).scalar()
+    return run(count())
+
+
+def test_webhook_rejects_bad_signature(run, client):
+    response = run(client.post("/paystack/webhook", content=b"{}", headers={"x-paystack-signature": "nope"}))
+    assert response.status_code == 401
+    assert run(redis_client.xlen(STREAM)) == 0
+
+
+def test_webhook_queues_and_worker_applies_once(run, client, make_user, pool):
+    user_id, payload = charge_success(run, make_user)
+    body, headers = signed(payload)
+
+    for _ in range(3):
+        response = run(client.post("/paystack/webhook", content=body, headers=headers))
+        assert response.status_code == 200
+        assert response.json() == {"status": "queued"}
+    assert count_subscriptions(run, user_id) == 0
+
+    assert run(pool.run_once("test")) == 3
+    assert count_subscriptions(run, user_id) == 1
+    assert run(redis_client.xpending(STREAM, webhook_service.GROUP))["pending"] == 0
+
+
+def test_failing_event_is_retried_then_dead_lettered(run, client, make_user, pool, monkeypatch):
+    attempts = []
+
+    async def broken(payload):
+        attempts.append(payload)
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(webhook_service, "apply_event", broken)
+    _, payload = charge_success(run, make_user)
+    body, headers = signed(payload)
+    run(client.post("/paystack/webhook", content=body, headers=headers))
+
+    run(pool.run_once("test"))
+    assert run(redis_client.xlen(DEAD_LETTER_STREAM)) == 0
+    run(pool.run_once("test"))
+
+    assert len(attempts) == 2
+    assert run(redis_client.xlen(DEAD_LETTER_STREAM)) == 1
+    assert run(redis_client.xpending(STREAM, webhook_service.GROUP))["pending"] == 0
+
+
+def test_event_from_crashed_worker_is_applied_on_reclaim(run, client, make_user, pool):
+    user_id, payload = charge_success(run, make_user)
+    body, headers = signed(payload)
+    run(client.post("/paystack/webhook", content=body, headers=headers))
+
+    # A worker reads the event and dies before applying it: no ack, no dedupe key
+    run(redis_client.xreadgroup(webhook_service.GROUP, "crashed", {STREAM: ">"}, count=1))
+    assert not run(redis_client.exists(webhook_service.dedupe_key(payload)))
+
+    assert run(pool.run_once("test")) == 1
+    assert count_subscriptions(run, user_id) == 1
+    assert run(redis_client.exists(webhook_service.dedupe_key(payload)))
+    assert run(redis_client.xpending(STREAM, webhook_service.GROUP))["pending"] == 0
+
+
+def test_event_applied_before_crash_is_not_applied_twice(run, client, make_user, pool):
+    user_id, payload = charge_success(run, make_user)
+    body, headers = signed(payload)
+    run(client.post("/paystack/webhook", content=body, headers=headers))
+
+    # A worker applies the event and dies before writing the dedupe key or acking
+    run(redis_client.xreadgroup(webhook_service.GROUP, "crashed", {STREAM: ">"}, count=1))
+    assert run(webhook_service.apply_event(payload)) == "activated"
+
+    assert run(pool.run_once("test")) == 1
+    assert count_subscriptions(run, user_id) == 1
+    assert run(webhook_service.process_event(payload)) == "duplicate"
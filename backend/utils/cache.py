@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+
+import redis.asyncio as redis
+from fastapi.encoders import jsonable_encoder
+
+from utils.logger import logger
+
+redis_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "localhost"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    decode_responses=True,
+)
+
+
+class LocalLRU:
+    """Bounded in-process LRU with a per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: float | None = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Writes the value only if the key's generation is still the one the reader
+# saw before loading, so a load that raced with an invalidation is dropped
+SET_IF_GENERATION = """
+local generation = redis.call('GET', KEYS[2]) or '0'
+if generation == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+_caches: list["TwoTierCache"] = []
+
+
+class TwoTierCache:
+    """
+    Read-through JSON cache: a short-lived in-process LRU in front of Redis.
+    Keys are prefixed with a namespace and version, so bumping the version
+    orphans every entry written in the old shape. Redis errors are logged and
+    treated as misses; the cache never fails a request.
+
+    Every key has a generation counter that `delete` bumps. `lookup` returns
+    the generation seen on a miss and `set` only writes back if it has not
+    changed, so a reader that loaded stale data can't repopulate the cache
+    after a concurrent write. If `lookup` could not read the generation,
+    `set` writes nothing. Deletes are also published so every worker
+    drops its local copy (see `listen_for_invalidations`).
+    """
+
+    def __init__(self, namespace: str, version: int, ttl: int, local_ttl: float = 5,
+                 local_maxsize: int = 1024, max_bytes: int = 256 * 1024):
+        self.prefix = f"{namespace}:v{version}:"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.local = LocalLRU(local_maxsize, local_ttl)
+        self.hits = {"local": 0, "redis": 0}
+        self.misses = 0
+        self.errors = 0
+        self._set_if_generation = redis_client.register_script(SET_IF_GENERATION)
+        _caches.append(self)
+
+    def _generation_key(self, key: str) -> str:
+        return f"{key}:gen"
+
+    async def lookup(self, key: str):
+        """
+        Returns (value, generation); pass the generation back to `set` on a
+        miss. The generation is None if Redis could not be read.
+        """
+        key = self.prefix + key
+        raw = self.local.get(key)
+        if raw is not None:
+            self.hits["local"] += 1
+            return json.loads(raw), None
+
+        try:
+            raw, generation = await redis_client.mget(key, self._generation_key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache read failed for {key}: {e}")
+            self.misses += 1
+            return None, None
+
+        if raw is None:
+            self.misses += 1
+            return None, generation or "0"
+
+        self.hits["redis"] += 1
+        self.local.set(key, raw)
+        return json.loads(raw), None
+
+    async def get(self, key: str):
+        value, _ = await self.lookup(key)
+        return value
+
+    async def set(self, key: str, value, generation: str | None = None, ttl: int | None = None):
+        """
+        Stores `value` if the key's generation is still the one `lookup`
+        returned. Skipped if the key was invalidated in the meantime, or if the
+        generation is unknown: a plain write could put back data a concurrent
+        writer had just invalidated.
+        """
+        if generation is None:
+            return
+        key = self.prefix + key
+        ttl = self.ttl if ttl is None else ttl
+        raw = json.dumps(jsonable_encoder(value))
+        if len(raw) > self.max_bytes:
+            return
+        try:
+            if not await self._set_if_generation(keys=[key, self._generation_key(key)], args=[generation, raw, ttl]):
+                return
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed for {key}: {e}")
+            return
+        self.local.set(key, raw, min(self.local.ttl, ttl))
+
+    async def delete(self, *keys: str):
+        keys = [self.prefix + key for key in keys]
+        for key in keys:
+            self.local.delete(key)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.incr(self._generation_key(key))
+                    pipe.expire(self._generation_key(key), self.ttl + 60)
+                    pipe.publish(INVALIDATION_CHANNEL, key)
+                pipe.delete(*keys)
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits["local"] + self.hits["redis"] + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+        }
+
+
+async def listen_for_invalidations():
+    """
+    Drops local LRU entries invalidated by other workers. Runs for the life
+    of the app; started and cancelled from the lifespan in main.py.
+    """
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    for cache in _caches:
+                        cache.local.delete(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener failed, retrying: {e}")
+            await asyncio.sleep(5)
@@ -0,0 +1,55 @@
+import bisect
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class Histogram:
+    """Minimal cumulative histogram with fixed upper bounds (in seconds)."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "sum": round(self.total, 6), "count": self.count}
+
+
+checkout_wait = Histogram((0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout takes, including time spent
+    waiting for a free connection once the pool and its overflow are exhausted.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            checkout_wait.observe(time.perf_counter() - start)
+
+
+def pool_stats(pool) -> dict:
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "timeout": pool.timeout(),
+        "checkout_wait_seconds": checkout_wait.snapshot(),
+    }
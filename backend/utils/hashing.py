@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from utils.logger import logger
+
+# Target bcrypt work factor for new hashes; existing hashes are migrated on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 13))
+
+
+def hash_password(data: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(data.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
+
+def check_password(hashed_password: str, plain_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def hash_cost(hashed_password: str) -> int | None:
+    """Work factor of a bcrypt hash such as `$2b$13$...`, or None if unparseable."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return hash_cost(hashed_password) != BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so hashing never blocks the event
+    loop or the default threadpool. Once `max_pending` jobs are in flight new
+    requests are rejected with a 503 instead of queueing behind them.
+
+    Every uvicorn worker has its own pool, so by default the cores are split
+    between WEB_CONCURRENCY workers. Workers are started through forkserver
+    because forking a threaded server process can deadlock on held locks.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None):
+        default_workers = max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)))
+        self.workers = workers or int(os.getenv("HASH_POOL_WORKERS", default_workers))
+        self.max_pending = max_pending or int(os.getenv("HASH_POOL_MAX_PENDING", self.workers * 4))
+        self._executor = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    async def start(self):
+        """Spawns the worker processes up front; called from the app lifespan."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, hash_cost, "") for _ in range(self.workers)))
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            logger.warning(f"Hashing pool saturated ({self._pending} pending), rejecting request")
+            raise HTTPException(
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+
+    async def hash(self, data: str, rounds: int | None = None) -> str:
+        if not data:
+            raise ValueError("Nothing to hash")
+        return await self._submit(hash_password, data, rounds)
+
+    async def verify(self, hashed_password: str, plain_password: str) -> bool:
+        return await self._submit(check_password, hashed_password, plain_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "running": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
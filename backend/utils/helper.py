@@ -1,62 +1,72 @@
 from fastapi import Depends, HTTPException, status, Request 
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt  
-import bcrypt
 import os
 from datetime import datetime, timedelta
-from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 import uuid
 from functools import wraps
-from schema.schema import engine, users, payments, subscriptions
+from schema.schema import async_engine, payments, subscriptions
+from services.entitlement_service import get_entitlement, invalidate_entitlement
+from services.identity_service import get_identity
+from utils.tokens import InvalidToken, token_verifier
+from utils.sessions import ACCESS_TOKEN_TTL, is_revoked
 from starlette.status import HTTP_403_FORBIDDEN 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncConnection
 
 
+# Dialect inserts that support ON CONFLICT
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class Helper:
     def __init__(self):
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-        self.engine = engine
-
-    @staticmethod
-    def hash_data(data: str) -> str:
-        if not data:
-            raise ValueError("Nothing to hash")
-        salt = bcrypt.gensalt(13)
-        hashed = bcrypt.hashpw(data.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        self.engine = async_engine
 
     @staticmethod
-    def is_correct_password(hashed_password: str, plain_password: str) -> bool:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    def generate_jwt_token(user, expires_in: int = ACCESS_TOKEN_TTL) -> str:
+        return token_verifier.issue({"user": user}, expires_in)
 
     @staticmethod
-    def generate_jwt_token(user, expires_in: int = 3600 * 4) -> str:
-        secret_key = os.getenv("JWT_SECRET", "super-secret-key")
-        payload = {
-            "user": user,
-            "exp": datetime.utcnow() + timedelta(seconds=expires_in)
-        }
-        return jwt.encode(payload, secret_key, algorithm="HS256")
-
-    def get_current_user_id(self, token: str = Depends(OAuth2PasswordBearer(tokenUrl="auth/token"))) -> str:
+    async def authenticate(token: str) -> dict:
+        """Verifies the token, checks it has not been revoked and returns its claims."""
         try:
-            secret_key = os.getenv("JWT_SECRET", "super-secret-key")
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-            user = payload.get("user")
-            user_id = user.get("user_id") if user else None
-            if user_id is None:
-                raise ValueError("Missing user id in token")
-            return user_id
-        except JWTError:
+            claims = token_verifier.verify(token)
+        except InvalidToken:
+            claims = {}
+        if not (claims.get("user") or {}).get("user_id") or await is_revoked(claims):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
             )
+        return claims
+
+    async def get_current_user_id(self, token: str = Depends(OAuth2PasswordBearer(tokenUrl="auth/token"))) -> str:
+        return (await self.authenticate(token))["user"]["user_id"]
+
+    async def get_current_claims(self, token: str = Depends(OAuth2PasswordBearer(tokenUrl="auth/token"))) -> dict:
+        return await self.authenticate(token)
+
+    async def require_admin(self, token: str = Depends(OAuth2PasswordBearer(tokenUrl="auth/token"))) -> str:
+        user = (await self.authenticate(token))["user"]
+        if user.get("role") != "admin":
+            raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail="Admin access required")
+        return user["user_id"]
 
-    def activate_subscription(self, user_id: str, plan_type: str, payments_id: str):
+    async def require_active_plan(self, token: str = Depends(OAuth2PasswordBearer(tokenUrl="auth/token"))) -> dict:
+        """Gate for paid features; returns the caller's user_id and entitlement."""
+        user_id = (await self.authenticate(token))["user"]["user_id"]
+        entitlement = await get_entitlement(user_id)
+        if not entitlement["active"]:
+            raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail="An active plan is required")
+        return {"user_id": user_id, **entitlement}
+
+    async def activate_subscription(self, user_id: str, plan_type: str, payments_id: str):
         """
-        Activates a user's subscription by inserting a record into the subscriptions table.
+        Activates a user's subscription for a payment. Idempotent: the insert is
+        an ON CONFLICT DO NOTHING on the unique payments_id, so webhook replays
+        and a racing callback are a single indexed no-op. Returns True only for
+        the call that created the subscription.
         """
         # Set duration based on plan
         start_date = datetime.utcnow()
@@ -70,26 +80,37 @@ class Helper:
         else:
             raise ValueError("Invalid plan type for activation")
 
-        with engine.begin() as conn:
-            conn.execute(
-                insert(subscriptions),
-                {
-                    "id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "payments_id": payments_id,
-                    "plan_type": plan_type,
-                    "start_date": start_date,
-                    "expiry_date": expiry_date
-                }
-            )
-
-    def is_email_verified(self, session: Session, email: str) -> bool:
-        user = session.execute(select(users).where(users.c.email == email)).fetchone()
+        async with self.engine.begin() as conn:
+            upsert = UPSERT_INSERTS[conn.dialect.name](subscriptions).values(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                payments_id=payments_id,
+                plan_type=plan_type,
+                start_date=start_date,
+                expiry_date=expiry_date,
+            ).on_conflict_do_nothing(index_elements=[subscriptions.c.payments_id])
+            result = await conn.execute(upsert)
+        if result.rowcount != 1:
+            return False
+        await invalidate_entitlement(user_id)
+        return True
+
+    async def is_email_verified(self, conn: AsyncConnection, email: str) -> bool:
+        user = await get_identity(email=email, conn=conn)
         if not user:
             raise HTTPException(status_code=404, detail="Email not found")
-        return user.is_email_verified is True
+        return user["is_email_verified"] is True
+
+# Shared by the routers and services; holds no per-request state
+helper = Helper()
+
 
 def email_verified_required(helper_instance: Helper):
+    """
+    Rejects callers whose email is not verified. A token issued after
+    verification carries is_email_verified and needs no lookup; older tokens
+    are checked against the cached identity.
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -100,15 +121,14 @@ def email_verified_required(helper_instance: Helper):
             if not request:
                 raise RuntimeError("Request object not found")
 
-            user_id = helper_instance.get_current_user_id(request)
-
-            with helper_instance.engine.connect() as conn:
-                result = conn.execute(select(users).where(users.c.id == user_id)).fetchone()
+            user = (await helper_instance.authenticate(await helper_instance.oauth2_scheme(request)))["user"]
 
-                if not result:
+            if not user.get("is_email_verified"):
+                identity = await get_identity(user_id=user["user_id"])
+                if not identity:
                     raise HTTPException(status_code=404, detail="User not found")
 
-                if not result["is_email_verified"]:
+                if not identity["is_email_verified"]:
                     raise HTTPException(
                         status_code=HTTP_403_FORBIDDEN,
                         detail="Email not verified. Please verify your email to continue."
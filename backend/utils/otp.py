@@ -0,0 +1,74 @@
+"""
+One-time passcodes in Redis, namespaced by purpose: `otp:{purpose}:{email}`
+holds the SHA-256 of the code and the attempts left. Checking a code is one
+Lua script that compares, consumes on success and decrements on failure, so
+two concurrent checks can never both accept the same code and the last
+failed attempt deletes it.
+"""
+import hashlib
+import os
+import secrets
+
+from utils.cache import redis_client
+
+VERIFY_EMAIL = "verify-email"
+RESET_PASSWORD = "reset-password"
+PURPOSES = (VERIFY_EMAIL, RESET_PASSWORD)
+
+OTP_TTL = int(os.getenv("OTP_TTL", 1500))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+OTP_DIGITS = 6
+
+# Results of OtpStore.verify
+VALID, INVALID, LOCKED, MISSING = "valid", "invalid", "locked", "missing"
+
+CHECK_AND_CONSUME = """
+local stored = redis.call('HGET', KEYS[1], 'code')
+if not stored then
+    return 'missing'
+end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 'valid'
+end
+if redis.call('HINCRBY', KEYS[1], 'attempts', -1) <= 0 then
+    redis.call('DEL', KEYS[1])
+    return 'locked'
+end
+return 'invalid'
+"""
+
+
+def _digest(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+class OtpStore:
+    def __init__(self, ttl: int = OTP_TTL, max_attempts: int = OTP_MAX_ATTEMPTS):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._check_and_consume = redis_client.register_script(CHECK_AND_CONSUME)
+
+    @staticmethod
+    def key(purpose: str, email: str) -> str:
+        if purpose not in PURPOSES:
+            raise ValueError(f"Unknown OTP purpose {purpose}")
+        return f"otp:{purpose}:{email.strip().lower()}"
+
+    async def issue(self, purpose: str, email: str) -> str:
+        """Stores a new code for `email`, replacing any earlier one, and returns it."""
+        code = f"{secrets.randbelow(10 ** OTP_DIGITS):0{OTP_DIGITS}d}"
+        key = self.key(purpose, email)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"code": _digest(code), "attempts": self.max_attempts})
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        return code
+
+    async def verify(self, purpose: str, email: str, code: str) -> str:
+        """Returns VALID (and consumes the code), INVALID, LOCKED (no attempts left) or MISSING."""
+        return await self._check_and_consume(keys=[self.key(purpose, email)], args=[_digest(code)])
+
+
+otp_store = OtpStore()
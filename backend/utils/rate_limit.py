@@ -0,0 +1,126 @@
+"""
+Redis token buckets for the auth endpoints. Each bucket holds up to `capacity`
+tokens and refills `capacity` tokens every `period` seconds; a request takes
+one token, or gets a 429 with Retry-After. The refill-and-take step is a
+single Lua script using the Redis clock, so every app worker shares one count.
+
+`rate_limit(limiter, by="ip" | "email")` returns a FastAPI dependency. Limits
+are configured as "<capacity>/<period seconds>" in RATE_LIMIT_* variables.
+If Redis is unreachable requests are let through and a warning is logged.
+
+OTP brute force is cut off with `otp_failures`: only failed checks take a
+token, and `ensure_available` rejects a caller with none left before any
+OTP, SMTP or bcrypt work happens.
+"""
+import math
+import os
+
+from fastapi import HTTPException, Request, status
+
+from utils.cache import redis_client
+from utils.logger import logger
+
+TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= math.max(cost, 1) then
+    tokens = tokens - cost
+else
+    wait = (math.max(cost, 1) - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+
+def parse_limit(value: str) -> tuple[int, float]:
+    capacity, period = value.split("/")
+    return int(capacity), float(period)
+
+
+class RateLimiter:
+    def __init__(self, name: str, limit: str):
+        self.name = name
+        self.capacity, self.period = parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}", limit))
+        self.rate = self.capacity / self.period
+        self.rejected = 0
+        self._bucket = redis_client.register_script(TOKEN_BUCKET)
+
+    async def acquire(self, key: str, cost: int = 1) -> float:
+        """Takes `cost` tokens; returns 0 if allowed, else the seconds until it would be."""
+        try:
+            wait = float(await self._bucket(keys=[f"ratelimit:{self.name}:{key}"], args=[self.capacity, self.rate, cost]))
+        except Exception as e:
+            logger.warning(f"Rate limit check {self.name} failed, allowing request: {e}")
+            return 0.0
+        if wait:
+            self.rejected += 1
+        return wait
+
+    async def hit(self, key: str):
+        """Takes one token, or raises 429 if there is none."""
+        reject(await self.acquire(key))
+
+    async def ensure_available(self, key: str):
+        """Raises 429 if the bucket is empty, without taking a token."""
+        reject(await self.acquire(key, cost=0))
+
+    async def reset(self, key: str):
+        await redis_client.delete(f"ratelimit:{self.name}:{key}")
+
+
+def reject(wait: float):
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    forwarded = request.headers.get("x-forwarded-for")
+    if TRUST_PROXY and forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def request_email(request: Request) -> str | None:
+    """The email in a JSON body, or the OAuth2 form's username."""
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        email = body.get("email") if isinstance(body, dict) else None
+    else:
+        email = (await request.form()).get("username")
+    return email.strip().lower() if isinstance(email, str) and email else None
+
+
+def rate_limit(limiter: RateLimiter, by: str = "ip"):
+    async def dependency(request: Request):
+        key = client_ip(request) if by == "ip" else await request_email(request)
+        if key:
+            await limiter.hit(key)
+    return dependency
+
+
+login_by_ip = RateLimiter("login_ip", "20/60")
+login_by_email = RateLimiter("login_email", "5/60")
+send_otp_by_ip = RateLimiter("send_otp_ip", "10/600")
+send_otp_by_email = RateLimiter("send_otp_email", "3/600")
+update_password_by_ip = RateLimiter("update_password_ip", "10/60")
+update_password_by_email = RateLimiter("update_password_email", "5/600")
+otp_failures = RateLimiter("otp_failures", "5/900")
@@ -0,0 +1,77 @@
+"""
+Server-side session state in Redis: rotating refresh tokens and the
+revocation list for access tokens.
+
+Access tokens are short-lived JWTs (ACCESS_TOKEN_TTL). Refresh tokens are
+opaque random strings; Redis maps their SHA-256 to the user and issue time
+until REFRESH_TOKEN_TTL, and each one is consumed on use, so every refresh
+hands out a new one.
+
+Revocation is O(1) per request, a single MGET:
+- `session:revoked:{jti}`: one access token, kept until it would expire (logout)
+- `session:revoked-user:{user_id}`: tokens issued before this time (password change)
+
+If Redis is unreachable the revocation check fails open and logs a warning;
+access tokens are short-lived, and auth should not go down with the cache.
+"""
+import hashlib
+import os
+import secrets
+import time
+
+from utils.cache import redis_client
+from utils.logger import logger
+
+ACCESS_TOKEN_TTL = int(os.getenv("ACCESS_TOKEN_TTL", 15 * 60))
+REFRESH_TOKEN_TTL = int(os.getenv("REFRESH_TOKEN_TTL", 30 * 24 * 3600))
+
+
+def _refresh_key(refresh_token: str) -> str:
+    return f"session:refresh:{hashlib.sha256(refresh_token.encode()).hexdigest()}"
+
+
+async def store_refresh_token(user_id: str) -> str:
+    refresh_token = secrets.token_urlsafe(32)
+    await redis_client.set(_refresh_key(refresh_token), f"{user_id}:{time.time()}", ex=REFRESH_TOKEN_TTL)
+    return refresh_token
+
+
+async def consume_refresh_token(refresh_token: str) -> str | None:
+    """Returns the token's user_id and invalidates it; None if unknown, used or revoked."""
+    record = await redis_client.getdel(_refresh_key(refresh_token))
+    if record is None:
+        return None
+    user_id, issued_at = record.rsplit(":", 1)
+    revoked_before = await redis_client.get(f"session:revoked-user:{user_id}")
+    if revoked_before and float(issued_at) < float(revoked_before):
+        return None
+    return user_id
+
+
+async def revoke_refresh_token(refresh_token: str):
+    await redis_client.delete(_refresh_key(refresh_token))
+
+
+async def revoke_access_token(claims: dict):
+    remaining = int(claims.get("exp", 0) - time.time())
+    if claims.get("jti") and remaining > 0:
+        await redis_client.set(f"session:revoked:{claims['jti']}", "1", ex=remaining)
+
+
+async def revoke_user_tokens(user_id: str):
+    """Revokes every access and refresh token issued to the user until now."""
+    await redis_client.set(f"session:revoked-user:{user_id}", time.time(), ex=max(ACCESS_TOKEN_TTL, REFRESH_TOKEN_TTL))
+
+
+async def is_revoked(claims: dict) -> bool:
+    user_id = (claims.get("user") or {}).get("user_id")
+    try:
+        revoked_jti, revoked_before = await redis_client.mget(
+            f"session:revoked:{claims.get('jti')}", f"session:revoked-user:{user_id}"
+        )
+    except Exception as e:
+        logger.warning(f"Token revocation check failed, allowing token: {e}")
+        return False
+    if revoked_jti and claims.get("jti"):
+        return True
+    return bool(revoked_before) and claims.get("iat", 0) < float(revoked_before)
@@ -0,0 +1,94 @@
+"""
+Application-wide JWT signing and verification. Keys are read once at import;
+verified claims are kept in a bounded LRU keyed by the token's SHA-256 until
+the token's exp, so repeat requests with the same token skip the signature
+check.
+
+HS256 uses JWT_SECRET. For RS256 or EdDSA set JWT_ALGORITHM and provide
+JWT_PRIVATE_KEY (PEM, only needed where tokens are issued) and JWT_PUBLIC_KEY
+(PEM); other services can then verify our tokens with the public key alone.
+Either key can also be given as a path via JWT_PRIVATE_KEY_FILE /
+JWT_PUBLIC_KEY_FILE.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+import jwt
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "EdDSA"}
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", 10_000))
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _read_key(name: str) -> str | None:
+    if os.getenv(name):
+        return os.getenv(name)
+    path = os.getenv(f"{name}_FILE")
+    if path:
+        with open(path) as key_file:
+            return key_file.read()
+    return None
+
+
+class TokenVerifier:
+    def __init__(self, algorithm: str = JWT_ALGORITHM, secret: str | None = None, private_key: str | None = None,
+                 public_key: str | None = None, cache_size: int = JWT_CLAIMS_CACHE_SIZE):
+        self.algorithm = algorithm
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            self.signing_key = private_key or _read_key("JWT_PRIVATE_KEY")
+            self.verifying_key = public_key or _read_key("JWT_PUBLIC_KEY")
+            if not self.verifying_key:
+                raise RuntimeError(f"JWT_ALGORITHM={algorithm} needs JWT_PUBLIC_KEY or JWT_PUBLIC_KEY_FILE")
+        elif algorithm == "HS256":
+            self.signing_key = self.verifying_key = secret or os.getenv("JWT_SECRET", "super-secret-key")
+        else:
+            raise RuntimeError(f"Unsupported JWT_ALGORITHM {algorithm}")
+        self.cache_size = cache_size
+        self._claims: OrderedDict[bytes, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def issue(self, claims: dict, expires_in: int) -> str:
+        if not self.signing_key:
+            raise RuntimeError("No JWT signing key configured")
+        # Fractional iat (a valid NumericDate) orders tokens against revocations in the same second
+        now = time.time()
+        payload = {**claims, "iat": now, "exp": int(now) + expires_in, "jti": uuid4().hex}
+        return jwt.encode(payload, self.signing_key, algorithm=self.algorithm)
+
+    def verify(self, token: str) -> dict:
+        """Returns the token's claims, or raises InvalidToken."""
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self._claims.get(key)
+        if claims is not None:
+            if claims["exp"] > time.time():
+                self._claims.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._claims[key]
+
+        self.misses += 1
+        try:
+            claims = jwt.decode(token, self.verifying_key, algorithms=[self.algorithm], options={"require": ["exp"]})
+        except jwt.PyJWTError as e:
+            raise InvalidToken(str(e)) from e
+        self._claims[key] = claims
+        while len(self._claims) > self.cache_size:
+            self._claims.popitem(last=False)
+        return claims
+
+    def forget(self, token: str):
+        self._claims.pop(hashlib.sha256(token.encode()).digest(), None)
+
+    def stats(self) -> dict:
+        return {"algorithm": self.algorithm, "hits": self.hits, "misses": self.misses, "cached": len(self._claims)}
+
+
+token_verifier = TokenVerifier()
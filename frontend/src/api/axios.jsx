@@ -7,6 +7,18 @@ const api = axios.create({
   },
 });
 
+export const storeTokens = ({ access_token, refresh_token }) => {
+  localStorage.setItem("token", access_token);
+  if (refresh_token) {
+    localStorage.setItem("refreshToken", refresh_token);
+  }
+};
+
+const clearTokens = () => {
+  localStorage.removeItem("token");
+  localStorage.removeItem("refreshToken");
+};
+
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem("token");
   if (token) {
@@ -16,19 +28,44 @@ api.interceptors.request.use((config) => {
 });
 
 // List of public endpoints to ignore in the response interceptor
-const PUBLIC_PATHS = ["/login", "/register"];
+const PUBLIC_PATHS = ["/login", "/register", "/auth/refresh"];
+
+// Refresh tokens are single-use, so concurrent 401s share one refresh call
+let refreshing = null;
+
+export const refreshTokens = () => {
+  if (!refreshing) {
+    const refresh_token = localStorage.getItem("refreshToken");
+    refreshing = (refresh_token
+      ? axios.post(`${import.meta.env.VITE_API_BASE_URL}/auth/refresh`, { refresh_token })
+      : Promise.reject(new Error("No refresh token"))
+    )
+      .then(res => storeTokens(res.data))
+      .finally(() => { refreshing = null; });
+  }
+  return refreshing;
+};
 
 api.interceptors.response.use(
   response => response,
-  error => {
+  async error => {
     const { config, response } = error;
 
     // Check if the request URL is public
     const isPublic = PUBLIC_PATHS.some(path => config.url?.includes(path));
 
     if (response?.status === 401 && !isPublic) {
-      localStorage.removeItem("token");
-      window.location.href = "/login";  
+      if (!config._retried) {
+        config._retried = true;
+        try {
+          await refreshTokens();
+          return api(config);
+        } catch {
+          // fall through to the login redirect
+        }
+      }
+      clearTokens();
+      window.location.href = "/login";
     }
 
     return Promise.reject(error);
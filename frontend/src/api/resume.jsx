@@ -0,0 +1,88 @@
+import api, { refreshTokens } from "./axios";
+
+const follow = (jobId) =>
+  fetch(`${import.meta.env.VITE_API_BASE_URL}/resume/jobs/${jobId}/events`, {
+    headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+  });
+
+const failure = (detail, status) => {
+  const error = new Error(detail || "Resume generation failed");
+  error.status = status;
+  return error;
+};
+
+// Parses one Server-Sent Events block ("event: ...\ndata: ...")
+const parseEvent = (block) => {
+  const fields = {};
+  for (const line of block.split("\n")) {
+    const index = line.indexOf(": ");
+    if (index > 0) fields[line.slice(0, index)] = line.slice(index + 2);
+  }
+  return { event: fields.event, data: fields.data ? JSON.parse(fields.data) : {} };
+};
+
+/**
+ * Queues a resume generation and streams the result as a worker writes it.
+ * Calls onDelta(text) for every chunk of HTML, and onRestart() if the job
+ * was interrupted and runs again, so the HTML received so far is discarded.
+ * Resolves with the generation id once done.
+ */
+export async function streamResume(jobDescription, onDelta, onRestart) {
+  let job;
+  try {
+    job = (await api.post("/resume/jobs", { job_description: jobDescription })).data;
+  } catch (err) {
+    throw failure(err.response?.data?.detail, err.response?.status);
+  }
+
+  let response = await follow(job.id);
+  if (response.status === 401) {
+    await refreshTokens();
+    response = await follow(job.id);
+  }
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw failure(body.detail, response.status);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let generationId = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const blocks = buffer.split("\n\n");
+    buffer = blocks.pop();
+    for (const block of blocks) {
+      const { event, data } = parseEvent(block);
+      if (event === "start") generationId = data.id;
+      else if (event === "delta") onDelta(data.text);
+      else if (event === "restart") onRestart();
+      else if (event === "error") throw new Error(data.detail);
+    }
+  }
+  return generationId;
+}
+
+/**
+ * How well the user's profile matches the job description, scored locally
+ * on the server: { score, matched_skills, missing_skills }.
+ */
+export async function scoreResume(jobDescription) {
+  return (await api.post("/resume/score", { job_description: jobDescription })).data;
+}
+
+/**
+ * Downloads a generated resume as a PDF rendered on the server. The browser
+ * revalidates repeat downloads with the ETag, so they skip rendering.
+ */
+export async function downloadResumePdf(generationId) {
+  const response = await api.get(`/resume/${generationId}/pdf`, { responseType: "blob" });
+  const url = URL.createObjectURL(response.data);
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = "resume.pdf";
+  link.click();
+  URL.revokeObjectURL(url);
+}
@@ -19,7 +19,7 @@ const ForgotPassword = () => {
     if (!email) return setError("Please enter your email first.");
 
     try {
-      await api.post("/auth/send-otp", { email });
+      await api.post("/auth/send-otp", { email, purpose: "reset-password" });
       setOtpSent(true);
       setSuccess("OTP sent to your email.");
     } catch (err) {
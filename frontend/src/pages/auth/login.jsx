@@ -1,7 +1,7 @@
 import { useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { jwtDecode } from "jwt-decode";
-import api from "../../api/axios";
+import api, { storeTokens } from "../../api/axios";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { faEye, faEyeSlash } from "@fortawesome/free-solid-svg-icons";
 import "./login.css";
@@ -42,7 +42,7 @@ const Login = () => {
       const response = await api.post("/auth/login", { email, password });
 
   
-      localStorage.setItem("token", response.data.access_token);
+      storeTokens(response.data);
       const decoded = jwtDecode(response.data.access_token);
 
       if (!decoded.user.is_email_verified) {
@@ -2,7 +2,7 @@ import { useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { faEye, faEyeSlash } from "@fortawesome/free-solid-svg-icons";
-import api from "../../api/axios";
+import api, { storeTokens } from "../../api/axios";
 import "./register.css";
 
 const Register = () => {
@@ -53,7 +53,7 @@ const Register = () => {
         password,
       });
 
-      localStorage.setItem("token", response.data.access_token);
+      storeTokens(response.data);
 
       setSuccess("Registration successful! Redirecting to login...");
       navigate("/home");
@@ -1,7 +1,7 @@
 import { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { jwtDecode } from "jwt-decode";
-import api from "../../api/axios";
+import api, { storeTokens } from "../../api/axios";
 import './verifyEmail.css'
 
 const VerifyEmail = () => {
@@ -22,7 +22,7 @@ const VerifyEmail = () => {
       console.log("email: ", email)
 
       const res = await api.post("/auth/verify-otp", { email, otp });
-      localStorage.setItem("token", res.data.access_token); 
+      storeTokens(res.data);
       navigate("/home");
     } catch (err) { 
       console.error("Error: ", err)